@@ -0,0 +1,114 @@
+# accounts/analytics.py
+"""
+Portfolio analytics: budget vs billed vs collected, grouped by customer,
+project status or month of mobilization.
+
+Each grouping is a single GROUP BY over Project.objects.with_financials().
+Results are cached per filter combination so slicing the portfolio from the
+UI stays interactive; any change to a project, invoice or payment starts a
+new cache version (see accounts/signals.py).
+"""
+import json
+from decimal import Decimal
+
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncMonth
+
+from core.cache import get_or_compute
+from projects.models import Project
+
+PORTFOLIO_CACHE_TTL = 60 * 10  # seconds; edits invalidate sooner
+PORTFOLIO_CACHE_NAMESPACE = 'portfolio-analytics'
+
+# group name -> (field used in GROUP BY, human label)
+GROUPINGS = {
+    'customer': ('customer_id', 'Customer'),
+    'status': ('status', 'Status'),
+    'month': ('mobilization_month', 'Mobilization Month'),
+}
+# Names are not unique, so customers are grouped by id and labelled by name.
+LABEL_FIELDS = {'customer': 'customer__name'}
+
+
+def _percentage(part, whole):
+    if not whole:
+        return Decimal(0)
+    return round(part / whole * 100, 1)
+
+
+def filtered_projects(filters):
+    """Applies the supported portfolio filters (status, customer, mobilized_from, mobilized_to)."""
+    projects = Project.objects.all()
+    if filters.get('status'):
+        projects = projects.filter(status=filters['status'])
+    if filters.get('customer'):
+        projects = projects.filter(customer_id=filters['customer'])
+    if filters.get('mobilized_from'):
+        projects = projects.filter(mobilization_date__gte=filters['mobilized_from'])
+    if filters.get('mobilized_to'):
+        projects = projects.filter(mobilization_date__lte=filters['mobilized_to'])
+    return projects
+
+
+def compute_portfolio(group_by, filters):
+    """Runs the grouped query and returns JSON-friendly rows (uncached)."""
+    group_field, _ = GROUPINGS[group_by]
+    projects = filtered_projects(filters).with_financials()
+    if group_by == 'month':
+        projects = projects.annotate(mobilization_month=TruncMonth('mobilization_date'))
+
+    label_field = LABEL_FIELDS.get(group_by)
+    group_fields = [group_field, label_field] if label_field else [group_field]
+    rows = (
+        projects.values(*group_fields)
+        .annotate(
+            project_count=Count('pk'),
+            budget=Sum('budget_sum'),
+            invoiced_subtotal=Sum('invoiced_subtotal_sum'),
+            invoiced=Sum('invoiced_grand_sum'),
+            received=Sum('received_sum'),
+            receivable=Sum('receivable_sum'),
+        )
+        .order_by(*reversed(group_fields))
+    )
+
+    status_labels = dict(Project.ProjectStatus.choices)
+    results = []
+    for row in rows:
+        key = row[group_field]
+        if group_by == 'status':
+            label = str(status_labels.get(key, key))
+        elif group_by == 'month':
+            label = key.strftime('%b %Y') if key else 'Not mobilized'
+            key = key.isoformat() if key else None
+        else:
+            label = row[label_field]
+        budget = row['budget'] or Decimal(0)
+        invoiced = row['invoiced'] or Decimal(0)
+        received = row['received'] or Decimal(0)
+        results.append({
+            'key': key,
+            'label': label,
+            'project_count': row['project_count'],
+            'budget': str(round(budget, 2)),
+            'invoiced': str(round(invoiced, 2)),
+            'received': str(round(received, 2)),
+            'receivable': str(round(row['receivable'] or Decimal(0), 2)),
+            'invoicing_percentage': str(_percentage(row['invoiced_subtotal'] or Decimal(0), budget)),
+            'collection_percentage': str(_percentage(received, invoiced)),
+        })
+    return results
+
+
+def portfolio_cache_parts(group_by, filters):
+    return [json.dumps({'group': group_by, **{k: str(v) for k, v in filters.items() if v}}, sort_keys=True)]
+
+
+def portfolio_metrics(group_by, filters):
+    """Cached wrapper around compute_portfolio, keyed on the grouping and filter combination."""
+    if group_by not in GROUPINGS:
+        group_by = 'customer'
+    return get_or_compute(
+        PORTFOLIO_CACHE_NAMESPACE, portfolio_cache_parts(group_by, filters),
+        lambda: compute_portfolio(group_by, filters), PORTFOLIO_CACHE_TTL,
+    )
@@ -0,0 +1,136 @@
+# accounts/cashflow.py
+"""
+Helpers for the DailyCashflow aggregate table.
+
+Each bucket is rebuilt from the source tables for the dates that changed,
+so re-running a rebuild is always safe (it never double counts).
+"""
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db.models import F, Sum, Value
+from django.db.models.functions import TruncMonth, TruncWeek
+
+from invoices.models import MONEY_FIELD as MONEY, Invoice, InvoiceItem, item_total_expression
+from .models import CreditNote, DailyCashflow, Payment
+
+# An item's share of its invoice's grand total (incl. VAT)
+ITEM_GRAND_TOTAL = item_total_expression() * (Value(100) + F('invoice__tax_percentage')) / Value(100)
+
+
+def _invoiced_by_day(**date_filter):
+    rows = (
+        InvoiceItem.objects.exclude(invoice__status=Invoice.InvoiceStatus.VOID)
+        .filter(**{f'invoice__date{k}': v for k, v in date_filter.items()})
+        .values('invoice__date')
+        .annotate(total=Sum(ITEM_GRAND_TOTAL, output_field=MONEY))
+    )
+    return {r['invoice__date']: r['total'] for r in rows}
+
+
+def _received_by_day(**date_filter):
+    rows = (
+        Payment.objects.exclude(invoice__status=Invoice.InvoiceStatus.VOID)
+        .filter(**{f'date_paid{k}': v for k, v in date_filter.items()})
+        .values('date_paid')
+        .annotate(total=Sum('amount'))
+    )
+    return {r['date_paid']: r['total'] for r in rows}
+
+
+def _credited_by_day(**date_filter):
+    rows = (
+        CreditNote.objects.exclude(invoice__status=Invoice.InvoiceStatus.VOID)
+        .filter(**{f'date_issued{k}': v for k, v in date_filter.items()})
+        .values('date_issued')
+        .annotate(total=Sum('amount'))
+    )
+    return {r['date_issued']: r['total'] for r in rows}
+
+
+def _write_buckets(dates, invoiced, received, credited):
+    """Upserts one DailyCashflow row per date; dates with no activity are removed."""
+    buckets = []
+    empty_dates = []
+    for day in dates:
+        values = [invoiced.get(day), received.get(day), credited.get(day)]
+        if not any(values):
+            empty_dates.append(day)
+            continue
+        inv, rec, cred = (round(v or Decimal(0), 2) for v in values)
+        buckets.append(DailyCashflow(date=day, invoiced=inv, received=rec, credited=cred))
+
+    if empty_dates:
+        DailyCashflow.objects.filter(date__in=empty_dates).delete()
+    if buckets:
+        DailyCashflow.objects.bulk_create(
+            buckets,
+            batch_size=500,
+            update_conflicts=True,
+            unique_fields=['date'],
+            update_fields=['invoiced', 'received', 'credited', 'updated_at'],
+        )
+    return len(buckets)
+
+
+def rebuild_days(dates):
+    """Recomputes the buckets for the given dates (three grouped queries in total)."""
+    dates = {d for d in dates if d}
+    if not dates:
+        return 0
+    return _write_buckets(
+        dates,
+        _invoiced_by_day(__in=dates),
+        _received_by_day(__in=dates),
+        _credited_by_day(__in=dates),
+    )
+
+
+def backfill(start=None, end=None):
+    """
+    Rebuilds every bucket between start and end (inclusive, both optional).
+    Returns the number of non-empty days written.
+    """
+    date_filter = {}
+    if start:
+        date_filter['__gte'] = start
+    if end:
+        date_filter['__lte'] = end
+
+    invoiced = _invoiced_by_day(**date_filter)
+    received = _received_by_day(**date_filter)
+    credited = _credited_by_day(**date_filter)
+
+    stale = DailyCashflow.objects.all()
+    if start:
+        stale = stale.filter(date__gte=start)
+    if end:
+        stale = stale.filter(date__lte=end)
+    dates = set(invoiced) | set(received) | set(credited) | set(stale.values_list('date', flat=True))
+    return _write_buckets(dates, invoiced, received, credited)
+
+
+def cashflow_series(period='month', start=None, end=None):
+    """
+    Returns a list of {'period', 'invoiced', 'received', 'credited'} dicts,
+    grouped by month or ISO week, read from the pre-aggregated table.
+    """
+    trunc = TruncWeek if period == 'week' else TruncMonth
+    buckets = DailyCashflow.objects.all()
+    if start:
+        buckets = buckets.filter(date__gte=start)
+    if end:
+        buckets = buckets.filter(date__lte=end)
+    return list(
+        buckets.annotate(period=trunc('date'))
+        .values('period')
+        .annotate(invoiced=Sum('invoiced'), received=Sum('received'), credited=Sum('credited'))
+        .order_by('period')
+    )
+
+
+def default_series_start(period, today):
+    """Two years of months, or six months of weeks, ending today."""
+    if period == 'week':
+        return today - timedelta(weeks=26)
+    return today.replace(day=1, year=today.year - 2)
@@ -65,4 +65,16 @@ class CreditNoteForm(forms.ModelForm):
     class Meta:
         model = CreditNote
         fields = ['amount', 'date_issued', 'reason']
-        widgets = {'date_issued': forms.DateInput(attrs={'type': 'date'})}
\ No newline at end of file
+        widgets = {'date_issued': forms.DateInput(attrs={'type': 'date'})}
+
+class ReceiptImportForm(forms.Form):
+    file = forms.FileField(
+        label="Bank receipts (CSV)",
+        help_text="Columns: date, amount, and a reference (invoice number) and/or customer (name, email or TRN). Optional: method, notes.",
+        widget=forms.ClearableFileInput(attrs={'accept': '.csv,text/csv'}),
+    )
+    dry_run = forms.BooleanField(
+        required=False,
+        initial=True,
+        label="Preview only (don't record payments)",
+    )
@@ -0,0 +1,24 @@
+# accounts/management/commands/backfill_cashflow.py
+import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.cashflow import backfill
+
+
+class Command(BaseCommand):
+    help = "Rebuilds the DailyCashflow buckets from invoices, payments and credit notes."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--from', dest='start', help="First day to rebuild (YYYY-MM-DD). Defaults to the beginning.")
+        parser.add_argument('--to', dest='end', help="Last day to rebuild (YYYY-MM-DD). Defaults to the latest entry.")
+
+    def handle(self, *args, **options):
+        try:
+            start = datetime.date.fromisoformat(options['start']) if options['start'] else None
+            end = datetime.date.fromisoformat(options['end']) if options['end'] else None
+        except ValueError as exc:
+            raise CommandError(f"Invalid date: {exc}")
+
+        written = backfill(start=start, end=end)
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt cashflow for {written} day(s)."))
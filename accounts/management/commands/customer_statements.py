@@ -0,0 +1,38 @@
+# accounts/management/commands/customer_statements.py
+import datetime
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from accounts.statements import build_open_balance_statements, render_statement_pdf, statement_filename
+from core.replica import using_replica
+
+
+class Command(BaseCommand):
+    help = "Renders a PDF statement of account for every customer with an open balance."
+
+    def add_arguments(self, parser):
+        parser.add_argument('output_dir', help="Directory the PDFs are written to (created if missing).")
+        parser.add_argument('--from', dest='start', help="Statement start date (YYYY-MM-DD). Defaults to 1 January this year.")
+        parser.add_argument('--to', dest='end', help="Statement end date (YYYY-MM-DD). Defaults to today.")
+
+    def handle(self, *args, **options):
+        today = timezone.now().date()
+        try:
+            start = datetime.date.fromisoformat(options['start']) if options['start'] else today.replace(month=1, day=1)
+            end = datetime.date.fromisoformat(options['end']) if options['end'] else today
+        except ValueError as exc:
+            raise CommandError(f"Invalid date: {exc}")
+
+        output_dir = Path(options['output_dir'])
+        output_dir.mkdir(parents=True, exist_ok=True)
+
+        with using_replica():
+            statements = build_open_balance_statements(start, end)
+        for statement in statements:
+            path = output_dir / statement_filename(statement)
+            path.write_bytes(render_statement_pdf(statement))
+            self.stdout.write(f"{statement['customer'].name}: AED {statement['closing_balance']:,.2f} -> {path}")
+
+        self.stdout.write(self.style.SUCCESS(f"Rendered {len(statements)} statement(s)."))
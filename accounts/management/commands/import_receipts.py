@@ -0,0 +1,31 @@
+# accounts/management/commands/import_receipts.py
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.receipts import ReceiptImportError, allocate_receipts, parse_receipts_csv
+
+
+class Command(BaseCommand):
+    help = "Allocates a CSV of bank receipts to open invoices (oldest first) and records the payments."
+
+    def add_arguments(self, parser):
+        parser.add_argument('csv_file', help="CSV with date, amount and a reference and/or customer column.")
+        parser.add_argument('--dry-run', action='store_true', help="Show the allocation without recording anything.")
+
+    def handle(self, *args, **options):
+        try:
+            with open(options['csv_file'], newline='', encoding='utf-8-sig') as f:
+                receipts = parse_receipts_csv(f)
+            result = allocate_receipts(receipts, dry_run=options['dry_run'])
+        except (OSError, ReceiptImportError) as exc:
+            raise CommandError(str(exc))
+
+        for a in result['allocations']:
+            self.stdout.write(f"line {a['line']}: {a['amount']:,.2f} -> {a['invoice_number']}{' (paid)' if a['fully_paid'] else ''}")
+        for u in result['unmatched']:
+            self.stdout.write(self.style.WARNING(f"line {u['line']}: unmatched - {u['reason']}"))
+
+        verb = "Would record" if options['dry_run'] else "Recorded"
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {len(result['allocations'])} payment(s) totalling AED {result['total_allocated']:,.2f}; "
+            f"{len(result['unmatched'])} unmatched line(s)."
+        ))
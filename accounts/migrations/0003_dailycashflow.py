@@ -0,0 +1,27 @@
+# Generated by Django 5.2.7 on 2026-10-19 13:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyCashflow',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(unique=True)),
+                ('invoiced', models.DecimalField(decimal_places=2, default=0, help_text='Grand total (incl. VAT) of non-voided invoices dated this day.', max_digits=14)),
+                ('received', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('credited', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ['date'],
+            },
+        ),
+    ]
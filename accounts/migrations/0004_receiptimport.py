@@ -0,0 +1,23 @@
+# Generated by Django 5.2.7 on 2026-10-19 14:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0003_dailycashflow'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReceiptImport',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fingerprint', models.CharField(max_length=64, unique=True)),
+                ('payment_count', models.PositiveIntegerField()),
+                ('total', models.DecimalField(decimal_places=2, max_digits=14)),
+                ('imported_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+    ]
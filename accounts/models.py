@@ -45,4 +45,38 @@ class CreditNote(models.Model):
         super().save(*args, **kwargs)
 
     def __str__(self):
-        return self.credit_note_number
\ No newline at end of file
+        return self.credit_note_number
+
+class ImportedReceipt(models.Model):
+    """
+    One bank-receipt line that the receipt import (accounts/receipts.py) applied,
+    by a fingerprint of the line, so the same receipt is never booked twice.
+    Lines that couldn't be matched aren't recorded and can be imported again.
+    """
+    fingerprint = models.CharField(max_length=64, unique=True)
+    date = models.DateField()
+    amount = models.DecimalField(max_digits=14, decimal_places=2)
+    reference = models.CharField(max_length=255, blank=True)
+    imported_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"Receipt of {self.amount} on {self.date} (imported {self.imported_at:%d %b %Y %H:%M})"
+
+class DailyCashflow(models.Model):
+    """
+    Pre-aggregated per-day totals of money billed, received and credited.
+    Kept in sync from Invoice, Payment and CreditNote changes (see accounts/signals.py)
+    so dashboards can chart long periods from a few hundred rows.
+    """
+    date = models.DateField(unique=True)
+    invoiced = models.DecimalField(max_digits=14, decimal_places=2, default=0, help_text="Grand total (incl. VAT) of non-voided invoices dated this day.")
+    received = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    credited = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['date']
+
+    def __str__(self):
+        return f"Cashflow for {self.date}"
@@ -0,0 +1,334 @@
+# accounts/receipts.py
+"""
+Bulk import of bank receipts.
+
+A CSV of receipts is matched against open invoices by invoice number
+(found anywhere in the reference), customer and amount, then allocated
+oldest-invoice-first. All open invoices are loaded in one query and balances
+are tracked in memory, so a month of receipts costs a handful of queries:
+the Payment rows go in with one bulk_create and the affected invoices'
+statuses are reconciled with set-based UPDATEs, inside a single transaction.
+That transaction locks the open invoices before reading their balances, so
+concurrent imports take turns instead of paying the same balance twice.
+
+Each applied line is remembered by a fingerprint (ImportedReceipt): lines
+already applied are skipped when a file is imported again, while lines that
+couldn't be matched the first time are picked up once the cause is fixed.
+"""
+import csv
+import hashlib
+import io
+import re
+import datetime
+from collections import Counter
+from decimal import ROUND_HALF_UP, Decimal, InvalidOperation
+
+from django.db import IntegrityError, transaction
+from django.db.models import F, Q
+
+from core.cache import bump_version
+from enquiries.models import Customer
+from invoices.models import Invoice
+from invoices.status import reconcile_statuses
+from .analytics import PORTFOLIO_CACHE_NAMESPACE
+from .cashflow import rebuild_days
+from .models import ImportedReceipt, Payment
+
+CENT = Decimal('0.01')
+
+# Accepted CSV headers (lower-cased) for each receipt field.
+COLUMN_ALIASES = {
+    'date': ('date', 'date_paid', 'value date', 'transaction date'),
+    'amount': ('amount', 'credit', 'received'),
+    'reference': ('reference', 'ref', 'description', 'narrative', 'invoice', 'invoice number'),
+    'customer': ('customer', 'payer', 'customer name', 'trn'),
+    'payment_method': ('payment_method', 'method', 'payment method', 'mode'),
+    'notes': ('notes', 'remarks'),
+}
+DATE_FORMATS = ('%Y-%m-%d', '%d/%m/%Y', '%d-%m-%Y', '%d %b %Y', '%d-%b-%Y')
+REFERENCE_TOKEN = re.compile(r'[A-Za-z0-9][A-Za-z0-9\-]*')
+
+
+class ReceiptImportError(Exception):
+    """Raised when the file itself can't be used (missing columns, not a CSV, imported concurrently)."""
+
+
+def _parse_date(value):
+    value = value.strip()
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.datetime.strptime(value, fmt).date()
+        except ValueError:
+            continue
+    return None
+
+
+def _parse_amount(value):
+    try:
+        amount = Decimal(value.replace(',', '').replace('AED', '').strip())
+    except InvalidOperation:
+        return None
+    return amount.quantize(CENT, rounding=ROUND_HALF_UP)
+
+
+def parse_receipts_csv(fileobj):
+    """
+    Reads an uploaded CSV into a list of receipt dicts. Lines that can't be
+    parsed are returned too, with an 'error' so they show up in the report.
+    """
+    raw = fileobj.read()
+    if isinstance(raw, bytes):
+        raw = raw.decode('utf-8-sig', errors='replace')
+    reader = csv.DictReader(io.StringIO(raw))
+    if not reader.fieldnames:
+        raise ReceiptImportError("The file is empty.")
+
+    headers = {name.strip().lower(): name for name in reader.fieldnames if name}
+    columns = {}
+    for field, aliases in COLUMN_ALIASES.items():
+        columns[field] = next((headers[a] for a in aliases if a in headers), None)
+    missing = [field for field in ('date', 'amount') if not columns[field]]
+    if missing:
+        raise ReceiptImportError(f"Missing required column(s): {', '.join(missing)}.")
+    if not columns['reference'] and not columns['customer']:
+        raise ReceiptImportError("The file needs a reference or a customer column to match receipts.")
+
+    receipts = []
+    for line_number, row in enumerate(reader, start=2):
+        receipt = {field: (row.get(column) or '').strip() if column else '' for field, column in columns.items()}
+        receipt['line'] = line_number
+        receipt['error'] = ''
+        receipt['date'] = _parse_date(receipt['date'])
+        receipt['amount'] = _parse_amount(receipt['amount'])
+        if receipt['date'] is None:
+            receipt['error'] = "Unrecognised date."
+        elif receipt['amount'] is None or receipt['amount'] <= 0:
+            receipt['error'] = "Amount must be a positive number."
+        receipts.append(receipt)
+    return receipts
+
+
+def receipt_fingerprints(receipts):
+    """
+    SHA-256 per receipt line (date, amount, reference, customer), so a re-saved
+    or re-encoded copy of the same bank export is still recognised. Identical
+    lines in one file are told apart by their occurrence.
+    """
+    seen = Counter()
+    fingerprints = []
+    for r in receipts:
+        key = f"{r['date']}|{r['amount']}|{r['reference']}|{r['customer']}"
+        seen[key] += 1
+        fingerprints.append(hashlib.sha256(f"{key}|{seen[key]}".encode()).hexdigest())
+    return fingerprints
+
+
+# Drafts were never sent, so nothing can have been paid against them yet.
+CLOSED_STATUSES = [Invoice.InvoiceStatus.DRAFT, Invoice.InvoiceStatus.VOID, Invoice.InvoiceStatus.PAID]
+
+
+def _lock_open_invoices():
+    """
+    Locks every invoice that could take a payment (in pk order, so concurrent
+    imports can't deadlock); balances read after this are final until commit.
+    """
+    list(Invoice.objects.select_for_update().exclude(status__in=CLOSED_STATUSES).order_by('pk').values_list('pk', flat=True))
+
+
+def _load_open_invoices():
+    """All issued invoices with something left to pay, with their balance computed in SQL (one query)."""
+    rows = (
+        Invoice.objects.with_totals()
+        .exclude(status__in=CLOSED_STATUSES)
+        .annotate(due=F('grand_total_sum') - F('paid_sum') - F('credited_sum'))
+        .filter(due__gt=0)
+        .order_by('date', 'invoice_number')
+        .values('pk', 'invoice_number', 'date', 'due', 'project__customer_id', 'project__title')
+    )
+    invoices = []
+    for row in rows:
+        row['due'] = row['due'].quantize(CENT, rounding=ROUND_HALF_UP)
+        if row['due'] > 0:
+            invoices.append(row)
+    return invoices
+
+
+def _customer_lookup(names):
+    """Maps lower-cased name / email / TRN to customer id for the customers named in the file."""
+    names = {n for n in names if n}
+    if not names:
+        return {}
+    query = Q()
+    for name in names:
+        query |= Q(name__iexact=name) | Q(email__iexact=name) | Q(trn_number__iexact=name)
+    lookup = {}
+    for customer in Customer.objects.filter(query).values('pk', 'name', 'email', 'trn_number'):
+        for key in (customer['name'], customer['email'], customer['trn_number']):
+            if key:
+                lookup.setdefault(key.lower(), customer['pk'])
+    return lookup
+
+
+def _closed_invoices(receipts, by_number):
+    """Maps the invoice numbers named in references that aren't open to their status label."""
+    tokens = {t.upper() for r in receipts for t in REFERENCE_TOKEN.findall(r['reference'])} - set(by_number)
+    if not tokens:
+        return {}
+    rows = Invoice.objects.filter(invoice_number__in=tokens).values_list('invoice_number', 'status')
+    return {number.upper(): Invoice.InvoiceStatus(status).label for number, status in rows}
+
+
+def _match(receipt, by_number, closed, customers, invoices):
+    """Returns (customer_id, [invoices to pay first]) or an error string."""
+    tokens = [t.upper() for t in REFERENCE_TOKEN.findall(receipt['reference'])]
+    named = [by_number[t] for t in tokens if t in by_number]
+    if not named:
+        # The reference names a real invoice that can't take this payment: never fall
+        # back to matching by amount, which could book it to another customer.
+        for token in tokens:
+            if token in closed:
+                return f"Invoice {token} is not open ({closed[token]})."
+    customer_id = None
+    if receipt['customer']:
+        customer_id = customers.get(receipt['customer'].lower())
+        if customer_id is None:
+            return "Customer not found."
+
+    if named:
+        invoice_customers = {inv['project__customer_id'] for inv in named}
+        if customer_id and invoice_customers != {customer_id}:
+            return "Invoice in the reference belongs to a different customer."
+        if len(invoice_customers) > 1:
+            return "Reference names invoices of more than one customer."
+        return invoice_customers.pop(), named
+
+    if customer_id:
+        return customer_id, []
+
+    # No invoice number and no customer: only an exact, unambiguous amount match is safe.
+    exact = [inv for inv in invoices if inv['due'] == receipt['amount']]
+    if len(exact) == 1:
+        return exact[0]['project__customer_id'], exact
+    if exact:
+        return "Amount matches several open invoices; add an invoice number or customer."
+    return "No invoice number, customer or matching amount found."
+
+
+def allocate_receipts(receipts, dry_run=False):
+    """
+    Matches and allocates parsed receipts. Unless dry_run is set, the payments
+    are written in one transaction, with the open invoices locked while their
+    balances are read and allocated. Lines applied by an earlier import are
+    reported as unmatched and left alone.
+
+    Returns {'allocations': [...], 'unmatched': [...], 'paid_invoices': [...],
+    'total_allocated': Decimal}.
+    """
+    if dry_run:
+        return _allocate(receipts)[0]
+    with transaction.atomic():
+        _lock_open_invoices()
+        result, applied = _allocate(receipts)
+        if applied:
+            _write_allocations(result['allocations'], applied)
+    return result
+
+
+def _allocate(receipts):
+    """The allocate_receipts() result and the receipt lines it applies, by fingerprint."""
+    fingerprints = dict(zip((r['line'] for r in receipts), receipt_fingerprints(receipts)))
+    imported = {
+        row.fingerprint: row.imported_at
+        for row in ImportedReceipt.objects.filter(fingerprint__in=fingerprints.values()).only('fingerprint', 'imported_at')
+    }
+    invoices = _load_open_invoices()
+    by_number = {inv['invoice_number'].upper(): inv for inv in invoices}
+    by_customer = {}
+    for inv in invoices:
+        by_customer.setdefault(inv['project__customer_id'], []).append(inv)
+    closed = _closed_invoices(receipts, by_number)
+    customers = _customer_lookup(r['customer'] for r in receipts)
+
+    allocations = []
+    unmatched = []
+    applied = {}
+    for receipt in receipts:
+        if receipt['error']:
+            unmatched.append({**receipt, 'reason': receipt['error']})
+            continue
+        fingerprint = fingerprints[receipt['line']]
+        if fingerprint in imported:
+            unmatched.append({**receipt, 'reason': f"Already imported on {imported[fingerprint]:%d %b %Y}."})
+            continue
+        match = _match(receipt, by_number, closed, customers, invoices)
+        if isinstance(match, str):
+            unmatched.append({**receipt, 'reason': match})
+            continue
+
+        customer_id, named = match
+        # Invoices named in the reference first, then the customer's other open invoices oldest first.
+        queue = named + [inv for inv in by_customer.get(customer_id, []) if inv not in named]
+        remaining = receipt['amount']
+        for inv in queue:
+            if remaining <= 0:
+                break
+            if inv['due'] <= 0:
+                continue
+            applied_amount = min(remaining, inv['due'])
+            inv['due'] -= applied_amount
+            remaining -= applied_amount
+            allocations.append({
+                'line': receipt['line'],
+                'invoice_pk': inv['pk'],
+                'invoice_number': inv['invoice_number'],
+                'project': inv['project__title'],
+                'date': receipt['date'],
+                'amount': applied_amount,
+                'payment_method': receipt['payment_method'],
+                'notes': receipt['notes'] or receipt['reference'],
+                'fully_paid': inv['due'] <= 0,
+            })
+        if remaining < receipt['amount']:
+            applied[fingerprint] = receipt
+        if remaining > 0:
+            reason = "Customer has no open invoices." if remaining == receipt['amount'] else f"AED {remaining:,.2f} left over after paying all open invoices."
+            unmatched.append({**receipt, 'amount': remaining, 'reason': reason})
+
+    paid_invoices = sorted({a['invoice_number'] for a in allocations if a['fully_paid']})
+    result = {
+        'allocations': allocations,
+        'unmatched': unmatched,
+        'paid_invoices': paid_invoices,
+        'total_allocated': sum((a['amount'] for a in allocations), Decimal(0)),
+    }
+    return result, applied
+
+
+def _write_allocations(allocations, applied):
+    try:
+        with transaction.atomic():
+            ImportedReceipt.objects.bulk_create([
+                ImportedReceipt(fingerprint=fingerprint, date=r['date'], amount=r['amount'], reference=r['reference'][:255])
+                for fingerprint, r in applied.items()
+            ])
+    except IntegrityError:
+        # Backstop: the invoice locks normally make concurrent imports take turns.
+        raise ReceiptImportError("Some of these receipts were imported by someone else at the same time. Import the file again to see what is left.")
+    Payment.objects.bulk_create(
+        [
+            Payment(
+                invoice_id=a['invoice_pk'],
+                amount=a['amount'],
+                date_paid=a['date'],
+                payment_method=a['payment_method'][:50],
+                notes=a['notes'],
+            )
+            for a in allocations
+        ],
+        batch_size=500,
+    )
+    # bulk_create skips the post_save signals, so refresh statuses, cashflow buckets
+    # and the cached portfolio figures here.
+    reconcile_statuses(Invoice.objects.filter(pk__in={a['invoice_pk'] for a in allocations}))
+    rebuild_days({a['date'] for a in allocations})
+    transaction.on_commit(lambda: bump_version(PORTFOLIO_CACHE_NAMESPACE))
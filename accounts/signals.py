@@ -0,0 +1,124 @@
+# accounts/signals.py
+"""
+Keeps the DailyCashflow buckets, the stored invoice status and the cached
+portfolio figures in step with invoices, payments and credit notes. Only the
+days and invoices touched by a change are recomputed.
+
+Saving an invoice's item formset inside invoice_items_batch() does that work
+once for the whole invoice instead of once per item.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from core.cache import invalidate_on_change
+from enquiries.models import Customer
+from invoices.models import Invoice, InvoiceItem
+from invoices.status import reconcile_invoice
+from projects.models import Project, ProjectItem
+from .analytics import PORTFOLIO_CACHE_NAMESPACE
+from .cashflow import rebuild_days
+from .models import CreditNote, Payment
+
+# Invoice pk whose items are being saved together (invoice_items_batch), if any
+_batched_invoice = ContextVar('batched_invoice', default=None)
+
+DATE_FIELDS = {
+    Invoice: 'date',
+    Payment: 'date_paid',
+    CreditNote: 'date_issued',
+}
+
+
+@receiver(pre_save, sender=Invoice)
+@receiver(pre_save, sender=Payment)
+@receiver(pre_save, sender=CreditNote)
+def remember_previous_date(sender, instance, **kwargs):
+    """Stash the stored date so a moved record also clears its old bucket."""
+    instance._cashflow_previous_date = None
+    if instance.pk:
+        date_field = DATE_FIELDS[sender]
+        instance._cashflow_previous_date = (
+            sender.objects.filter(pk=instance.pk).values_list(date_field, flat=True).first()
+        )
+
+
+@receiver(post_save, sender=Payment)
+@receiver(post_delete, sender=Payment)
+@receiver(post_save, sender=CreditNote)
+@receiver(post_delete, sender=CreditNote)
+def update_cashflow_for_entry(sender, instance, **kwargs):
+    date_field = DATE_FIELDS[sender]
+    rebuild_days([getattr(instance, date_field), getattr(instance, '_cashflow_previous_date', None)])
+
+
+@receiver(post_save, sender=Invoice)
+def update_cashflow_for_invoice(sender, instance, created, **kwargs):
+    dates = [instance.date, getattr(instance, '_cashflow_previous_date', None)]
+    if not created:
+        # Voiding (or un-voiding) an invoice moves its payments and credits in or out of the totals.
+        dates += instance.payments.values_list('date_paid', flat=True)
+        dates += instance.credit_notes.values_list('date_issued', flat=True)
+    rebuild_days(dates)
+
+
+@receiver(post_delete, sender=Invoice)
+def update_cashflow_for_deleted_invoice(sender, instance, **kwargs):
+    # Payments and credit notes cascade first and clean up their own days.
+    rebuild_days([instance.date])
+
+
+@receiver(post_save, sender=InvoiceItem)
+@receiver(post_delete, sender=InvoiceItem)
+def update_cashflow_for_invoice_item(sender, instance, **kwargs):
+    if instance.invoice_id == _batched_invoice.get():
+        return
+    invoice_date = Invoice.objects.filter(pk=instance.invoice_id).values_list('date', flat=True).first()
+    rebuild_days([invoice_date])
+
+
+# ---------------------------------
+# INVOICE STATUS
+# ---------------------------------
+@receiver(post_save, sender=Payment)
+@receiver(post_delete, sender=Payment)
+@receiver(post_save, sender=CreditNote)
+@receiver(post_delete, sender=CreditNote)
+@receiver(post_save, sender=InvoiceItem)
+@receiver(post_delete, sender=InvoiceItem)
+def reconcile_status_for_entry(sender, instance, **kwargs):
+    if sender is InvoiceItem and instance.invoice_id == _batched_invoice.get():
+        return
+    reconcile_invoice(instance.invoice_id)
+
+
+@receiver(post_save, sender=Invoice)
+def reconcile_status_for_invoice(sender, instance, **kwargs):
+    # A manual status change or a new due date may need correcting; the UPDATE doesn't re-fire post_save.
+    reconcile_invoice(instance.pk)
+
+
+@contextmanager
+def invoice_items_batch(invoice):
+    """
+    Wraps saving many of `invoice`'s items (the invoice form's item formset): the
+    per-item cashflow and status receivers skip them, and the invoice's day and
+    status are recomputed once at the end. Runs in a transaction.
+    """
+    with transaction.atomic():
+        token = _batched_invoice.set(invoice.pk)
+        try:
+            yield
+        finally:
+            _batched_invoice.reset(token)
+        rebuild_days([invoice.date])
+        reconcile_invoice(invoice.pk)
+
+
+# ---------------------------------
+# CACHED PORTFOLIO FIGURES
+# ---------------------------------
+invalidate_on_change(PORTFOLIO_CACHE_NAMESPACE, Customer, Project, ProjectItem, Invoice, InvoiceItem, Payment, CreditNote)
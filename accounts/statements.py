@@ -0,0 +1,254 @@
+# accounts/statements.py
+"""
+Customer statements of account.
+
+All entries for any number of customers are loaded with three queries
+(invoices with SQL totals, payments, credit notes) and grouped in Python,
+so a single statement and the batch run cost the same number of queries.
+ReportLab is imported inside render_statement_pdf, so the statement screen
+and the rest of accounts.views don't load it.
+"""
+import io
+from collections import defaultdict
+from decimal import Decimal
+
+from django.utils.text import get_valid_filename
+
+from enquiries.models import Customer
+from invoices.models import Invoice
+from .models import CreditNote, Payment
+
+# Order of entries that share a date: bill first, then money in, then credits.
+ENTRY_ORDER = {'INVOICE': 0, 'PAYMENT': 1, 'CREDIT': 2}
+
+# Invoices that were never issued (drafts) or were cancelled (void) don't appear.
+HIDDEN_STATUSES = [Invoice.InvoiceStatus.DRAFT, Invoice.InvoiceStatus.VOID]
+
+
+def _load_entries(customer_ids, end):
+    """Returns {customer_id: [entry, ...]} for every entry of an issued invoice up to `end`."""
+    entries = defaultdict(list)
+
+    invoices = (
+        Invoice.objects.with_totals()
+        .filter(project__customer_id__in=customer_ids, date__lte=end)
+        .exclude(status__in=HIDDEN_STATUSES)
+        .values('pk', 'invoice_number', 'date', 'due_date', 'project__title', 'project__customer_id', 'grand_total_sum')
+    )
+    for inv in invoices:
+        entries[inv['project__customer_id']].append({
+            'date': inv['date'],
+            'kind': 'INVOICE',
+            'label': 'Invoice',
+            'reference': inv['invoice_number'],
+            'invoice_pk': inv['pk'],
+            'project': inv['project__title'],
+            'detail': f"Due {inv['due_date']:%d %b %Y}" if inv['due_date'] else '',
+            'debit': round(inv['grand_total_sum'], 2),
+            'credit': Decimal(0),
+        })
+
+    payments = (
+        Payment.objects.filter(invoice__project__customer_id__in=customer_ids, date_paid__lte=end)
+        .exclude(invoice__status__in=HIDDEN_STATUSES)
+        .values('pk', 'date_paid', 'amount', 'payment_method', 'invoice_id', 'invoice__invoice_number', 'invoice__project__title', 'invoice__project__customer_id')
+    )
+    for pay in payments:
+        entries[pay['invoice__project__customer_id']].append({
+            'date': pay['date_paid'],
+            'kind': 'PAYMENT',
+            'label': 'Payment',
+            'reference': pay['invoice__invoice_number'],
+            'invoice_pk': pay['invoice_id'],
+            'project': pay['invoice__project__title'],
+            'detail': pay['payment_method'],
+            'debit': Decimal(0),
+            'credit': pay['amount'],
+        })
+
+    credit_notes = (
+        CreditNote.objects.filter(invoice__project__customer_id__in=customer_ids, date_issued__lte=end)
+        .exclude(invoice__status__in=HIDDEN_STATUSES)
+        .values('pk', 'date_issued', 'amount', 'credit_note_number', 'invoice_id', 'invoice__invoice_number', 'invoice__project__title', 'invoice__project__customer_id')
+    )
+    for note in credit_notes:
+        entries[note['invoice__project__customer_id']].append({
+            'date': note['date_issued'],
+            'kind': 'CREDIT',
+            'label': 'Credit Note',
+            'reference': note['credit_note_number'],
+            'invoice_pk': note['invoice_id'],
+            'project': note['invoice__project__title'],
+            'detail': f"Against {note['invoice__invoice_number']}",
+            'debit': Decimal(0),
+            'credit': note['amount'],
+        })
+
+    return entries
+
+
+def _statement_from_entries(customer, entries, start, end):
+    """Folds a customer's entries into an opening balance, dated lines with a running balance, and totals."""
+    entries.sort(key=lambda e: (e['date'], ENTRY_ORDER[e['kind']], e['reference']))
+
+    opening_balance = Decimal(0)
+    lines = []
+    for entry in entries:
+        if entry['date'] < start:
+            opening_balance += entry['debit'] - entry['credit']
+    balance = opening_balance
+    for entry in entries:
+        if entry['date'] >= start:
+            balance += entry['debit'] - entry['credit']
+            lines.append({**entry, 'balance': balance})
+
+    return {
+        'customer': customer,
+        'start': start,
+        'end': end,
+        'opening_balance': opening_balance,
+        'lines': lines,
+        'total_debit': sum((line['debit'] for line in lines), Decimal(0)),
+        'total_credit': sum((line['credit'] for line in lines), Decimal(0)),
+        'closing_balance': balance,
+    }
+
+
+def build_statement(customer, start, end):
+    """Statement of account for one customer between start and end (inclusive)."""
+    entries = _load_entries([customer.pk], end)
+    return _statement_from_entries(customer, entries[customer.pk], start, end)
+
+
+def build_open_balance_statements(start, end, customers=None):
+    """
+    Statements for every customer whose balance at `end` is still open (> 0.01),
+    built in one pass over the same three queries.
+    """
+    if customers is None:
+        customers = Customer.objects.filter(projects__invoices__isnull=False).distinct().order_by('name')
+    customers = {c.pk: c for c in customers}
+    entries = _load_entries(list(customers), end)
+
+    statements = []
+    for customer_id, customer in customers.items():
+        statement = _statement_from_entries(customer, entries.get(customer_id, []), start, end)
+        if statement['closing_balance'] > Decimal('0.01'):
+            statements.append(statement)
+    return statements
+
+
+# ---------------------------------
+# PDF RENDERING
+# ---------------------------------
+def render_statement_pdf(statement):
+    """Renders a statement dict (see build_statement) to PDF bytes."""
+    from reportlab.lib import colors
+    from reportlab.lib.enums import TA_LEFT, TA_RIGHT
+    from reportlab.lib.pagesizes import letter
+    from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+    from reportlab.lib.units import inch
+    from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+
+    from invoices.pdf_utils import LineSeparator, NumberedCanvas, process_logo
+
+    customer = statement['customer']
+    buf = io.BytesIO()
+    doc = SimpleDocTemplate(
+        buf,
+        pagesize=letter,
+        rightMargin=0.75*inch,
+        leftMargin=0.75*inch,
+        topMargin=1.0*inch,
+        bottomMargin=1.5*inch,
+        title=f"Statement of Account - {customer.name}",
+        author="CURVACRAFT DESIGN & BUILD STUDIO"
+    )
+    content_width = doc.width
+
+    primary_color = colors.HexColor("#2C3E50")
+    accent_color = colors.HexColor("#9d9084")
+    light_gray = colors.HexColor("#ECF0F1")
+    border_color = colors.HexColor("#BDC3C7")
+    header_bg = colors.HexColor("#34495E")
+
+    styles = getSampleStyleSheet()
+    styles.add(ParagraphStyle(name='StatementTitle', fontName='Helvetica-Bold', fontSize=16, textColor=accent_color, alignment=TA_RIGHT))
+    styles.add(ParagraphStyle(name='ClientInfo', fontName='Helvetica', fontSize=10, textColor=primary_color, leading=14))
+    styles.add(ParagraphStyle(name='TableHeader', fontName='Helvetica-Bold', fontSize=8, textColor=colors.white))
+    styles.add(ParagraphStyle(name='TableCell', fontName='Helvetica', fontSize=8, textColor=primary_color, leading=10, alignment=TA_LEFT))
+    styles.add(ParagraphStyle(name='TableCellRight', fontName='Helvetica', fontSize=8, textColor=primary_color, alignment=TA_RIGHT))
+    styles.add(ParagraphStyle(name='TableCellBoldRight', fontName='Helvetica-Bold', fontSize=8, textColor=primary_color, alignment=TA_RIGHT))
+
+    story = []
+    logo = process_logo("https://curvacraft.com/wp-content/uploads/2024/10/Curvacraft-logo-1024x255.webp")
+    if not logo:
+        logo = Paragraph("<b>CURVACRAFT</b>", styles['Normal'])
+    title_html = f"""
+        STATEMENT OF ACCOUNT<br/>
+        <font size='9' color='#7F8C8D'>{statement['start']:%d %b %Y} &ndash; {statement['end']:%d %b %Y}</font>
+    """
+    header_table = Table([[logo, Paragraph(title_html, styles['StatementTitle'])]], colWidths=[content_width - 3*inch, 3*inch])
+    header_table.setStyle(TableStyle([('VALIGN', (0,0), (-1,-1), 'TOP')]))
+    story.append(header_table)
+    story.append(Spacer(1, 0.2*inch))
+    story.append(LineSeparator(content_width, 2, accent_color))
+    story.append(Spacer(1, 0.2*inch))
+
+    client_info = f"""
+        <font color='#{accent_color.hexval()[2:]}' size='11'><b>CUSTOMER</b></font><br/>
+        <b>{customer.name}</b><br/>
+        {customer.address.replace('\n', '<br/>') if customer.address else ''}<br/>
+        {customer.email or ''}
+        {customer.trn_number and f"<br/><b>TRN:</b> {customer.trn_number}" or ''}
+    """
+    info_table = Table([[Paragraph(client_info, styles['ClientInfo'])]], colWidths=[content_width])
+    info_table.setStyle(TableStyle([('BACKGROUND', (0,0), (-1,-1), light_gray), ('BOX', (0,0), (-1,-1), 1, border_color), ('PADDING', (0,0), (-1,-1), 10)]))
+    story.append(info_table)
+    story.append(Spacer(1, 0.3*inch))
+
+    def money(value):
+        return f"{value:,.2f}" if value else ''
+
+    table_data = [[Paragraph(h, styles['TableHeader']) for h in ['DATE', 'TYPE', 'REFERENCE', 'PROJECT', 'DEBIT', 'CREDIT', 'BALANCE']]]
+    table_data.append([
+        Paragraph(f"{statement['start']:%d %b %Y}", styles['TableCell']), Paragraph('Opening balance', styles['TableCell']), '', '', '', '',
+        Paragraph(f"{statement['opening_balance']:,.2f}", styles['TableCellBoldRight']),
+    ])
+    for line in statement['lines']:
+        table_data.append([
+            Paragraph(f"{line['date']:%d %b %Y}", styles['TableCell']),
+            Paragraph(line['label'], styles['TableCell']),
+            Paragraph(line['reference'], styles['TableCell']),
+            Paragraph(line['project'], styles['TableCell']),
+            Paragraph(money(line['debit']), styles['TableCellRight']),
+            Paragraph(money(line['credit']), styles['TableCellRight']),
+            Paragraph(f"{line['balance']:,.2f}", styles['TableCellRight']),
+        ])
+    table_data.append([
+        '', Paragraph('<b>Totals</b>', styles['TableCell']), '', '',
+        Paragraph(f"{statement['total_debit']:,.2f}", styles['TableCellBoldRight']),
+        Paragraph(f"{statement['total_credit']:,.2f}", styles['TableCellBoldRight']),
+        Paragraph(f"{statement['closing_balance']:,.2f}", styles['TableCellBoldRight']),
+    ])
+    lines_table = Table(table_data, colWidths=[0.8*inch, 0.8*inch, 1.0*inch, 1.7*inch, 0.8*inch, 0.8*inch, 0.9*inch], repeatRows=1)
+    lines_table.setStyle(TableStyle([
+        ('BACKGROUND', (0,0), (-1,0), header_bg),
+        ('GRID', (0,0), (-1,-1), 0.5, border_color), ('BOX', (0,0), (-1,-1), 1, primary_color),
+        ('VALIGN', (0,0), (-1,-1), 'MIDDLE'),
+        ('ROWBACKGROUNDS', (0,1), (-1,-2), [colors.white, light_gray]),
+        ('BACKGROUND', (0,-1), (-1,-1), light_gray),
+    ]))
+    story.append(lines_table)
+    story.append(Spacer(1, 0.3*inch))
+
+    closing_html = f"<para align='right'><font size='12' color='#{accent_color.hexval()[2:]}'><b>Balance due: AED {statement['closing_balance']:,.2f}</b></font></para>"
+    story.append(Paragraph(closing_html, styles['BodyText']))
+
+    doc.build(story, canvasmaker=NumberedCanvas)
+    return buf.getvalue()
+
+
+def statement_filename(statement):
+    """A file name safe for a Content-Disposition header and for joining to an output directory."""
+    return get_valid_filename(f"Statement_{statement['customer'].name}_{statement['end']:%Y-%m-%d}.pdf")
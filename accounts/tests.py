@@ -1,3 +1,106 @@
-from django.test import TestCase
+import datetime
+import io
+from decimal import Decimal
 
-# Create your tests here.
+from core.testing import TestCase
+from enquiries.models import Customer
+from invoices.models import Invoice, InvoiceItem
+from projects.models import Project
+from .models import Payment
+from .receipts import allocate_receipts, parse_receipts_csv
+from .statements import build_open_balance_statements, build_statement, statement_filename
+
+
+def make_invoice(project, amount, status=Invoice.InvoiceStatus.SENT, date=datetime.date(2026, 1, 10), **kwargs):
+    invoice = Invoice.objects.create(project=project, tax_percentage=Decimal('0'), date=date, status=status, **kwargs)
+    InvoiceItem.objects.create(invoice=invoice, description='Works', quantity=1, unit_price=Decimal(amount))
+    return invoice
+
+
+class StatementTests(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.customer = Customer.objects.create(name='ACME Ltd', email='acme@example.com')
+        self.project = Project.objects.create(customer=self.customer, title='Villa')
+
+    def test_draft_and_void_invoices_are_left_out(self):
+        sent = make_invoice(self.project, '1000')
+        make_invoice(self.project, '400', status=Invoice.InvoiceStatus.DRAFT)
+        make_invoice(self.project, '300', status=Invoice.InvoiceStatus.VOID)
+        Payment.objects.create(invoice=sent, amount=Decimal('250'), date_paid=datetime.date(2026, 1, 20))
+
+        statement = build_statement(self.customer, datetime.date(2026, 1, 1), datetime.date(2026, 1, 31))
+        self.assertEqual([line['reference'] for line in statement['lines']], [sent.invoice_number] * 2)
+        self.assertEqual(statement['closing_balance'], Decimal('750'))
+
+    def test_drafts_do_not_open_a_balance(self):
+        make_invoice(self.project, '400', status=Invoice.InvoiceStatus.DRAFT)
+        self.assertEqual(build_open_balance_statements(datetime.date(2026, 1, 1), datetime.date(2026, 1, 31)), [])
+
+    def test_filename_is_safe(self):
+        self.customer.name = '../"Evil" / Co'
+        statement = {'customer': self.customer, 'end': datetime.date(2026, 1, 31)}
+        filename = statement_filename(statement)
+        self.assertNotIn('/', filename)
+        self.assertNotIn('"', filename)
+        self.assertTrue(filename.endswith('_2026-01-31.pdf'))
+
+
+def parse(text):
+    return parse_receipts_csv(io.StringIO(text))
+
+
+class ReceiptAllocationTests(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.acme = Customer.objects.create(name='ACME Ltd', email='acme@example.com')
+        self.other = Customer.objects.create(name='Other Co', email='other@example.com')
+        acme_project = Project.objects.create(customer=self.acme, title='Villa')
+        other_project = Project.objects.create(customer=self.other, title='Office')
+        self.older = make_invoice(acme_project, '1000', date=datetime.date(2026, 1, 5))
+        self.newer = make_invoice(acme_project, '500', date=datetime.date(2026, 1, 20))
+        self.others = make_invoice(other_project, '700')
+
+    def test_customer_receipt_pays_oldest_first(self):
+        result = allocate_receipts(parse("date,amount,customer\n2026-02-01,1200,ACME Ltd\n"))
+
+        self.assertEqual([(a['invoice_number'], a['amount']) for a in result['allocations']],
+                         [(self.older.invoice_number, Decimal('1000.00')), (self.newer.invoice_number, Decimal('200.00'))])
+        self.older.refresh_from_db()
+        self.newer.refresh_from_db()
+        self.assertEqual(self.older.status, Invoice.InvoiceStatus.PAID)
+        self.assertEqual(self.newer.status, Invoice.InvoiceStatus.SENT)
+        self.assertEqual(self.newer.total_paid, Decimal('200'))
+
+    def test_dry_run_records_nothing(self):
+        result = allocate_receipts(parse("date,amount,customer\n2026-02-01,1200,ACME Ltd\n"), dry_run=True)
+        self.assertEqual(len(result['allocations']), 2)
+        self.assertFalse(Payment.objects.exists())
+
+    def test_reference_to_a_closed_invoice_is_not_matched_by_amount(self):
+        Invoice.objects.filter(pk=self.others.pk).update(status=Invoice.InvoiceStatus.PAID)
+        make_invoice(self.older.project, '700', date=datetime.date(2026, 1, 25))
+
+        result = allocate_receipts(parse(f"date,amount,reference\n2026-02-01,700,{self.others.invoice_number}\n"))
+
+        self.assertEqual(result['allocations'], [])
+        self.assertIn('is not open', result['unmatched'][0]['reason'])
+        self.assertFalse(Payment.objects.exists())
+
+    def test_reimport_skips_applied_lines_and_retries_unmatched_ones(self):
+        csv_text = "date,amount,customer\n2026-02-01,1000,ACME Ltd\n2026-02-02,300,New Customer\n"
+        first = allocate_receipts(parse(csv_text))
+        self.assertEqual(len(first['allocations']), 1)
+        self.assertEqual(first['unmatched'][0]['reason'], "Customer not found.")
+
+        Project.objects.filter(pk=self.others.project_id).update(customer=Customer.objects.create(name='New Customer', email='new@example.com'))
+        second = allocate_receipts(parse(csv_text))
+
+        self.assertEqual([(a['line'], a['invoice_number']) for a in second['allocations']], [(3, self.others.invoice_number)])
+        self.assertIn('Already imported', second['unmatched'][0]['reason'])
+        self.assertEqual(Payment.objects.count(), 2)
+
+    def test_identical_lines_are_separate_receipts(self):
+        result = allocate_receipts(parse("date,amount,customer\n2026-02-01,100,ACME Ltd\n2026-02-01,100,ACME Ltd\n"))
+        self.assertEqual(len(result['allocations']), 2)
+        self.assertEqual(allocate_receipts(parse("date,amount,customer\n2026-02-01,100,ACME Ltd\n"))['allocations'], [])
@@ -5,10 +5,22 @@ from . import views
 app_name = 'accounts'
 urlpatterns = [
     path('', views.accounts_dashboard, name='dashboard'),
+    path('projects/', views.project_breakdown, name='project_breakdown'),
     path('incoming-payments/', views.incoming_payments_list, name='incoming_payments'),
     path('invoice/<int:invoice_pk>/add-payment/', views.add_payment, name='add_payment'),
     path('payment/<int:pk>/delete/', views.delete_payment, name='delete_payment'),
     path('invoice/<int:invoice_pk>/add-credit-note/', views.add_credit_note, name='add_credit_note'),
 
+    path('receipts/import/', views.import_receipts, name='import_receipts'),
+
+    path('cashflow/', views.cashflow_overview, name='cashflow'),
+    path('cashflow/series.json', views.cashflow_series_json, name='cashflow_series'),
+
+    path('portfolio/', views.portfolio_analytics, name='portfolio'),
+    path('portfolio/data.json', views.portfolio_analytics_json, name='portfolio_data'),
+
+    path('customer/<int:customer_pk>/statement/', views.customer_statement, name='customer_statement'),
+    path('customer/<int:customer_pk>/statement/pdf/', views.customer_statement_pdf, name='customer_statement_pdf'),
+
     path('export/project-summary/', views.export_project_summary_csv, name='export_project_summary'),
 ]
\ No newline at end of file
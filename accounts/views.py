@@ -2,23 +2,34 @@
 from django.shortcuts import render
 from projects.models import Project # To get global stats
 from invoices.models import Invoice
-from .forms import PaymentForm, CreditNoteForm
+from .forms import PaymentForm, CreditNoteForm, ReceiptImportForm
 from .models import Payment
 from django.shortcuts import get_object_or_404, redirect
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 from users.decorators import admin_required
 from decimal import Decimal
-from django.http import HttpResponse
+from django.http import HttpResponse, JsonResponse
 import csv
+import datetime
 from django.utils import timezone
 
 from django.shortcuts import render
 from django.contrib.auth.decorators import login_required
+from django.core.paginator import Paginator
+from django.db.models import Sum
 from decimal import Decimal
 
 from projects.models import Project
 from users.decorators import admin_required, role_required
+from .cashflow import cashflow_series, default_series_start
+from .analytics import GROUPINGS, portfolio_metrics
+from .receipts import ReceiptImportError, allocate_receipts, parse_receipts_csv
+from .statements import build_statement, render_statement_pdf, statement_filename
+from enquiries.models import Customer
+from core.cache import attach_row_versions
+from core.replica import using_replica
+from projects.signals import PROJECT_ROW_NAMESPACE
 
 @login_required
 @role_required('admin')
@@ -30,40 +41,83 @@ def incoming_payments_list(request):
 
 @login_required
 @role_required('admin')
+@using_replica
 def accounts_dashboard(request):
     """
     Displays a high-level financial overview of all projects, including calculated percentages.
+    The headline figures come from a single aggregate query; the per-project table is
+    loaded separately from project_breakdown so first paint doesn't grow with the project count.
     """
-    all_projects = Project.objects.prefetch_related(
-        'project_items', 'invoices__payments', 'invoices__credit_notes'
-    ).all()
-
-    # --- Calculate Grand Totals ---
-    total_project_value = sum(p.subtotal for p in all_projects)
-    total_amount_invoiced_grand = sum(p.total_invoiced_grand for p in all_projects)
-    total_amount_received = sum(p.total_received for p in all_projects)
-    total_accounts_receivable = sum(p.accounts_receivable for p in all_projects)
+    totals = Project.objects.with_financials().aggregate(
+        total_project_value=Sum('budget_sum'),
+        total_invoiced_subtotal=Sum('invoiced_subtotal_sum'),
+        total_amount_invoiced=Sum('invoiced_grand_sum'),
+        total_amount_received=Sum('received_sum'),
+        total_pending=Sum('receivable_sum'),
+    )
+    totals = {key: value or Decimal(0) for key, value in totals.items()}
 
     # --- Calculate Percentages Safely in Python ---
     invoicing_percentage = 0
-    if total_project_value > 0:
-        total_invoiced_subtotal = sum(p.total_invoiced_subtotal for p in all_projects)
-        invoicing_percentage = (total_invoiced_subtotal / total_project_value) * 100
+    if totals['total_project_value'] > 0:
+        invoicing_percentage = (totals['total_invoiced_subtotal'] / totals['total_project_value']) * 100
 
     payment_percentage = 0
-    if total_amount_invoiced_grand > 0:
-        payment_percentage = (total_amount_received / total_amount_invoiced_grand) * 100
+    if totals['total_amount_invoiced'] > 0:
+        payment_percentage = (totals['total_amount_received'] / totals['total_amount_invoiced']) * 100
 
     context = {
-        'projects': all_projects,
-        'total_project_value': total_project_value,
-        'total_amount_invoiced': total_amount_invoiced_grand,
-        'total_amount_received': total_amount_received,
-        'total_pending': total_accounts_receivable,
+        **totals,
         'invoicing_percentage': invoicing_percentage, # Pass the final number
         'payment_percentage': payment_percentage,   # Pass the final number
     }
     return render(request, 'accounts/dashboard.html', context)
+
+
+# Sortable columns of the per-project breakdown, mapped to the annotated fields
+BREAKDOWN_SORT_FIELDS = {
+    'title': 'title',
+    'customer': 'customer__name',
+    'budget': 'budget_sum',
+    'billed': 'invoiced_grand_sum',
+    'received': 'received_sum',
+    'receivable': 'receivable_sum',
+}
+
+
+@login_required
+@role_required('admin')
+def project_breakdown(request):
+    """
+    HTML fragment with one page of the per-project financial table.
+    Accepts ?sort=<column>, ?dir=asc|desc and ?page=N; every figure comes from SQL annotations.
+    """
+    sort = request.GET.get('sort', 'receivable')
+    if sort not in BREAKDOWN_SORT_FIELDS:
+        sort = 'receivable'
+    direction = 'asc' if request.GET.get('dir') == 'asc' else 'desc'
+    ordering = BREAKDOWN_SORT_FIELDS[sort]
+    if direction == 'desc':
+        ordering = f'-{ordering}'
+
+    projects = Project.objects.with_financials().select_related('customer').order_by(ordering, 'pk')
+    page = Paginator(projects, 25).get_page(request.GET.get('page'))
+    # Rows are cached on the project's version and its figures.
+    page.object_list = attach_row_versions(page.object_list, PROJECT_ROW_NAMESPACE)
+
+    context = {
+        'page': page,
+        'sort': sort,
+        'dir': direction,
+        'columns': [
+            ('title', 'Project / Customer', False),
+            ('budget', 'Budget (ex. VAT)', True),
+            ('billed', 'Billed (inc. VAT)', True),
+            ('received', 'Received', True),
+            ('receivable', 'Receivable', True),
+        ],
+    }
+    return render(request, 'accounts/partials/project_breakdown.html', context)
     
 @login_required
 @role_required('admin')
@@ -85,13 +139,11 @@ def add_payment(request, invoice_pk):
             if float(payment.amount) > amount_due_rounded:
                 messages.error(request, f"Payment amount cannot be greater than the amount due (AED {amount_due_rounded:,.2f}).")
             else:
-                payment.save()
+                payment.save()  # the invoice status is reconciled by accounts/signals.py
                 messages.success(request, f"Payment of {payment.amount:,.2f} recorded successfully for invoice {invoice.invoice_number}.")
 
-                # Automatically update invoice status if fully paid
-                if invoice.amount_due <= 0:
-                    invoice.status = 'PAID'
-                    invoice.save()
+                # No need to re-query the balance to know whether this settled it
+                if amount_due - payment.amount <= 0:
                     messages.info(request, f"Invoice {invoice.invoice_number} is now fully paid.")
 
                 return redirect('invoices:invoice_detail', pk=invoice.pk)
@@ -106,6 +158,36 @@ def add_payment(request, invoice_pk):
     return render(request, 'accounts/payment_form.html', context)
 
 
+@login_required
+@role_required('admin')
+def import_receipts(request):
+    """
+    Bulk receipt import: matches a CSV of bank receipts to open invoices and
+    allocates them oldest-first. Preview by default; unticking 'Preview only'
+    records all payments in one transaction.
+    """
+    result = None
+    if request.method == 'POST':
+        form = ReceiptImportForm(request.POST, request.FILES)
+        if form.is_valid():
+            dry_run = form.cleaned_data['dry_run']
+            try:
+                receipts = parse_receipts_csv(form.cleaned_data['file'])
+                result = allocate_receipts(receipts, dry_run=dry_run)
+            except ReceiptImportError as e:
+                form.add_error('file', str(e))
+            else:
+                result['dry_run'] = dry_run
+                if not dry_run and result['allocations']:
+                    messages.success(request, f"Recorded {len(result['allocations'])} payment(s) totalling AED {result['total_allocated']:,.2f}.")
+                if result['unmatched']:
+                    messages.warning(request, f"{len(result['unmatched'])} line(s) could not be fully allocated.")
+    else:
+        form = ReceiptImportForm()
+
+    return render(request, 'accounts/import_receipts.html', {'form': form, 'result': result})
+
+
 @login_required
 @role_required('admin')
 def delete_payment(request, pk):
@@ -116,15 +198,14 @@ def delete_payment(request, pk):
     if request.method == 'POST':
         amount = payment.amount
         invoice_pk = invoice.pk
+        was_paid = invoice.status == Invoice.InvoiceStatus.PAID
         payment.delete()
         messages.success(request, f'Payment of AED {amount:,.2f} has been deleted.')
 
-        # If invoice was Paid, set back to Sent when there is still amount due
-        invoice.refresh_from_db()
-        if invoice.status == 'PAID' and invoice.amount_due > 0:
-            invoice.status = 'SENT'
-            invoice.save(update_fields=['status'])
-            messages.info(request, 'Invoice status has been set to Sent (no longer fully paid).')
+        # The status was reconciled on delete; tell the user if the invoice re-opened
+        invoice.refresh_from_db(fields=['status'])
+        if was_paid and invoice.status != Invoice.InvoiceStatus.PAID:
+            messages.info(request, f'Invoice status has been set to {invoice.get_status_display()} (no longer fully paid).')
 
         return redirect('invoices:invoice_detail', pk=invoice_pk)
 
@@ -155,13 +236,11 @@ def add_credit_note(request, invoice_pk):
                 messages.error(request, f"Total credit cannot exceed the invoice total. Maximum additional credit allowed is {max_credit:,.2f}.")
             else:
                 credit_note.invoice = invoice
-                credit_note.save()
+                credit_note.save()  # the invoice status is reconciled by accounts/signals.py
                 messages.success(request, f"Credit note {credit_note.credit_note_number} issued successfully against invoice {invoice.invoice_number}.")
                 
-                # Automatically update invoice status if fully paid/credited
-                if invoice.amount_due <= 0:
-                    invoice.status = 'PAID'
-                    invoice.save()
+                invoice.refresh_from_db(fields=['status'])
+                if invoice.status == Invoice.InvoiceStatus.PAID:
                     messages.info(request, f"Invoice {invoice.invoice_number} is now fully paid/credited.")
                     
                 return redirect('invoices:invoice_detail', pk=invoice.pk)
@@ -178,6 +257,7 @@ def add_credit_note(request, invoice_pk):
 # --- ADD THIS NEW VIEW ---
 @login_required
 @role_required('admin')
+@using_replica
 def export_project_summary_csv(request):
     """
     Generates and streams a CSV file of the project financial summary.
@@ -210,4 +290,146 @@ def export_project_summary_csv(request):
             f"{project.accounts_receivable:.2f}"
         ])
         
-    return response
\ No newline at end of file
+    return response
+
+
+@login_required
+@role_required('admin')
+@using_replica
+def cashflow_overview(request):
+    """Monthly or weekly cash-flow chart, read from the pre-aggregated DailyCashflow table."""
+    period = 'week' if request.GET.get('period') == 'week' else 'month'
+    start = default_series_start(period, timezone.now().date())
+    series = cashflow_series(period, start=start)
+
+    # Scale each bar against the largest bucket so the chart fits the page
+    peak = max([max(row['invoiced'], row['received']) for row in series] or [0])
+    for row in series:
+        row['invoiced_pct'] = (row['invoiced'] / peak * 100) if peak else 0
+        row['received_pct'] = (row['received'] / peak * 100) if peak else 0
+
+    context = {
+        'series': series,
+        'period': period,
+        'start': start,
+        'total_invoiced': sum(row['invoiced'] for row in series),
+        'total_received': sum(row['received'] for row in series),
+        'total_credited': sum(row['credited'] for row in series),
+    }
+    return render(request, 'accounts/cashflow.html', context)
+
+
+@login_required
+@role_required('admin')
+@using_replica
+def cashflow_series_json(request):
+    """JSON feed of the cash-flow series for charts. Accepts ?period=month|week&from=YYYY-MM-DD&to=YYYY-MM-DD."""
+    period = 'week' if request.GET.get('period') == 'week' else 'month'
+    try:
+        start = datetime.date.fromisoformat(request.GET['from']) if request.GET.get('from') else default_series_start(period, timezone.now().date())
+        end = datetime.date.fromisoformat(request.GET['to']) if request.GET.get('to') else None
+    except ValueError:
+        return JsonResponse({'error': 'Dates must be in YYYY-MM-DD format.'}, status=400)
+
+    series = [
+        {
+            'period': row['period'].isoformat(),
+            'invoiced': str(row['invoiced']),
+            'received': str(row['received']),
+            'credited': str(row['credited']),
+        }
+        for row in cashflow_series(period, start=start, end=end)
+    ]
+    return JsonResponse({'period': period, 'series': series})
+
+
+
+def _statement_period(request):
+    """Reads ?from= / ?to= (YYYY-MM-DD), defaulting to the start of the year through today."""
+    today = timezone.now().date()
+    try:
+        start = datetime.date.fromisoformat(request.GET['from']) if request.GET.get('from') else today.replace(month=1, day=1)
+        end = datetime.date.fromisoformat(request.GET['to']) if request.GET.get('to') else today
+    except ValueError:
+        start, end = today.replace(month=1, day=1), today
+    if start > end:
+        start, end = end, start
+    return start, end
+
+
+@login_required
+@role_required('admin')
+@using_replica
+def customer_statement(request, customer_pk):
+    """Statement of account for one customer: every invoice, payment and credit note with a running balance."""
+    customer = get_object_or_404(Customer, pk=customer_pk)
+    start, end = _statement_period(request)
+    context = {'statement': build_statement(customer, start, end), 'customer': customer}
+    return render(request, 'accounts/customer_statement.html', context)
+
+
+@login_required
+@role_required('admin')
+@using_replica
+def customer_statement_pdf(request, customer_pk):
+    """PDF version of the customer statement for the same date range."""
+    customer = get_object_or_404(Customer, pk=customer_pk)
+    start, end = _statement_period(request)
+    statement = build_statement(customer, start, end)
+    response = HttpResponse(render_statement_pdf(statement), content_type='application/pdf')
+    response['Content-Disposition'] = f'attachment; filename="{statement_filename(statement)}"'
+    return response
+
+
+
+def _portfolio_filters(request):
+    """Reads the portfolio filters from the query string, dropping anything malformed."""
+    filters = {}
+    status = request.GET.get('status', '').strip()
+    if status in Project.ProjectStatus.values:
+        filters['status'] = status
+    customer = request.GET.get('customer', '').strip()
+    if customer.isdigit():
+        filters['customer'] = int(customer)
+    for name in ('mobilized_from', 'mobilized_to'):
+        try:
+            if request.GET.get(name):
+                filters[name] = datetime.date.fromisoformat(request.GET[name])
+        except ValueError:
+            pass
+    return filters
+
+
+@login_required
+@role_required('admin')
+def portfolio_analytics(request):
+    """Invoicing and collection percentages across the portfolio, grouped by customer, status or mobilization month."""
+    group_by = request.GET.get('group', 'customer')
+    if group_by not in GROUPINGS:
+        group_by = 'customer'
+    filters = _portfolio_filters(request)
+    context = {
+        'rows': portfolio_metrics(group_by, filters),
+        'group_by': group_by,
+        'group_label': GROUPINGS[group_by][1],
+        'groupings': [(key, label) for key, (_, label) in GROUPINGS.items()],
+        'filters': filters,
+        'status_choices': Project.ProjectStatus.choices,
+        'customers': Customer.objects.filter(projects__isnull=False).distinct().order_by('name'),
+    }
+    return render(request, 'accounts/portfolio.html', context)
+
+
+@login_required
+@role_required('admin')
+def portfolio_analytics_json(request):
+    """JSON version of portfolio_analytics; accepts the same query parameters."""
+    group_by = request.GET.get('group', 'customer')
+    if group_by not in GROUPINGS:
+        return JsonResponse({'error': f"group must be one of: {', '.join(GROUPINGS)}"}, status=400)
+    filters = _portfolio_filters(request)
+    return JsonResponse({
+        'group': group_by,
+        'filters': {key: str(value) for key, value in filters.items()},
+        'rows': portfolio_metrics(group_by, filters),
+    })
@@ -0,0 +1,150 @@
+# core/archive.py
+"""
+Archival of closed projects' history.
+
+Daily/weekly progress, DPRs and the DPR logs of a project that has been
+completed or cancelled for ARCHIVE_PROJECTS_AFTER_DAYS are moved out of the
+hot tables into archive tables with the same columns (and the same ids), by
+the `archive_projects` command. Active projects' pages then only ever touch
+the hot tables, which stay the size of the work in progress.
+
+Each archive table is declared next to its model with archive_model(), which
+copies the model's fields, so a new column shows up in both tables with the
+same migration. Reads stay transparent through the model's HistoryManager:
+
+    DailyReport.objects.for_project(project)   # from whichever table holds them
+    get_history_or_404(DailyReport, pk=pk)     # links to an archived row keep working
+
+Archived history is read-only. Reopening the project (any status other than
+Completed / Cancelled) moves it back (projects/signals.py).
+"""
+from contextvars import ContextVar
+
+from django.db import models, transaction
+from django.http import Http404
+from django.shortcuts import get_object_or_404
+from django.utils import timezone
+
+BATCH_SIZE = 2000
+
+ARCHIVED_READ_ONLY = "This project's history is archived and read-only. Reopen the project to change it."
+
+# hot model -> archive model, in declaration order: parents before the rows that point at them
+_archives = {}
+
+_moving = ContextVar('archive_moving', default=False)
+
+
+class HistoryManager(models.Manager):
+    """Default manager for a model with an archive table."""
+
+    def __init__(self, project_lookup='project'):
+        super().__init__()
+        self.project_lookup = project_lookup
+
+    def for_project(self, project):
+        """The project's rows, from the archive table once the project is archived."""
+        model = _archives[self.model] if project.archived_at else self.model
+        return model._default_manager.filter(**{self.project_lookup: project})
+
+
+def archive_model(model, name, parents=None, bases=()):
+    """
+    Declares the archive model for `model`: the same concrete fields, with a
+    plain primary key that keeps the row's id. `parents` maps foreign keys
+    to archive models they should point at instead (the DPR logs' report);
+    those keep their related_name, other foreign keys get no reverse accessor.
+    Fields provided by `bases` (abstract mixins) are not copied.
+    """
+    parents = parents or {}
+    inherited = {field.name for base in bases for field in base._meta.local_fields}
+    attrs = {
+        '__module__': model.__module__,
+        '__str__': model.__str__,
+        'Meta': type('Meta', (), {
+            'ordering': model._meta.ordering,
+            'verbose_name': f'archived {model._meta.verbose_name}',
+        }),
+    }
+    for field in model._meta.concrete_fields:
+        if field.name in inherited:
+            continue
+        if field.primary_key:
+            attrs[field.name] = (models.BigIntegerField if isinstance(field, models.BigAutoField) else models.IntegerField)(primary_key=True)
+        elif field.is_relation:
+            # Built by hand: deconstruct() needs the app registry for swappable targets (users.User).
+            attrs[field.name] = models.ForeignKey(
+                parents.get(field.name, field.remote_field.model),
+                on_delete=field.remote_field.on_delete,
+                related_name=field.remote_field.related_name if field.name in parents else '+',
+                null=field.null, blank=field.blank,
+            )
+        else:
+            _, _, args, kwargs = field.deconstruct()
+            attrs[field.name] = type(field)(*args, **kwargs)
+
+    archive = type(name, bases or (models.Model,), attrs)
+    _archives[model] = archive
+    return archive
+
+
+def is_moving():
+    """True while rows that were just copied to the other table are being deleted."""
+    return _moving.get()
+
+
+def get_history_or_404(queryset, **lookup):
+    """get_object_or_404() that falls back to the archive table of the queryset's model."""
+    try:
+        return get_object_or_404(queryset, **lookup)
+    except Http404:
+        model = queryset if isinstance(queryset, type) else queryset.model
+        return get_object_or_404(_archives[model], **lookup)
+
+
+def _copy(rows, target):
+    """Inserts the `values()` rows into `target` in batches; returns how many."""
+    batch, count = [], 0
+    for row in rows.iterator(chunk_size=BATCH_SIZE):
+        batch.append(target(**row))
+        if len(batch) == BATCH_SIZE:
+            target._default_manager.bulk_create(batch)
+            count += len(batch)
+            batch = []
+    target._default_manager.bulk_create(batch)
+    return count + len(batch)
+
+
+def _move(project, to_archive):
+    """Moves every archived table's rows for `project` one way or the other; returns {table: rows}."""
+    steps = []
+    for hot, archive in _archives.items():
+        source, target = (hot, archive) if to_archive else (archive, hot)
+        steps.append((source._default_manager.filter(**{hot._default_manager.project_lookup: project}), target))
+    moved = {}
+    with transaction.atomic():
+        for rows, target in steps:
+            columns = [field.attname for field in target._meta.concrete_fields]
+            moved[rows.model._meta.verbose_name] = _copy(rows.values(*columns), target)
+        # Children first, so there is nothing left to cascade to. The rows, and
+        # the files they refer to, live on in the other table: the file-release
+        # receivers (core/signals.py) check is_moving() and leave them alone.
+        token = _moving.set(True)
+        try:
+            for rows, _ in reversed(steps):
+                rows.delete()
+        finally:
+            _moving.reset(token)
+        project.archived_at = timezone.now() if to_archive else None
+        project.save(update_fields=['archived_at'])
+    return moved
+
+
+def archive_project(project):
+    """Moves the project's history into the archive tables."""
+    return _move(project, to_archive=True)
+
+
+def restore_project(project):
+    """Moves an archived project's history back into the hot tables."""
+    return _move(project, to_archive=False)
@@ -0,0 +1,166 @@
+# core/cache.py
+"""
+Shared helpers for the named caches configured in settings.CACHES:
+
+    default    - general use
+    sessions   - the cached_db session store
+    fragments  - rendered template fragments
+    pdfs       - generated PDF bytes
+    counters   - dashboard counts and the namespace versions below
+
+Cached values are grouped into namespaces ('portfolio', 'invoice-row', ...)
+whose keys carry a version number. Bumping a namespace's version (by hand
+with bump_version, or automatically with invalidate_on_change when one of
+its models is saved or deleted) makes every old key unreachable at once;
+the stale entries simply expire. That works the same on the file, database
+and Redis backends, none of which can delete by prefix portably.
+
+Rows of long lists get a version per object instead ('invoice-row-12'), so
+a change to one invoice re-renders only its own row; attach_row_versions
+fetches the versions for a whole page in one round trip.
+"""
+import hashlib
+import re
+import time
+
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from django.core.cache.utils import make_template_fragment_key
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+
+DEFAULT = 'default'
+SESSIONS = 'sessions'
+FRAGMENTS = 'fragments'
+PDFS = 'pdfs'
+COUNTERS = 'counters'
+
+_VERSION_KEY = 'ns-version:{}'
+_SAFE_KEY = re.compile(r'^[\w.:-]*$')
+
+
+def _fresh_version():
+    # A version counter can be evicted; restarting from the clock rather than 1
+    # guarantees keys written under an old number are never read again.
+    return int(time.time() * 1000)
+
+
+def get_version(namespace):
+    counters = caches[COUNTERS]
+    key = _VERSION_KEY.format(namespace)
+    version = counters.get(key)
+    if version is None:
+        counters.add(key, _fresh_version(), timeout=None)
+        version = counters.get(key)
+    return version
+
+
+def bump_version(namespace):
+    """
+    Invalidates every key in `namespace`.
+
+    incr() is atomic on Redis and Memcached, but the file and database backends
+    do a get and a set: two bumps racing each other can both land on the same
+    new number, so a value computed between them may outlive the second change
+    until it expires. Give the counters cache an atomic backend in production.
+    """
+    counters = caches[COUNTERS]
+    key = _VERSION_KEY.format(namespace)
+    try:
+        return counters.incr(key)
+    except ValueError:  # not set yet, or evicted
+        counters.add(key, _fresh_version(), timeout=None)
+        return counters.get(key)
+
+
+def versioned_key(namespace, *parts):
+    """'<namespace>:v<version>:<parts>', with the parts hashed if they're long or contain spaces etc."""
+    tail = ':'.join(str(part) for part in parts)
+    if len(tail) > 150 or not _SAFE_KEY.match(tail):
+        tail = hashlib.md5(tail.encode()).hexdigest()
+    return f"{namespace}:v{get_version(namespace)}:{tail}"
+
+
+def get_or_compute(namespace, parts, compute, timeout=DEFAULT_TIMEOUT, cache_name=DEFAULT):
+    """Returns the cached value for (namespace, parts), computing and storing it on a miss."""
+    cache = caches[cache_name]
+    key = versioned_key(namespace, *parts)
+    value = cache.get(key)
+    if value is None:
+        value = compute()
+        cache.set(key, value, timeout)
+    return value
+
+
+def invalidate_on_change(namespace, *models):
+    """Bumps `namespace` whenever an instance of one of `models` is saved or deleted (after commit)."""
+    def receiver(sender, **kwargs):
+        transaction.on_commit(lambda: bump_version(namespace))
+
+    for model in models:
+        # weak=False: the closure would otherwise be garbage-collected straight away.
+        post_save.connect(receiver, sender=model, weak=False, dispatch_uid=f'cache-{namespace}-save-{model._meta.label}')
+        post_delete.connect(receiver, sender=model, weak=False, dispatch_uid=f'cache-{namespace}-delete-{model._meta.label}')
+
+
+def object_namespace(namespace, pk):
+    return f'{namespace}-{pk}'
+
+
+def attach_row_versions(objects, namespace, attr='row_version'):
+    """
+    Sets `obj.<attr>` to the current version of each object in `namespace`, for
+    use in a {% cache %} key. One get_many for the whole list.
+    """
+    objects = list(objects)
+    counters = caches[COUNTERS]
+    keys = {obj.pk: _VERSION_KEY.format(object_namespace(namespace, obj.pk)) for obj in objects}
+    found = counters.get_many(keys.values())
+    missing = {key: _fresh_version() for key in keys.values() if key not in found}
+    if missing:
+        counters.set_many(missing, timeout=None)
+    for obj in objects:
+        key = keys[obj.pk]
+        setattr(obj, attr, found.get(key, missing.get(key)))
+    return objects
+
+
+def uncached_fragments(objects, fragment_name, vary_on):
+    """
+    The objects whose {% cache ... fragment_name <vary_on(obj)> using="fragments" %}
+    block is not cached, so a view can load what the block needs for those rows only.
+    """
+    keys = {make_template_fragment_key(fragment_name, vary_on(obj)): obj for obj in objects}
+    cached = caches[FRAGMENTS].get_many(keys)
+    return [obj for key, obj in keys.items() if key not in cached]
+
+
+def bump_object_versions(namespace, pks):
+    for pk in set(pks):
+        if pk is not None:
+            bump_version(object_namespace(namespace, pk))
+
+
+def invalidate_objects_on_change(namespace, model, get_pks, m2m_through=None):
+    """
+    Bumps the per-object versions in `namespace` returned by `get_pks(instance)`
+    whenever an instance of `model` is saved or deleted (or, with m2m_through,
+    whenever that many-to-many relation changes; get_pks then receives the
+    signal's kwargs). A clear() has no pk_set, so get_pks is called for it on
+    pre_clear, while the links it removes can still be read.
+    """
+    def receiver(sender, instance, **kwargs):
+        if m2m_through is not None:
+            if kwargs['action'] not in ('post_add', 'post_remove', 'pre_clear'):
+                return
+            pks = list(get_pks(instance=instance, **kwargs))
+        else:
+            pks = list(get_pks(instance))
+        transaction.on_commit(lambda: bump_object_versions(namespace, pks))
+
+    uid = f'cache-rows-{namespace}-{model._meta.label}'
+    if m2m_through is not None:
+        m2m_changed.connect(receiver, sender=m2m_through, weak=False, dispatch_uid=f'{uid}-m2m')
+        return
+    post_save.connect(receiver, sender=model, weak=False, dispatch_uid=f'{uid}-save')
+    post_delete.connect(receiver, sender=model, weak=False, dispatch_uid=f'{uid}-delete')
@@ -0,0 +1,14 @@
+# core/checks.py
+from django.core.checks import Error, Tags, register
+
+from .template_warmup import compile_templates
+
+
+# Compiling every template is too slow for each manage.py command, so this only
+# runs with `manage.py check --deploy`; workers compile them at startup anyway.
+@register(Tags.templates, deploy=True)
+def check_template_syntax(app_configs, **kwargs):
+    return [
+        Error(f"Template syntax error in {name}: {exc}", id='core.E001')
+        for name, exc in compile_templates()
+    ]
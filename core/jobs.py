@@ -0,0 +1,92 @@
+# core/jobs.py
+"""
+A small database-backed job queue for work too slow for a request (long DPR
+books, photo optimisation).
+
+    enqueue('reports.books.compile_book', project_pk=3, ...)   # returns the Job
+
+The Job row is written in the caller's transaction, so a job is only queued
+if the change that asked for it commits. `manage.py run_jobs` is the worker:
+a separate, long-running process (one or more, under systemd or similar)
+that claims queued jobs oldest first, imports the task by its dotted path
+and calls it with the job's kwargs. Web workers never run jobs themselves,
+so recycling one can't lose a job half-way.
+
+A task returns a JSON-serialisable dict, stored as the job's result. Files
+a job produces for download go in `job_storage` (JOB_FILES_ROOT, a plain
+directory outside the deduplicated media storage, shared by web and worker
+hosts) under result['file']; they are deleted with the job after JOB_TTL.
+"""
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+from django.utils.functional import LazyObject
+from django.utils.module_loading import import_string
+
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+# Finished jobs and their files are kept this long.
+JOB_TTL = timedelta(hours=24)
+# A job still running after this was cut short (its worker died or was killed).
+JOB_TIMEOUT = timedelta(hours=1)
+
+
+class _JobStorage(LazyObject):
+    def _setup(self):
+        self._wrapped = FileSystemStorage(location=settings.JOB_FILES_ROOT)
+
+
+job_storage = _JobStorage()
+
+
+def enqueue(task, **kwargs):
+    """Queues `task` (a dotted path to a function) to be called with `kwargs` by the worker."""
+    return Job.objects.create(task=task, kwargs=kwargs)
+
+
+def claim_next():
+    """Marks the oldest queued job as running and returns it, or None. Safe with several workers."""
+    with transaction.atomic():
+        job = Job.objects.select_for_update(skip_locked=True).filter(status=Job.Status.QUEUED).order_by('created_at').first()
+        if job is None:
+            return None
+        job.status = Job.Status.RUNNING
+        job.started_at = timezone.now()
+        job.save(update_fields=['status', 'started_at'])
+    return job
+
+
+def run_job(job):
+    """Runs a claimed job and records its result or error."""
+    try:
+        result = import_string(job.task)(**job.kwargs)
+    except Exception as exc:
+        logger.exception("Job %s (%s) failed", job.pk, job.task)
+        job.status, job.error = Job.Status.FAILED, str(exc) or type(exc).__name__
+    else:
+        job.status, job.result = Job.Status.DONE, result or {}
+    job.finished_at = timezone.now()
+    job.save(update_fields=['status', 'result', 'error', 'finished_at'])
+    close_old_connections()
+
+
+def fail_abandoned():
+    """Fails jobs whose worker died mid-run; returns how many."""
+    return Job.objects.filter(status=Job.Status.RUNNING, started_at__lt=timezone.now() - JOB_TIMEOUT).update(
+        status=Job.Status.FAILED, error="The job was interrupted.", finished_at=timezone.now(),
+    )
+
+
+def purge_expired():
+    """Deletes jobs finished more than JOB_TTL ago, and their files; returns how many."""
+    expired = Job.objects.filter(finished_at__lt=timezone.now() - JOB_TTL)
+    for result in expired.exclude(result={}).values_list('result', flat=True).iterator():
+        if result.get('file'):
+            job_storage.delete(result['file'])
+    return expired.delete()[0]
@@ -0,0 +1,58 @@
+# core/management/commands/archive_projects.py
+import datetime
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from core.archive import archive_project, restore_project
+from projects.models import Project
+
+
+class Command(BaseCommand):
+    help = (
+        "Moves the daily / weekly progress, DPRs and DPR logs of projects completed or cancelled "
+        "more than ARCHIVE_PROJECTS_AFTER_DAYS ago into the archive tables. Safe to run repeatedly; "
+        "schedule it nightly."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=None,
+                            help="Archive projects closed more than this many days ago (default ARCHIVE_PROJECTS_AFTER_DAYS).")
+        parser.add_argument('--project', type=int, action='append', default=[],
+                            help="Only this project (by id; repeatable). Still has to be closed.")
+        parser.add_argument('--restore', action='store_true',
+                            help="Move the given --project(s) back into the hot tables instead. Closed ones are "
+                                 "archived again by the next run; reopening a project restores it for good.")
+        parser.add_argument('--dry-run', action='store_true', help="List the projects without moving anything.")
+
+    def handle(self, *args, **options):
+        if options['restore']:
+            if not options['project']:
+                raise CommandError("--restore needs at least one --project.")
+            projects = Project.objects.filter(pk__in=options['project'], archived_at__isnull=False)
+            action, verb = restore_project, "Restored"
+        else:
+            days = settings.ARCHIVE_PROJECTS_AFTER_DAYS if options['days'] is None else options['days']
+            projects = Project.objects.filter(
+                status__in=Project.CLOSED_STATUSES,
+                closed_at__lte=timezone.now() - datetime.timedelta(days=days),
+                archived_at__isnull=True,
+            )
+            if options['project']:
+                projects = projects.filter(pk__in=options['project'])
+            action, verb = archive_project, "Archived"
+
+        count = 0
+        for project in projects.order_by('closed_at'):
+            if options['dry_run']:
+                self.stdout.write(f"{project.pk}: {project.title}")
+                continue
+            moved = action(project)
+            self.stdout.write(f"{project.pk}: {project.title}: " + ", ".join(f"{table} {rows}" for table, rows in moved.items()))
+            count += 1
+
+        if options['dry_run']:
+            self.stdout.write(self.style.SUCCESS("Dry run, nothing moved."))
+        else:
+            self.stdout.write(self.style.SUCCESS(f"{verb} {count} project(s)."))
@@ -0,0 +1,84 @@
+# core/management/commands/db_connection_benchmark.py
+import statistics
+import time
+
+from django.core.signals import request_finished, request_started
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.backends.signals import connection_created
+
+
+def _simulate(alias, requests, conn_max_age, query):
+    """
+    Runs `requests` request cycles (request_started, one query, request_finished,
+    which is where Django closes or keeps the connection) with the given
+    CONN_MAX_AGE. Returns (per-request seconds, connections opened).
+    """
+    connection = connections[alias]
+    connection.close()
+    saved = connection.settings_dict['CONN_MAX_AGE']
+    connection.settings_dict['CONN_MAX_AGE'] = conn_max_age
+    opened = 0
+
+    def count(sender, connection, **kwargs):
+        nonlocal opened
+        if connection.alias == alias:
+            opened += 1
+
+    connection_created.connect(count)
+    timings = []
+    try:
+        for _ in range(requests):
+            started = time.perf_counter()
+            request_started.send(sender=None, environ={})
+            with connection.cursor() as cursor:
+                cursor.execute(query)
+                cursor.fetchall()
+            request_finished.send(sender=None)
+            timings.append(time.perf_counter() - started)
+    finally:
+        connection_created.disconnect(count)
+        connection.close()
+        connection.settings_dict['CONN_MAX_AGE'] = saved
+    return timings, opened
+
+
+class Command(BaseCommand):
+    help = (
+        "Measures what a new database connection per request costs: runs simulated request "
+        "cycles with CONN_MAX_AGE=0 and with the configured value, and compares them."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200, help="Request cycles per run (default 200).")
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS, help="Database alias (default 'default').")
+        parser.add_argument('--conn-max-age', type=int, default=None,
+                            help="CONN_MAX_AGE for the persistent run (default: the configured value, or 60 if that is 0).")
+
+    def handle(self, *args, **options):
+        alias = options['database']
+        settings_dict = connections[alias].settings_dict
+        persistent_age = options['conn_max_age']
+        if persistent_age is None:
+            persistent_age = settings_dict['CONN_MAX_AGE'] or 60
+        self.stdout.write(
+            f"{settings_dict['ENGINE']} {settings_dict.get('HOST') or ''} {settings_dict['NAME']}, "
+            f"CONN_HEALTH_CHECKS={settings_dict['CONN_HEALTH_CHECKS']}, {options['requests']} requests per run"
+        )
+
+        results = {}
+        for label, age in (('CONN_MAX_AGE=0', 0), (f'CONN_MAX_AGE={persistent_age}', persistent_age)):
+            _simulate(alias, 5, age, 'SELECT 1')  # warm up
+            timings, opened = _simulate(alias, options['requests'], age, 'SELECT 1')
+            ms = sorted(t * 1000 for t in timings)
+            results[label] = statistics.mean(ms)
+            self.stdout.write(
+                f"  {label:<18} mean {statistics.mean(ms):7.3f} ms  median {statistics.median(ms):7.3f} ms  "
+                f"p95 {ms[int(len(ms) * 0.95) - 1]:7.3f} ms  connections opened {opened}"
+            )
+
+        before, after = results.values()
+        self.stdout.write(self.style.SUCCESS(
+            f"Connection overhead per request: {before - after:.3f} ms ({before / after:.1f}x slower without reuse)."
+            if after else "No measurable difference."
+        ))
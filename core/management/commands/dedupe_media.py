@@ -0,0 +1,41 @@
+# core/management/commands/dedupe_media.py
+import os
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand, CommandError
+
+from core.models import StoredFile
+from core.storage import BLOB_DIR, DedupFileSystemStorage
+
+
+class Command(BaseCommand):
+    help = (
+        "Moves media files saved before deduplication into the content-addressed blob store. "
+        "Names (and so URLs) don't change; duplicate copies are removed."
+    )
+
+    def handle(self, *args, **options):
+        if not isinstance(default_storage, DedupFileSystemStorage):
+            raise CommandError("The default storage isn't core.storage.DedupFileSystemStorage.")
+
+        root = str(settings.MEDIA_ROOT)
+        adopted = duplicates = freed = 0
+        for dirpath, dirnames, filenames in os.walk(root):
+            if dirpath == root and BLOB_DIR in dirnames:
+                dirnames.remove(BLOB_DIR)
+            for filename in filenames:
+                full_path = os.path.join(dirpath, filename)
+                name = os.path.relpath(full_path, root).replace(os.sep, '/')
+                if StoredFile.objects.filter(name=name).exists():
+                    continue
+                size = os.path.getsize(full_path)
+                if default_storage.adopt(name):
+                    duplicates += 1
+                    freed += size
+                adopted += 1
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Moved {adopted} file(s) into the blob store; {duplicates} were duplicates "
+            f"({freed / (1024 * 1024):,.1f} MB freed)."
+        ))
@@ -0,0 +1,76 @@
+# core/management/commands/importtime.py
+import os
+import re
+import subprocess
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+# What a worker does before it can serve: set Django up and load the URLconf
+# (which imports every app's views). Run in a fresh interpreter each time.
+STARTUP_SNIPPET = """
+import sys
+import django
+django.setup()
+from django.urls import get_resolver
+get_resolver().url_patterns
+print(','.join(sorted(name for name in {heavy!r} if name in sys.modules)))
+"""
+
+# Only needed to render PDFs / process images; none of them should load at startup.
+HEAVY_MODULES = ('httpx', 'numpy', 'PIL', 'reportlab')
+
+_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$')
+
+
+def _measure():
+    """(wall seconds, {top-level module: cumulative µs}, loaded heavy modules) for one cold start."""
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE='')
+    env.setdefault('DJANGO_SETTINGS_MODULE', 'curvacraft.settings')
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', STARTUP_SNIPPET.format(heavy=HEAVY_MODULES)],
+        capture_output=True, text=True, env=env,
+    )
+    wall = time.perf_counter() - started
+    if result.returncode:
+        raise CommandError(f"Startup failed:\n{result.stderr[-2000:]}")
+    top_level = {}
+    for line in result.stderr.splitlines():
+        match = _LINE.match(line)
+        if match and len(match.group(3)) == 1:  # one space of indent = imported directly, not as a dependency
+            top_level[match.group(4)] = int(match.group(2))
+    heavy = [name for name in result.stdout.strip().split(',') if name]
+    return wall, top_level, heavy
+
+
+class Command(BaseCommand):
+    help = (
+        "Measures process start-up (django.setup() plus the URLconf) with `python -X importtime` "
+        "and fails if it exceeds the budget or loads the PDF / imaging libraries."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--runs', type=int, default=5, help="Cold starts to measure; the fastest counts (default 5).")
+        parser.add_argument('--budget', type=int, default=500, help="Maximum import time in milliseconds (default 500).")
+        parser.add_argument('--top', type=int, default=10, help="How many of the slowest imports to list (default 10).")
+
+    def handle(self, *args, **options):
+        runs = [_measure() for _ in range(max(options['runs'], 1))]
+        wall, top_level, heavy = min(runs, key=lambda run: sum(run[1].values()))
+        total_ms = sum(top_level.values()) / 1000
+
+        self.stdout.write(f"Slowest top-level imports (best of {len(runs)} runs):")
+        for name, micros in sorted(top_level.items(), key=lambda item: -item[1])[:options['top']]:
+            self.stdout.write(f"  {micros / 1000:>8.1f} ms  {name}")
+        self.stdout.write(f"Import time {total_ms:.0f} ms, process wall time {wall * 1000:.0f} ms (budget {options['budget']} ms).")
+
+        problems = []
+        if heavy:
+            problems.append(f"loaded at start-up: {', '.join(heavy)} (import them inside the code that needs them)")
+        if total_ms > options['budget']:
+            problems.append(f"import time {total_ms:.0f} ms is over the {options['budget']} ms budget")
+        if problems:
+            raise CommandError('; '.join(problems))
+        self.stdout.write(self.style.SUCCESS("Within budget."))
@@ -0,0 +1,77 @@
+# core/management/commands/media_gc.py
+import os
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+
+from core.media_gc import new_usage, owner_key, owner_labels, scan
+
+
+def _size(size):
+    for unit in ('bytes', 'KB', 'MB'):
+        if size < 1024:
+            return f"{size:,.0f} {unit}" if unit == 'bytes' else f"{size:,.1f} {unit}"
+        size /= 1024
+    return f"{size:,.1f} GB"
+
+
+class Command(BaseCommand):
+    help = (
+        "Reports (or with --delete removes) uploaded files that no record refers to any more, "
+        "and prints storage used per project / PO."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--delete', action='store_true', help="Delete the orphaned files instead of just listing them.")
+        parser.add_argument('--min-age', type=int, default=24, help="Ignore files newer than this many hours (default 24).")
+        parser.add_argument('--quiet-orphans', action='store_true', help="Don't list orphans one by one, only the totals.")
+
+    def handle(self, *args, **options):
+        usage = new_usage()
+        orphan_names, orphan_blobs = [], []
+        orphaned_bytes = physical_bytes = 0
+
+        for kind, name, size, orphaned in scan(timedelta(hours=options['min_age'])):
+            if kind == 'blob':
+                physical_bytes += size
+                if orphaned:
+                    orphan_blobs.append(name)
+                    orphaned_bytes += size
+            else:
+                row = usage[owner_key(name)]
+                row['files'] += 1
+                row['bytes'] += size
+                if orphaned:
+                    row['orphaned_bytes'] += size
+                    orphan_names.append(name)
+                    orphaned_bytes += size
+            if orphaned and not options['quiet_orphans']:
+                self.stdout.write(f"orphan: {name} ({_size(size)})")
+
+        labels = owner_labels(usage.keys())
+        self.stdout.write("\nStorage by owner (logical size; identical files are stored once):")
+        for key, row in sorted(usage.items(), key=lambda item: -item[1]['bytes']):
+            orphaned = f", {_size(row['orphaned_bytes'])} orphaned" if row['orphaned_bytes'] else ""
+            self.stdout.write(f"  {labels[key]:<50} {row['files']:>7} file(s) {_size(row['bytes']):>12}{orphaned}")
+        total_bytes = sum(row['bytes'] for row in usage.values())
+        self.stdout.write(f"  {'Total':<50} {sum(row['files'] for row in usage.values()):>7} file(s) {_size(total_bytes):>12}")
+        if physical_bytes:
+            self.stdout.write(f"  Deduplicated blobs on disk: {_size(physical_bytes)}")
+
+        count = len(orphan_names) + len(orphan_blobs)
+        if not options['delete']:
+            self.stdout.write(self.style.WARNING(
+                f"\n{count} orphaned file(s), {_size(orphaned_bytes)}. Run with --delete to remove them."
+            ) if count else self.style.SUCCESS("\nNo orphaned files."))
+            return
+
+        for name in orphan_names:
+            default_storage.delete(name)  # with deduplication, only releases the blob once unused
+        for name in orphan_blobs:
+            try:
+                os.remove(os.path.join(settings.MEDIA_ROOT, name))
+            except FileNotFoundError:
+                pass
+        self.stdout.write(self.style.SUCCESS(f"\nDeleted {count} orphaned file(s), {_size(orphaned_bytes)}."))
@@ -0,0 +1,30 @@
+# core/management/commands/run_jobs.py
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.jobs import claim_next, fail_abandoned, purge_expired, run_job
+
+
+class Command(BaseCommand):
+    help = (
+        "Runs queued background jobs (DPR books, photo optimisation). Keep at least one running "
+        "alongside the web workers, e.g. as a systemd service; several may run at once."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--interval', type=float, default=2.0, help="Seconds to wait when the queue is empty.")
+        parser.add_argument('--once', action='store_true', help="Run what is queued now, then exit (for cron or tests).")
+
+    def handle(self, *args, **options):
+        while True:
+            fail_abandoned()
+            purge_expired()
+            ran = 0
+            while job := claim_next():
+                run_job(job)
+                ran += 1
+            if options['once']:
+                self.stdout.write(self.style.SUCCESS(f"Ran {ran} job(s)."))
+                return
+            time.sleep(options['interval'])
@@ -0,0 +1,126 @@
+# core/media.py
+"""
+Access rules and responses for uploaded media (see core.views.protected_media).
+
+Files are authorised by the top-level folder their upload_to puts them in:
+
+    po_<id>/       PO documents    -> the roles allowed into the PO views
+    project_<id>/  progress files  -> admins and the project's assigned SCOs
+    anything else                  -> admins only
+
+Once allowed, the transfer is handed to the front-end server when
+MEDIA_SERVE_MODE is 'accel' (nginx X-Accel-Redirect) or 'sendfile'
+(Apache/lighttpd X-Sendfile), so no worker is tied up streaming the file.
+Without one, Django streams it itself with HTTP Range support, which is
+what local development uses.
+"""
+import mimetypes
+import os
+import posixpath
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseNotModified, StreamingHttpResponse
+from django.utils.http import http_date
+from django.views.static import was_modified_since
+
+from projects.models import Project
+
+PO_DOCUMENT_ROLES = ('admin', 'staff')  # same as @role_required on the purchase_orders views
+STREAM_CHUNK_SIZE = 64 * 1024
+
+_OWNER_DIR = re.compile(r'^(po|project)_(\d+)$')
+_RANGE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+def clean_media_path(path):
+    """Normalised storage name for a URL path, or None if it tries to leave MEDIA_ROOT."""
+    name = posixpath.normpath(path).lstrip('/')
+    if not name or name == '.' or name.startswith('../') or name == '..':
+        return None
+    return name
+
+
+def can_access(user, name):
+    if not user.is_authenticated:
+        return False
+    if user.role == 'admin':
+        return True
+    match = _OWNER_DIR.match(name.split('/', 1)[0])
+    if match is None:
+        return False
+    kind, pk = match.group(1), int(match.group(2))
+    if kind == 'po':
+        return user.role in PO_DOCUMENT_ROLES
+    return Project.objects.filter(pk=pk, assigned_scos=user).exists()
+
+
+def _parse_range(header, size):
+    """(start, end) inclusive for a single 'bytes=' range; None if absent/unsupported; False if unsatisfiable."""
+    match = _RANGE.match(header.strip()) if header else None
+    if match is None:
+        return None
+    first, last = match.groups()
+    if first == '' and last == '':
+        return None
+    if first == '':  # suffix range: the last N bytes
+        length = int(last)
+        if length == 0:
+            return False
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        return False
+    return start, end
+
+
+def _stream(path, start, length):
+    with open(path, 'rb') as f:
+        f.seek(start)
+        while length > 0:
+            piece = f.read(min(STREAM_CHUNK_SIZE, length))
+            if not piece:
+                break
+            length -= len(piece)
+            yield piece
+
+
+def serve_file(request, name):
+    """Response that delivers media file `name` (already authorised)."""
+    full_path = default_storage.path(name)  # the blob behind the name, with deduplicated storage
+    if not os.path.isfile(full_path):
+        raise Http404("File not found.")
+    content_type = mimetypes.guess_type(name)[0] or 'application/octet-stream'
+    mode = getattr(settings, 'MEDIA_SERVE_MODE', '')
+
+    if mode == 'accel':
+        response = HttpResponse(content_type=content_type)
+        response['X-Accel-Redirect'] = settings.MEDIA_ACCEL_PREFIX.rstrip('/') + '/' + quote(os.path.relpath(full_path, settings.MEDIA_ROOT))
+        return response
+    if mode == 'sendfile':
+        response = HttpResponse(content_type=content_type)
+        response['X-Sendfile'] = full_path
+        return response
+
+    stat = os.stat(full_path)
+    if not was_modified_since(request.headers.get('If-Modified-Since'), stat.st_mtime):
+        return HttpResponseNotModified()
+
+    byte_range = _parse_range(request.headers.get('Range'), stat.st_size)
+    if byte_range is False:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{stat.st_size}'
+        return response
+    if byte_range is None:
+        response = FileResponse(open(full_path, 'rb'), content_type=content_type)
+    else:
+        start, end = byte_range
+        response = StreamingHttpResponse(_stream(full_path, start, end - start + 1), status=206, content_type=content_type)
+        response['Content-Length'] = str(end - start + 1)
+        response['Content-Range'] = f'bytes {start}-{end}/{stat.st_size}'
+    response['Accept-Ranges'] = 'bytes'
+    response['Last-Modified'] = http_date(stat.st_mtime)
+    return response
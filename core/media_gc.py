@@ -0,0 +1,144 @@
+# core/media_gc.py
+"""
+Finds uploaded files nothing refers to any more, and totals storage per owner.
+
+Two layers are scanned, both as streams checked in batches of BATCH_SIZE:
+
+  * names - every StoredFile name plus any file saved before deduplication
+    (a plain file outside blobs/). A name is live if a FileField or a photo's
+    renditions point at it. Each batch is matched against the database with
+    `__in` lookups, so the set of referenced names is never loaded whole.
+  * blobs - the files under blobs/, which are live if a Blob row owns them.
+
+Anything younger than `min_age` is left alone: an upload's file is written
+just before the row that refers to it is committed.
+"""
+import os
+import re
+from collections import defaultdict
+from datetime import timedelta
+from itertools import islice
+
+from django.conf import settings
+from django.utils import timezone
+
+from progress.models import ArchivedDailyProgress, ArchivedWeeklyProgress, DailyProgress, WeeklyProgress
+from purchase_orders.models import PurchaseOrder, PurchaseOrderDocument
+from projects.models import Project
+from .models import Blob, StoredFile
+from .storage import BLOB_DIR
+
+BATCH_SIZE = 2000
+
+# (model, FileField name) for every upload field in the project
+FILE_REFERENCES = [
+    (PurchaseOrderDocument, 'file'),
+    (DailyProgress, 'file_upload'),
+    (WeeklyProgress, 'file_upload'),
+    (ArchivedDailyProgress, 'file_upload'),
+    (ArchivedWeeklyProgress, 'file_upload'),
+]
+RENDITION_MODELS = [DailyProgress, WeeklyProgress, ArchivedDailyProgress, ArchivedWeeklyProgress]
+
+_OWNER_DIR = re.compile(r'^(po|project)_(\d+)/')
+
+
+def _batched(iterable, size=BATCH_SIZE):
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def walk(root, skip_dirs=()):
+    """Yields (relative name, size, mtime) for every file under `root`, one directory at a time."""
+    stack = [root]
+    while stack:
+        directory = stack.pop()
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                name = os.path.relpath(entry.path, root).replace(os.sep, '/')
+                if entry.is_dir(follow_symlinks=False):
+                    if name not in skip_dirs:
+                        stack.append(entry.path)
+                elif entry.is_file(follow_symlinks=False):
+                    stat = entry.stat()
+                    yield name, stat.st_size, stat.st_mtime
+
+
+def _all_names(root):
+    """(name, size, timestamp) for every stored name: deduplicated ones, then legacy files."""
+    stored = StoredFile.objects.values_list('name', 'blob__size', 'created_at').iterator(chunk_size=BATCH_SIZE)
+    for name, size, created_at in stored:
+        yield name, size, created_at.timestamp()
+    # Legacy files can't have a StoredFile row (saving under an existing name picks a new one).
+    yield from walk(root, skip_dirs={BLOB_DIR})
+
+
+def _referenced(names):
+    """The subset of `names` that some record points at."""
+    names = set(names)
+    found = set()
+    for model, field in FILE_REFERENCES:
+        found.update(model.objects.filter(**{f'{field}__in': names}).values_list(field, flat=True))
+
+    # Renditions live in a JSON field; load them only for the projects this batch touches.
+    project_ids = {int(m.group(2)) for m in map(_OWNER_DIR.match, names) if m and m.group(1) == 'project'}
+    if project_ids:
+        for model in RENDITION_MODELS:
+            rows = model.objects.filter(project_id__in=project_ids).exclude(renditions={}).values_list('renditions', flat=True)
+            for renditions in rows.iterator(chunk_size=BATCH_SIZE):
+                found.update(path for sizes in renditions.values() for path in sizes.values() if path in names)
+    return found
+
+
+def scan(min_age=timedelta(hours=24), root=None):
+    """
+    Yields (kind, name, size, orphaned) for every name ('name') and blob file ('blob').
+    Blob files are physical paths under MEDIA_ROOT; names are what FileFields hold.
+    """
+    root = str(root or settings.MEDIA_ROOT)
+    if not os.path.isdir(root):
+        return
+    cutoff = (timezone.now() - min_age).timestamp()
+
+    for batch in _batched(_all_names(root)):
+        live = _referenced(name for name, _, _ in batch)
+        for name, size, timestamp in batch:
+            yield 'name', name, size, name not in live and timestamp <= cutoff
+
+    blob_root = os.path.join(root, BLOB_DIR)
+    if os.path.isdir(blob_root):
+        blob_files = ((f'{BLOB_DIR}/{name}', size, mtime) for name, size, mtime in walk(blob_root))
+        for batch in _batched(blob_files):
+            owned = set(Blob.objects.filter(path__in=[name for name, _, _ in batch]).values_list('path', flat=True))
+            for name, size, mtime in batch:
+                yield 'blob', name, size, name not in owned and mtime <= cutoff
+
+
+def owner_key(name):
+    """('project', id) / ('po', id) for a stored name, or ('other', top-level folder)."""
+    match = _OWNER_DIR.match(name)
+    if match:
+        return match.group(1), int(match.group(2))
+    return 'other', name.split('/', 1)[0] if '/' in name else ''
+
+
+def owner_labels(keys):
+    """Readable labels for owner keys, two queries in all."""
+    project_ids = [pk for kind, pk in keys if kind == 'project']
+    po_ids = [pk for kind, pk in keys if kind == 'po']
+    projects = dict(Project.objects.filter(pk__in=project_ids).values_list('pk', 'title'))
+    pos = dict(PurchaseOrder.objects.filter(pk__in=po_ids).values_list('pk', 'po_number'))
+    labels = {}
+    for kind, pk in keys:
+        if kind == 'project':
+            labels[(kind, pk)] = f"Project {pk}: {projects[pk]}" if pk in projects else f"Project {pk} (deleted)"
+        elif kind == 'po':
+            labels[(kind, pk)] = f"PO {pos[pk]}" if pk in pos else f"PO {pk} (deleted)"
+        else:
+            labels[(kind, pk)] = f"{pk or '(top level)'}/"
+    return labels
+
+
+def new_usage():
+    return defaultdict(lambda: {'files': 0, 'bytes': 0, 'orphaned_bytes': 0})
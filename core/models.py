@@ -1,3 +1,58 @@
+# core/models.py
+import uuid
+
 from django.db import models
 
-# Create your models here.
+
+class Blob(models.Model):
+    """
+    One unique uploaded file body, stored once under blobs/ and named by its
+    SHA-256. Any number of StoredFile names can point at it; it is deleted
+    with the last of them (see core/storage.py).
+    """
+    sha256 = models.CharField(max_length=64, unique=True)
+    path = models.CharField(max_length=255, help_text="Location of the body, relative to MEDIA_ROOT")
+    size = models.PositiveBigIntegerField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.sha256[:12]} ({self.size} bytes)"
+
+
+class StoredFile(models.Model):
+    """
+    A file name handed out to a FileField (e.g. po_3/drawing.pdf) and the blob
+    holding its contents. The number of StoredFiles per blob is its reference count.
+    """
+    name = models.CharField(max_length=255, unique=True)
+    blob = models.ForeignKey(Blob, on_delete=models.PROTECT, related_name='files')
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return self.name
+
+
+class Job(models.Model):
+    """A unit of background work, run by `manage.py run_jobs` (see core/jobs.py)."""
+
+    class Status(models.TextChoices):
+        QUEUED = 'queued', 'Queued'
+        RUNNING = 'running', 'Running'
+        DONE = 'done', 'Done'
+        FAILED = 'failed', 'Failed'
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    task = models.CharField(max_length=200, help_text="Dotted path of the function to call")
+    kwargs = models.JSONField(default=dict)
+    status = models.CharField(max_length=10, choices=Status.choices, default=Status.QUEUED)
+    result = models.JSONField(default=dict, blank=True)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [models.Index(fields=['status', 'created_at'])]
+
+    def __str__(self):
+        return f"{self.task} ({self.status})"
@@ -0,0 +1,52 @@
+# core/remote.py
+"""
+Fetching remote assets (the company logo on every PDF, ...).
+
+Downloads go through httpx's async client, so under ASGI they wait on the
+event loop instead of holding a thread, and the bytes are kept in the
+default cache: a logo is fetched once a day, not twice per generated PDF.
+A failed fetch is remembered briefly so a slow or unreachable host doesn't
+add its timeout to every request in the meantime.
+
+Sync code (the ReportLab builders) calls fetch_bytes(); async views can
+await afetch_bytes() directly.
+"""
+import hashlib
+
+import httpx
+from asgiref.sync import async_to_sync
+from django.core.cache import caches
+
+from .cache import DEFAULT
+
+FETCH_TIMEOUT = 5  # seconds
+CACHE_TTL = 60 * 60 * 24
+FAILURE_TTL = 60 * 5
+
+_MISSING = b''  # cached for a failed fetch; the cache can't hold None
+
+
+def _key(url):
+    return f"remote:{hashlib.md5(url.encode()).hexdigest()}"
+
+
+async def afetch_bytes(url, timeout=FETCH_TIMEOUT):
+    """The body at `url`, or None if it can't be fetched."""
+    cache = caches[DEFAULT]
+    key = _key(url)
+    body = await cache.aget(key)
+    if body is not None:
+        return body or None
+    try:
+        async with httpx.AsyncClient(timeout=timeout, follow_redirects=True) as client:
+            response = await client.get(url)
+            response.raise_for_status()
+    except httpx.HTTPError:
+        await cache.aset(key, _MISSING, FAILURE_TTL)
+        return None
+    await cache.aset(key, response.content, CACHE_TTL)
+    return response.content
+
+
+def fetch_bytes(url, timeout=FETCH_TIMEOUT):
+    return async_to_sync(afetch_bytes)(url, timeout)
@@ -0,0 +1,117 @@
+# core/replica.py
+"""
+Read-replica routing for heavy read-only views (dashboards, exports, PDFs).
+
+Nothing goes to the replica by default. Code opts in with `using_replica`,
+as a decorator on a view (sync or async) or as a context manager:
+
+    @login_required
+    @using_replica
+    def export_csv(request): ...
+
+    with using_replica():
+        rows = list(Report.objects.filter(...))
+
+Inside it, reads go to the REPLICA alias when one is configured
+(REPLICA_DATABASE_URL); writes always go to the primary. To keep a user
+from missing their own changes while the replica catches up, reads stay on
+the primary:
+
+  * for the rest of a request once it has written anything, and
+  * for REPLICA_PIN_SECONDS after any POST/PUT/PATCH/DELETE or write
+    (ReplicaPinningMiddleware sets a short-lived cookie), and
+  * inside transaction.atomic() on the primary.
+
+Views whose output is cached under a version number (the project breakdown
+rows, portfolio analytics) are deliberately left on the primary: a lagging
+replica could store stale data under the new version.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+REPLICA = 'replica'
+PIN_COOKIE = 'pin_primary'
+
+_reads_on_replica = ContextVar('reads_on_replica', default=False)
+_request_state = ContextVar('replica_request_state', default=None)
+
+
+class RequestState:
+    """Per-request flags; mutated in place so writes seen in a thread pool still count."""
+
+    def __init__(self, pinned=False):
+        self.pinned = pinned
+        self.wrote = False
+
+
+def replica_configured():
+    return REPLICA in settings.DATABASES
+
+
+def start_request(pinned):
+    """Starts tracking a request's writes (ReplicaPinningMiddleware); returns a token for end_request."""
+    return _request_state.set(RequestState(pinned))
+
+
+def end_request(token):
+    """Stops tracking; returns the request's RequestState."""
+    state = _request_state.get()
+    _request_state.reset(token)
+    return state
+
+
+@contextmanager
+def _replica_reads():
+    token = _reads_on_replica.set(True)
+    try:
+        yield
+    finally:
+        _reads_on_replica.reset(token)
+
+
+def using_replica(view=None):
+    """Decorates a view (sync or async), or with no argument returns a context manager."""
+    if view is None:
+        return _replica_reads()
+    if iscoroutinefunction(view):
+        @wraps(view)
+        async def wrapper(*args, **kwargs):
+            with _replica_reads():
+                return await view(*args, **kwargs)
+        return wrapper
+
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        with _replica_reads():
+            return view(*args, **kwargs)
+    return wrapper
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if not _reads_on_replica.get() or not replica_configured():
+            return None
+        state = _request_state.get()
+        if state is not None and (state.pinned or state.wrote):
+            return None
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return None
+        return REPLICA
+
+    def db_for_write(self, model, **hints):
+        state = _request_state.get()
+        if state is not None:
+            state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True  # same data on both aliases
+
+    def allow_migrate(self, db, app_label, **hints):
+        # The replica gets its schema through replication.
+        return False if db == REPLICA else None
@@ -0,0 +1,75 @@
+# core/signals.py
+"""
+Releases uploaded files when the record holding them goes away or gets a new
+upload (or has its upload cleared), along with the photo renditions made from
+them. With the deduplicating storage (core/storage.py) this only drops one
+reference; the body is removed once nothing else points at it.
+"""
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from core.archive import is_moving
+from progress.images import delete_renditions
+from progress.models import ArchivedDailyProgress, ArchivedWeeklyProgress, DailyProgress, WeeklyProgress
+from purchase_orders.models import PurchaseOrderDocument
+
+FILE_FIELDS = {
+    PurchaseOrderDocument: 'file',
+    DailyProgress: 'file_upload',
+    WeeklyProgress: 'file_upload',
+    ArchivedDailyProgress: 'file_upload',
+    ArchivedWeeklyProgress: 'file_upload',
+}
+
+
+def _release(storage, name, renditions=None):
+    """Deletes after commit, so a rolled-back delete doesn't lose the file."""
+    def release():
+        if name:
+            storage.delete(name)
+        delete_renditions(storage, renditions)
+    transaction.on_commit(release)
+
+
+@receiver(pre_save, sender=PurchaseOrderDocument)
+@receiver(pre_save, sender=DailyProgress)
+@receiver(pre_save, sender=WeeklyProgress)
+def remember_previous_file(sender, instance, update_fields=None, **kwargs):
+    instance._previous_file_name = instance._previous_renditions = None
+    if update_fields is not None and FILE_FIELDS[sender] not in update_fields:
+        return
+    if instance.pk:
+        columns = [FILE_FIELDS[sender]] + (['renditions'] if hasattr(instance, 'renditions') else [])
+        previous = sender.objects.filter(pk=instance.pk).values_list(*columns).first() or [None]
+        instance._previous_file_name = previous[0]
+        instance._previous_renditions = previous[1] if len(previous) > 1 else None
+
+
+@receiver(post_save, sender=PurchaseOrderDocument)
+@receiver(post_save, sender=DailyProgress)
+@receiver(post_save, sender=WeeklyProgress)
+def release_replaced_file(sender, instance, created, **kwargs):
+    field = getattr(instance, FILE_FIELDS[sender])
+    previous = getattr(instance, '_previous_file_name', None)
+    if previous and previous != field.name:
+        # The renditions were made from the old upload; a new one gets its own.
+        stale = instance._previous_renditions
+        if getattr(instance, 'renditions', None) != stale:
+            stale = None  # this save stores the new upload's renditions (progress/images.py)
+        _release(field.storage, previous, stale)
+        if stale:
+            sender.objects.filter(pk=instance.pk).update(renditions={})
+            instance.renditions = {}
+
+
+@receiver(post_delete, sender=PurchaseOrderDocument)
+@receiver(post_delete, sender=DailyProgress)
+@receiver(post_delete, sender=WeeklyProgress)
+@receiver(post_delete, sender=ArchivedDailyProgress)
+@receiver(post_delete, sender=ArchivedWeeklyProgress)
+def release_deleted_file(sender, instance, **kwargs):
+    if is_moving():
+        return  # archived or restored: the other table's copy still uses the file
+    field = getattr(instance, FILE_FIELDS[sender])
+    _release(field.storage, field.name, getattr(instance, 'renditions', None))
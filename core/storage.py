@@ -0,0 +1,144 @@
+# core/storage.py
+"""
+Content-addressed, deduplicating storage for uploads.
+
+FileFields keep their usual names (po_<id>/..., project_<id>/...), so URLs
+and the media permission rules are unchanged, but each name is only a
+StoredFile row pointing at a Blob: the file body is hashed on save and
+written once to blobs/<aa>/<bb>/<sha256><ext>. Uploading the same drawing
+to five POs stores it once. Deleting a name drops its row, and the blob
+goes with the last reference.
+
+Files saved before this storage was enabled have no StoredFile row and
+are read from their own path as before; `manage.py dedupe_media` moves
+them into the blob store.
+"""
+import hashlib
+import os
+import posixpath
+
+from django.core.files.storage import FileSystemStorage
+from django.db import IntegrityError, transaction
+
+from .models import Blob, StoredFile
+
+BLOB_DIR = 'blobs'
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def blob_name(sha256, original_name):
+    ext = posixpath.splitext(original_name)[1].lower()[:10]
+    return posixpath.join(BLOB_DIR, sha256[:2], sha256[2:4], f'{sha256}{ext}')
+
+
+def _hash_content(content):
+    digest = hashlib.sha256()
+    size = 0
+    if hasattr(content, 'temporary_file_path'):
+        with open(content.temporary_file_path(), 'rb') as f:
+            for piece in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+                digest.update(piece)
+                size += len(piece)
+    else:
+        if hasattr(content, 'seek'):
+            content.seek(0)
+        for piece in content.chunks():
+            digest.update(piece)
+            size += len(piece)
+        if hasattr(content, 'seek'):
+            content.seek(0)
+    return digest.hexdigest(), size
+
+
+class DedupFileSystemStorage(FileSystemStorage):
+
+    def _stored(self, name):
+        return StoredFile.objects.select_related('blob').filter(name=name).first()
+
+    def _physical_name(self, name):
+        stored = self._stored(name)
+        return stored.blob.path if stored else name
+
+    def _save(self, name, content):
+        sha256, size = _hash_content(content)
+        with transaction.atomic():
+            # Locking the blob keeps a concurrent delete of its last reference from removing it under us.
+            blob = Blob.objects.select_for_update().filter(sha256=sha256).first()
+            if blob is None:
+                path = super()._save(blob_name(sha256, name), content)
+                try:
+                    with transaction.atomic():
+                        blob = Blob.objects.create(sha256=sha256, path=path, size=size)
+                except IntegrityError:
+                    # Someone stored the same body at the same moment; use theirs.
+                    super().delete(path)
+                    blob = Blob.objects.select_for_update().get(sha256=sha256)
+            StoredFile.objects.create(name=name, blob=blob)
+        return name
+
+    def delete(self, name):
+        with transaction.atomic():
+            stored = StoredFile.objects.filter(name=name).first()
+            if stored is None:
+                return super().delete(name)
+            stored.delete()
+            blob = Blob.objects.select_for_update().filter(pk=stored.blob_id).first()
+            if blob is not None and not blob.files.exists():
+                path = blob.path
+                blob.delete()
+                transaction.on_commit(lambda: self._delete_blob_file(path))
+
+    def _delete_blob_file(self, path):
+        """Unlinks a blob's file after its last reference has gone, unless it has been stored again since."""
+        with transaction.atomic():
+            # A save of the same body since the delete committed has re-created the
+            # Blob at this path and owns the file now; the lock keeps it referenced while we look.
+            if Blob.objects.select_for_update().filter(path=path).exists():
+                return
+            FileSystemStorage.delete(self, path)
+
+    def adopt(self, name):
+        """
+        Moves a file saved before deduplication (no StoredFile row) into the
+        blob store, keeping its name. Returns True if it duplicated an existing blob.
+        """
+        full_path = super().path(name)
+        digest = hashlib.sha256()
+        with open(full_path, 'rb') as f:
+            for piece in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+                digest.update(piece)
+        sha256 = digest.hexdigest()
+        with transaction.atomic():
+            blob = Blob.objects.select_for_update().filter(sha256=sha256).first()
+            duplicate = blob is not None
+            if blob is None:
+                path = blob_name(sha256, name)
+                os.makedirs(os.path.dirname(super().path(path)), exist_ok=True)
+                os.replace(full_path, super().path(path))
+                blob = Blob.objects.create(sha256=sha256, path=path, size=os.path.getsize(super().path(path)))
+            StoredFile.objects.create(name=name, blob=blob)
+            if duplicate:
+                transaction.on_commit(lambda: os.remove(full_path))
+        return duplicate
+
+    def exists(self, name):
+        return StoredFile.objects.filter(name=name).exists() or super().exists(name)
+
+    def path(self, name):
+        return super().path(self._physical_name(name))
+
+    def _open(self, name, mode='rb'):
+        return super()._open(self._physical_name(name), mode)
+
+    def size(self, name):
+        stored = self._stored(name)
+        return stored.blob.size if stored else super().size(name)
+
+    def get_accessed_time(self, name):
+        return super().get_accessed_time(self._physical_name(name))
+
+    def get_created_time(self, name):
+        return super().get_created_time(self._physical_name(name))
+
+    def get_modified_time(self, name):
+        return super().get_modified_time(self._physical_name(name))
@@ -0,0 +1,46 @@
+# core/template_warmup.py
+"""
+Compiles the project's templates (the TEMPLATES 'DIRS', i.e. templates/) up
+front. Under the cached loader each compiled template is kept for the life
+of the process, so warming them when a worker starts
+means no request pays the parse cost, and a syntax error stops the worker
+from booting instead of surfacing as a 500 on whichever page uses it.
+
+The same compile runs as a deploy system check (core.checks), so
+`manage.py check --deploy` reports broken templates too.
+"""
+import os
+
+from django.template import TemplateSyntaxError, engines
+
+
+def template_names(engine=None):
+    """Every template name under the engine's DIRS, relative to its directory."""
+    engine = engine or engines['django'].engine
+    for directory in engine.dirs:
+        directory = str(directory)
+        for root, dirs, files in os.walk(directory):
+            dirs[:] = sorted(d for d in dirs if not d.startswith('.'))
+            for filename in sorted(files):
+                if not filename.startswith('.'):
+                    yield os.path.relpath(os.path.join(root, filename), directory).replace(os.sep, '/')
+
+
+def compile_templates(engine=None):
+    """Compiles (and, with the cached loader, caches) every template. Returns [(name, error), ...]."""
+    engine = engine or engines['django'].engine
+    errors = []
+    for name in template_names(engine):
+        try:
+            engine.get_template(name)
+        except TemplateSyntaxError as exc:
+            errors.append((name, exc))
+    return errors
+
+
+def warm_up():
+    """Called from wsgi.py / asgi.py; raises if any template fails to compile."""
+    errors = compile_templates()
+    if errors:
+        details = '\n'.join(f"  {name}: {exc}" for name, exc in errors)
+        raise TemplateSyntaxError(f"{len(errors)} template(s) failed to compile:\n{details}")
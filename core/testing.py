@@ -0,0 +1,51 @@
+# core/testing.py
+"""
+Test support.
+
+The TEST_RUNNER runs the suite on private in-memory caches, so tests neither
+read nor clear the configured (shared) ones, and with plain static file URLs,
+so pages render without a collectstatic manifest. TestCase empties them before
+every test: cached rows such as the logged-in user (users/backends.py) would
+otherwise outlive the rollback between tests, since the on_commit version
+bumps that invalidate them never run inside a TestCase. TransactionTestCase
+does the same.
+"""
+from django.conf import settings
+from django.core.cache import caches
+from django.test import TestCase as DjangoTestCase, TransactionTestCase as DjangoTransactionTestCase, override_settings
+from django.test.runner import DiscoverRunner
+
+
+class TestRunner(DiscoverRunner):
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self._test_settings = override_settings(
+            CACHES={
+                name: {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': f'test-{name}'}
+                for name in settings.CACHES
+            },
+            STORAGES={**settings.STORAGES, 'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'}},
+        )
+        self._test_settings.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self._test_settings.disable()
+        super().teardown_test_environment(**kwargs)
+
+
+def clear_caches():
+    for cache in caches.all():
+        cache.clear()
+
+
+class TestCase(DjangoTestCase):
+    def setUp(self):
+        super().setUp()
+        clear_caches()
+
+
+class TransactionTestCase(DjangoTransactionTestCase):
+    """For tests that need real commits, e.g. reads routed away from an atomic block."""
+    def setUp(self):
+        super().setUp()
+        clear_caches()
@@ -1,3 +1,280 @@
-from django.test import TestCase
+import datetime
+import os
+import tempfile
 
-# Create your tests here.
+from django.apps import apps
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.http import JsonResponse
+from django.test import override_settings
+from django.urls import path, reverse
+from django.utils import timezone
+from django.utils.functional import empty
+
+from enquiries.models import Customer
+from progress.models import ArchivedDailyProgress, DailyProgress
+from projects.models import Project
+from reports.models import ArchivedManpowerLog, DailyReport, ManpowerLog
+from users.models import User
+from .archive import archive_project, get_history_or_404
+from .jobs import claim_next, enqueue, fail_abandoned, job_storage, purge_expired, run_job
+from .models import Blob, Job, StoredFile
+from .replica import PIN_COOKIE, REPLICA, using_replica
+from .storage import DedupFileSystemStorage
+from .testing import TestCase, TransactionTestCase
+
+
+def add(a, b):
+    return {'sum': a + b}
+
+
+def write_file(text):
+    return {'file': job_storage.save('test/out.txt', ContentFile(text.encode()))}
+
+
+def explode():
+    raise ValueError("boom")
+
+
+def _customer_names():
+    return sorted(Customer.objects.values_list('name', flat=True))
+
+
+@using_replica
+def customer_names(request):
+    if request.method == 'POST':
+        Customer.objects.create(name=request.POST['name'], email='new@example.com')
+    return JsonResponse({'names': _customer_names()})
+
+
+urlpatterns = [path('names/', customer_names)]
+
+
+class JobQueueTests(TestCase):
+    def setUp(self):
+        super().setUp()
+        files = tempfile.TemporaryDirectory()
+        self.addCleanup(files.cleanup)
+        override = override_settings(JOB_FILES_ROOT=files.name)
+        override.enable()
+        self.addCleanup(override.disable)
+        # job_storage reads JOB_FILES_ROOT when first used
+        job_storage._wrapped = empty
+        self.addCleanup(setattr, job_storage, '_wrapped', empty)
+
+    def run_queue(self):
+        while job := claim_next():
+            run_job(job)
+
+    def test_jobs_run_oldest_first_and_record_results(self):
+        first = enqueue('core.tests.add', a=1, b=2)
+        failing = enqueue('core.tests.explode')
+        with self.assertLogs('core.jobs', 'ERROR'):
+            self.run_queue()
+
+        first.refresh_from_db()
+        failing.refresh_from_db()
+        self.assertEqual((first.status, first.result), (Job.Status.DONE, {'sum': 3}))
+        self.assertEqual((failing.status, failing.error), (Job.Status.FAILED, "boom"))
+        self.assertIsNone(claim_next())
+
+    def test_abandoned_jobs_fail(self):
+        job = enqueue('core.tests.add', a=1, b=2)
+        Job.objects.filter(pk=job.pk).update(status=Job.Status.RUNNING, started_at=timezone.now() - datetime.timedelta(hours=2))
+
+        self.assertEqual(fail_abandoned(), 1)
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.Status.FAILED)
+
+    def test_expired_jobs_are_deleted_with_their_files(self):
+        job = enqueue('core.tests.write_file', text='hello')
+        self.run_queue()
+        job.refresh_from_db()
+        self.assertTrue(job_storage.exists(job.result['file']))
+
+        self.assertEqual(purge_expired(), 0)
+        Job.objects.update(finished_at=timezone.now() - datetime.timedelta(days=2))
+        self.assertEqual(purge_expired(), 1)
+        self.assertFalse(job_storage.exists(job.result['file']))
+
+
+class DedupStorageTests(TestCase):
+    def setUp(self):
+        super().setUp()
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        self.storage = DedupFileSystemStorage(location=media.name)
+
+    def blob_exists(self, blob):
+        return os.path.exists(os.path.join(self.storage.location, blob.path))
+
+    def test_identical_uploads_share_one_blob_until_the_last_is_deleted(self):
+        first = self.storage.save('po_1/drawing.pdf', ContentFile(b'%PDF drawing'))
+        second = self.storage.save('po_2/drawing.pdf', ContentFile(b'%PDF drawing'))
+        other = self.storage.save('po_2/other.pdf', ContentFile(b'%PDF other'))
+        blob = Blob.objects.get(files__name=first)
+        self.assertEqual(Blob.objects.count(), 2)
+        self.assertEqual(blob.files.count(), 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.storage.delete(first)
+        self.assertTrue(self.blob_exists(blob))
+        with self.storage.open(second) as f:
+            self.assertEqual(f.read(), b'%PDF drawing')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.storage.delete(second)
+        self.assertFalse(Blob.objects.filter(pk=blob.pk).exists())
+        self.assertFalse(self.blob_exists(blob))
+        self.assertEqual(list(StoredFile.objects.values_list('name', flat=True)), [other])
+
+    def test_blob_stored_again_before_the_unlink_is_kept(self):
+        name = self.storage.save('po_1/drawing.pdf', ContentFile(b'%PDF drawing'))
+        blob = Blob.objects.get()
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.storage.delete(name)
+        # The same body is uploaded again before the deferred unlink runs.
+        Blob.objects.create(sha256=blob.sha256, path=blob.path, size=blob.size)
+        for callback in callbacks:
+            callback()
+        self.assertTrue(self.blob_exists(blob))
+
+
+class DashboardCountersTests(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.admin = User.objects.create_user('admin', password='pw', role='admin')
+        self.sco = User.objects.create_user('sco', password='pw', role='sco')
+        customer = Customer.objects.create(name='ACME Ltd', email='acme@example.com')
+        Project.objects.create(customer=customer, title='Villa', status=Project.ProjectStatus.IN_PROGRESS)
+        Project.objects.create(customer=customer, title='Office')
+        self.url = reverse('core:dashboard_counters')
+
+    async def test_anonymous_user_is_sent_to_login(self):
+        response = await self.async_client.get(self.url)
+        self.assertEqual(response.status_code, 302)
+        self.assertIn('login', response.url)
+
+    async def test_other_roles_are_refused(self):
+        await self.async_client.aforce_login(self.sco)
+        self.assertEqual((await self.async_client.get(self.url)).status_code, 403)
+
+    async def test_counts(self):
+        await self.async_client.aforce_login(self.admin)
+        response = await self.async_client.get(self.url)
+        self.assertEqual(response.json(), {
+            'active_projects_count': 1,
+            'pending_enquiries_count': 0,
+            'quotes_awaiting_acceptance': 0,
+            'reports_to_review_count': 0,
+            'pending_pos_count': 0,
+        })
+
+
+@override_settings(ROOT_URLCONF='core.tests')
+class ReplicaRoutingTests(TransactionTestCase):
+    """
+    Runs against a second, separate SQLite database as the replica, so each read
+    shows where it went. The alias is added before the test case's own set-up,
+    which then includes it in '__all__'. Not a TestCase: reads inside its
+    transaction would stay on the primary.
+    """
+    databases = '__all__'
+
+    @classmethod
+    def setUpClass(cls):
+        config = {'ENGINE': 'django.db.backends.sqlite3', 'NAME': ':memory:'}
+        settings.DATABASES[REPLICA] = config
+        connections.settings[REPLICA] = connections.configure_settings(
+            {DEFAULT_DB_ALIAS: connections.settings[DEFAULT_DB_ALIAS], REPLICA: config}
+        )[REPLICA]
+        with connections[REPLICA].schema_editor() as editor:  # the schema replication would bring
+            for model in apps.get_models():
+                editor.create_model(model)
+        # Nothing is ever written to the replica, so one row serves every test.
+        Customer.objects.using(REPLICA).create(name='On replica', email='replica@example.com')
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        connections[REPLICA].close()
+        del connections[REPLICA]
+        connections.settings.pop(REPLICA, None)
+        settings.DATABASES.pop(REPLICA, None)  # often the same dict
+
+    def setUp(self):
+        super().setUp()
+        Customer.objects.create(name='On primary', email='primary@example.com')
+
+    def test_reads_go_to_the_replica_only_inside_using_replica(self):
+        self.assertEqual(_customer_names(), ['On primary'])
+        with using_replica():
+            self.assertEqual(_customer_names(), ['On replica'])
+            with transaction.atomic():
+                self.assertEqual(_customer_names(), ['On primary'])
+
+    def test_writes_go_to_the_primary(self):
+        with using_replica():
+            Customer.objects.create(name='New', email='new@example.com')
+        self.assertEqual(_customer_names(), ['New', 'On primary'])
+        self.assertFalse(Customer.objects.using(REPLICA).filter(name='New').exists())
+
+    def test_a_write_pins_the_user_to_the_primary(self):
+        self.assertEqual(self.client.get('/names/').json()['names'], ['On replica'])
+        self.assertNotIn(PIN_COOKIE, self.client.cookies)
+
+        response = self.client.post('/names/', {'name': 'New'})
+        self.assertEqual(response.json()['names'], ['New', 'On primary'])  # read after the write, same request
+        self.assertIn(PIN_COOKIE, response.cookies)
+
+        self.assertEqual(self.client.get('/names/').json()['names'], ['New', 'On primary'])
+        del self.client.cookies[PIN_COOKIE]
+        self.assertEqual(self.client.get('/names/').json()['names'], ['On replica'])
+
+
+class ArchiveRoundTripTests(TestCase):
+    def setUp(self):
+        super().setUp()
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        override = override_settings(MEDIA_ROOT=media.name)
+        override.enable()
+        self.addCleanup(override.disable)
+
+        sco = User.objects.create_user('sco', password='pw', role='sco')
+        customer = Customer.objects.create(name='ACME Ltd', email='acme@example.com')
+        self.project = Project.objects.create(customer=customer, title='Villa', status=Project.ProjectStatus.COMPLETED)
+        self.progress = DailyProgress.objects.create(project=self.project, date=datetime.date(2025, 3, 2),
+                                                     assigned_to=sco, planned_task='Tiling')
+        self.progress.file_upload.save('site.pdf', ContentFile(b'%PDF site'))
+        report = DailyReport.objects.create(project=self.project, date=datetime.date(2025, 3, 2), created_by=sco)
+        self.log = ManpowerLog.objects.create(report=report, staff_type='Mason', day_count=3)
+
+    def test_archive_and_restore_keep_rows_ids_and_files(self):
+        name = self.progress.file_upload.name
+        storage = self.progress.file_upload.storage
+
+        with self.captureOnCommitCallbacks(execute=True):
+            moved = archive_project(self.project)
+        self.assertEqual(moved['daily progress'], 1)
+        self.assertFalse(DailyProgress.objects.exists())
+        self.assertEqual(ArchivedManpowerLog.objects.get().pk, self.log.pk)
+        self.assertEqual(get_history_or_404(DailyProgress, pk=self.progress.pk).file_upload.name, name)
+        self.assertEqual(list(DailyProgress.objects.for_project(self.project)), [ArchivedDailyProgress.objects.get()])
+        self.assertTrue(storage.exists(name))
+
+        self.project.status = Project.ProjectStatus.IN_PROGRESS
+        with self.captureOnCommitCallbacks(execute=True):
+            self.project.save()  # reopening restores the history (projects/signals.py)
+        self.project.refresh_from_db()
+        self.assertIsNone(self.project.archived_at)
+        self.assertFalse(ArchivedDailyProgress.objects.exists())
+        self.assertEqual(ManpowerLog.objects.get(pk=self.log.pk).day_count, 3)
+        self.assertTrue(storage.exists(name))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            DailyProgress.objects.get(pk=self.progress.pk).delete()
+        self.assertFalse(storage.exists(name))
@@ -5,4 +5,5 @@ from . import views
 app_name = 'core'
 urlpatterns = [
     path('', views.home_view, name='home'),
+    path('dashboard/counters/', views.dashboard_counters, name='dashboard_counters'),
 ]
\ No newline at end of file
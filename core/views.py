@@ -4,12 +4,31 @@ from projects.models import Project
 from enquiries.models import Enquiry
 from quotations.models import Quotation
 from progress.models import DailyProgress
-from django.db.models import Prefetch # Add this import
-from reports.models import DailyReport # Add this import
 from purchase_orders.models import PurchaseOrder
+from django.contrib.auth.decorators import login_required
+from django.core.exceptions import PermissionDenied
+from django.http import Http404, JsonResponse
+from django.utils.cache import patch_cache_control
+from users.decorators import role_required
+from .media import can_access, clean_media_path, serve_file
 
 
 
+def _dashboard_counters():
+    """
+    The querysets counted on the admin dashboard, by context name. Reports to
+    review come from the hot table only: an archived project's reports are
+    read-only (core/archive.py), so none of them can be reviewed.
+    """
+    return {
+        'active_projects_count': Project.objects.filter(status='IN_PROGRESS'),
+        'pending_enquiries_count': Enquiry.objects.filter(status='PENDING'),
+        'quotes_awaiting_acceptance': Quotation.objects.filter(status='SENT'),
+        'reports_to_review_count': DailyProgress.objects.filter(status='SUBMITTED'),
+        'pending_pos_count': PurchaseOrder.objects.filter(status='PENDING'),
+    }
+
+
 def home_view(request):
     # If the user is not logged in, show a simple landing page.
     if not request.user.is_authenticated:
@@ -20,19 +39,7 @@ def home_view(request):
     # 1. Handle ADMIN role
     if request.user.role == 'admin':
         # Gather stats and show the ERP dashboard for admins.
-        active_projects_count = Project.objects.filter(status='IN_PROGRESS').count()
-        pending_enquiries_count = Enquiry.objects.filter(status='PENDING').count()
-        quotes_awaiting_acceptance = Quotation.objects.filter(status='SENT').count()
-        reports_to_review_count = DailyProgress.objects.filter(status='SUBMITTED').count()
-        pending_pos_count = PurchaseOrder.objects.filter(status='PENDING').count()
-
-        context = {
-            'active_projects_count': active_projects_count,
-            'pending_enquiries_count': pending_enquiries_count,
-            'quotes_awaiting_acceptance': quotes_awaiting_acceptance,
-            'reports_to_review_count': reports_to_review_count,
-            'pending_pos_count': pending_pos_count,
-        }
+        context = {name: queryset.count() for name, queryset in _dashboard_counters().items()}
         return render(request, 'core/admin_dashboard.html', context)
     
     # 2. Handle STAFF role
@@ -42,18 +49,34 @@ def home_view(request):
     
     # 3. Handle SCO role (this is now the final 'else')
     else: # SCO
-        # --- THIS IS THE MODIFIED QUERY ---
-        # We want to get the 3 most recent reports for each project
-        recent_reports = DailyReport.objects.order_by('-date')
-
-        assigned_projects = Project.objects.filter(
-            assigned_scos=request.user
-        ).prefetch_related(
-            # Prefetch only the 3 most recent reports for each project
-            Prefetch('daily_reports', queryset=recent_reports, to_attr='recent_dprs')
-        ).order_by('status')
+        # The page links to each project's DPR list (reports.views.dpr_list, which
+        # reads archived projects' reports too) rather than listing reports itself.
+        assigned_projects = Project.objects.filter(assigned_scos=request.user).order_by('status')
         
         context = {
             'projects': assigned_projects
         }
-        return render(request, 'projects/sco_dashboard.html', context)
\ No newline at end of file
+        return render(request, 'projects/sco_dashboard.html', context)
+
+
+@login_required
+@role_required('admin')
+async def dashboard_counters(request):
+    """The admin dashboard's counters as JSON, so the page can refresh them in place."""
+    return JsonResponse({name: await queryset.acount() for name, queryset in _dashboard_counters().items()})
+
+
+@login_required
+def protected_media(request, path):
+    """
+    Serves an uploaded file to users allowed to see it (rules in core/media.py),
+    through X-Accel-Redirect / X-Sendfile in production.
+    """
+    name = clean_media_path(path)
+    if name is None:
+        raise Http404("File not found.")
+    if not can_access(request.user, name):
+        raise PermissionDenied
+    response = serve_file(request, name)
+    patch_cache_control(response, private=True)
+    return response
@@ -14,3 +14,10 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'curvacraft.settings')
 
 application = get_asgi_application()
+
+from django.conf import settings  # noqa: E402 -- needs the settings module set above
+
+if settings.TEMPLATE_WARMUP:
+    from core.template_warmup import warm_up  # noqa: E402
+
+    warm_up()
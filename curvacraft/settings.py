@@ -11,6 +11,7 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
 from pathlib import Path
+import tempfile
 import environ  # Add this import
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -64,7 +65,8 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
-    'whitenoise.middleware.WhiteNoiseMiddleware',
+    'core.middleware.AsyncWhiteNoiseMiddleware',  # WhiteNoise that doesn't force ASGI requests onto a thread
+    'core.middleware.ReplicaPinningMiddleware',  # outside SessionMiddleware, so session saves count as writes
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -75,11 +77,23 @@ MIDDLEWARE = [
 
 ROOT_URLCONF = 'curvacraft.urls'
 
+# Django's default: compiled templates are kept for the life of the worker (runserver
+# resets them when a template file changes). wsgi.py / asgi.py compile them all at
+# startup (core/template_warmup.py).
+_TEMPLATE_LOADERS = [
+    ('django.template.loaders.cached.Loader', [
+        'django.template.loaders.filesystem.Loader',
+        'django.template.loaders.app_directories.Loader',
+    ]),
+]
+
+# Compile every template when a worker starts (defaults to on in production).
+TEMPLATE_WARMUP = env.bool('TEMPLATE_WARMUP', default=not DEBUG)
+
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [BASE_DIR / 'templates'], # Add this line
-        'APP_DIRS': True,
         'OPTIONS': {
             'context_processors': [
                 'django.template.context_processors.debug',
@@ -87,11 +101,13 @@ TEMPLATES = [
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
             ],
+            'loaders': _TEMPLATE_LOADERS,
         },
     },
 ]
 
 WSGI_APPLICATION = 'curvacraft.wsgi.application'
+ASGI_APPLICATION = 'curvacraft.asgi.application'
 
 
 # Database
@@ -103,6 +119,90 @@ DATABASES = {
     'default': env.db(),
 }
 
+# Persistent connections: each worker keeps its connection for CONN_MAX_AGE
+# seconds instead of opening a new one (TCP + TLS + auth) for every request,
+# and with CONN_HEALTH_CHECKS pings a reused connection before the request's
+# first query, so one dropped by the server or a failover is replaced instead
+# of failing the request. CONN_MAX_AGE=0 restores a connection per request;
+# use that under ASGI, where connections aren't reused between requests
+# anyway, and pool with PgBouncer instead.
+DATABASES['default']['CONN_MAX_AGE'] = env.int('CONN_MAX_AGE', default=60)
+DATABASES['default']['CONN_HEALTH_CHECKS'] = env.bool('CONN_HEALTH_CHECKS', default=True)
+
+# Set when DATABASE_URL points at PgBouncer in transaction pooling mode, where
+# consecutive transactions may run on different server connections:
+#   * no server-side cursors: QuerySet.iterator() would otherwise declare a
+#     cursor in one transaction and fetch from it on another server connection;
+#   * the database role's time zone must already be UTC
+#     (ALTER ROLE ... SET timezone TO 'UTC'), so Django never has to SET it
+#     on a connection PgBouncer may hand to someone else.
+PGBOUNCER_TRANSACTION_MODE = env.bool('PGBOUNCER_TRANSACTION_MODE', default=False)
+
+# Optional read replica for the heavy read-only views (core/replica.py). Locally,
+# point it at a copy of the primary's SQLite file, or a second PostgreSQL database.
+REPLICA_DATABASE_URL = env('REPLICA_DATABASE_URL', default='')
+if REPLICA_DATABASE_URL:
+    DATABASES['replica'] = {
+        **env.db_url_config(REPLICA_DATABASE_URL),
+        'CONN_MAX_AGE': DATABASES['default']['CONN_MAX_AGE'],
+        'CONN_HEALTH_CHECKS': DATABASES['default']['CONN_HEALTH_CHECKS'],
+        'TEST': {'MIRROR': 'default'},
+    }
+# Seconds a user's reads stay on the primary after they change something.
+REPLICA_PIN_SECONDS = env.int('REPLICA_PIN_SECONDS', default=10)
+DATABASE_ROUTERS = ['core.replica.ReplicaRouter']
+
+if PGBOUNCER_TRANSACTION_MODE:
+    for _database in DATABASES.values():
+        _database['DISABLE_SERVER_SIDE_CURSORS'] = True
+
+# --- Caches ---
+# Named caches (see core/cache.py). Each takes a django-environ cache URL from
+# <NAME>_CACHE_URL, else CACHE_URL, e.g. redis://127.0.0.1:6379/1 or dbcache://cache_table.
+# Without either, each gets a file-based cache under CACHE_DIR, which is shared by
+# all gunicorn workers on the host and needs no extra service. The entries are
+# pickles (cached users include their password hashes), so CACHE_DIR must only be
+# readable and writable by the app's own user - never a shared dir such as /tmp.
+# The file backend's incr() is not atomic (see core/cache.py); use Redis or
+# Memcached for the counters cache when several workers write at once.
+CACHE_URL = env('CACHE_URL', default='')
+CACHE_DIR = Path(env('CACHE_DIR', default=str(BASE_DIR / 'cache')))
+
+
+def _cache(name, timeout, max_entries=3000):
+    config = environ.Env.cache_url_config(
+        env(f'{name.upper()}_CACHE_URL', default=CACHE_URL or f'filecache://{CACHE_DIR / name}')
+    )
+    config['TIMEOUT'] = timeout
+    config.setdefault('KEY_PREFIX', name)  # lets the caches share one Redis database
+    if 'redis' not in config['BACKEND']:
+        config.setdefault('OPTIONS', {}).setdefault('MAX_ENTRIES', max_entries)
+    return config
+
+
+CACHES = {
+    'default': _cache('default', 300),
+    'sessions': _cache('sessions', 60 * 60 * 24 * 14, max_entries=20000),
+    'fragments': _cache('fragments', 60 * 60 * 24, max_entries=20000),
+    'pdfs': _cache('pdfs', 60 * 60, max_entries=500),
+    'counters': _cache('counters', None),
+}
+
+# Tests run on private in-memory caches instead (core/testing.py).
+TEST_RUNNER = 'core.testing.TestRunner'
+
+# Sessions are read from the cache and written through to the database, so a cache
+# flush logs nobody out. Expired rows are removed by `manage.py prune_sessions`.
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+SESSION_CACHE_ALIAS = 'sessions'
+
+# The logged-in user is cached too (users/backends.py). ModelBackend stays listed so
+# sessions started before the switch keep working until they expire.
+AUTHENTICATION_BACKENDS = [
+    'users.backends.CachedModelBackend',
+    'django.contrib.auth.backends.ModelBackend',
+]
+
 
 
 # Password validation
@@ -149,8 +249,6 @@ STATICFILES_DIRS = [
     BASE_DIR / 'static',
 ]
 
-# Serve static files in production via WhiteNoise (optional: use CompressedManifestStaticFilesStorage for hashed URLs).
-STATICFILES_STORAGE = 'whitenoise.storage.CompressedStaticFilesStorage'
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 AUTH_USER_MODEL = 'users.User'
@@ -158,4 +256,33 @@ LOGIN_REDIRECT_URL = '/'
 LOGOUT_REDIRECT_URL = '/'
 
 MEDIA_URL = '/media/'
-MEDIA_ROOT = BASE_DIR / 'media'
\ No newline at end of file
+MEDIA_ROOT = BASE_DIR / 'media'
+
+# Uploads are stored once per unique content; see core/storage.py.
+STORAGES = {
+    'default': {'BACKEND': 'core.storage.DedupFileSystemStorage'},
+    # Hashed, minified and pre-compressed by collectstatic (needed on deploy whenever DEBUG
+    # is off); WhiteNoise serves them with immutable caching. See core/staticfiles.py.
+    'staticfiles': {'BACKEND': 'core.staticfiles.MinifiedManifestStaticFilesStorage'},
+}
+
+# Media is served by core.views.protected_media after a permission check. In production
+# the transfer is handed to the web server: 'accel' for nginx, with
+#     location /protected-media/ { internal; alias /path/to/media/; }
+# or 'sendfile' for Apache mod_xsendfile / lighttpd. Leave empty to stream from Django.
+MEDIA_SERVE_MODE = env('MEDIA_SERVE_MODE', default='')
+MEDIA_ACCEL_PREFIX = env('MEDIA_ACCEL_PREFIX', default='/protected-media/')
+
+# Chunked PO document uploads are assembled here before being attached; it must be
+# on disk shared by all app workers and outside MEDIA_ROOT.
+CHUNKED_UPLOAD_DIR = env('CHUNKED_UPLOAD_DIR', default=str(Path(tempfile.gettempdir()) / 'curvacraft_uploads'))
+
+# --- Background jobs ---
+# Files produced by background jobs (core/jobs.py), e.g. compiled DPR books: a plain
+# directory outside MEDIA_ROOT, shared by the web workers and the `run_jobs` worker.
+JOB_FILES_ROOT = env('JOB_FILES_ROOT', default=str(BASE_DIR / 'job_files'))
+
+# --- Archiving ---
+# Days after completion / cancellation before `archive_projects` moves a project's
+# progress and DPR history to the archive tables (core/archive.py).
+ARCHIVE_PROJECTS_AFTER_DAYS = env.int('ARCHIVE_PROJECTS_AFTER_DAYS', default=365)
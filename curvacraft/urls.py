@@ -17,7 +17,7 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path, include
 from django.conf import settings # Import settings
-from django.conf.urls.static import static # Import static
+from core import views as core_views
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -37,5 +37,7 @@ urlpatterns = [
     path('dpr/', include('reports.urls', namespace='reports')),
 ]
 
-if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
\ No newline at end of file
+# Uploaded files are always served through the permission check; see core/media.py.
+urlpatterns += [
+    path(f"{settings.MEDIA_URL.strip('/')}/<path:path>", core_views.protected_media, name='protected_media'),
+]
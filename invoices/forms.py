@@ -16,7 +16,21 @@ class InvoiceItemForm(forms.ModelForm):
 InvoiceItemFormSet = forms.inlineformset_factory(Invoice, InvoiceItem, form=InvoiceItemForm, extra=1, can_delete=True)
 
 class InvoiceStatusForm(forms.ModelForm):
-    """A simple form to update only the status of an invoice."""
+    """
+    Moves an invoice between Draft and issued (Sent). Paid and Overdue follow from
+    payments, credits and the due date (invoices/status.py), so they aren't offered;
+    voiding has its own confirmation page.
+    """
+    status = forms.ChoiceField(
+        choices=[(Invoice.InvoiceStatus.DRAFT, 'Draft'), (Invoice.InvoiceStatus.SENT, 'Issued')],
+        help_text="Paid and Overdue are set automatically from payments and the due date.",
+    )
+
     class Meta:
         model = Invoice
-        fields = ['status']
\ No newline at end of file
+        fields = ['status']
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if self.instance.status in (Invoice.InvoiceStatus.PAID, Invoice.InvoiceStatus.OVERDUE):
+            self.initial['status'] = Invoice.InvoiceStatus.SENT
\ No newline at end of file
@@ -0,0 +1,27 @@
+# invoices/management/commands/reconcile_invoice_statuses.py
+import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from invoices.status import reconcile_statuses
+
+
+class Command(BaseCommand):
+    help = (
+        "Brings every invoice's stored status (Sent / Overdue / Paid) in line with its payments, "
+        "credits and due date. Safe to run repeatedly; schedule it daily so invoices turn Overdue."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--today', help="Treat this date (YYYY-MM-DD) as today when deciding what is overdue.")
+
+    def handle(self, *args, **options):
+        try:
+            today = datetime.date.fromisoformat(options['today']) if options['today'] else None
+        except ValueError as exc:
+            raise CommandError(f"Invalid date: {exc}")
+
+        moved = reconcile_statuses(today=today)
+        for status, count in moved.items():
+            self.stdout.write(f"{status}: {count} invoice(s) updated")
+        self.stdout.write(self.style.SUCCESS(f"Reconciled {sum(moved.values())} invoice(s)."))
@@ -3,23 +3,67 @@ from django.db import models
 from django.utils import timezone
 from decimal import Decimal
 from projects.models import Project
-from django.db.models import Sum
+from django.db.models import Case, DecimalField, F, OuterRef, Subquery, Sum, Value, When
+from django.db.models.functions import Coalesce
+
+MONEY_FIELD = DecimalField(max_digits=20, decimal_places=4)
+
+
+def item_total_expression(prefix=''):
+    """InvoiceItem.total_amount as a SQL expression, optionally reached through a relation prefix."""
+    return Case(
+        When(**{f'{prefix}quantity_type': 'PERCENTAGE'}, then=F(f'{prefix}quantity') * F(f'{prefix}unit_price') / Value(100)),
+        default=F(f'{prefix}quantity') * F(f'{prefix}unit_price'),
+        output_field=MONEY_FIELD,
+    )
+
+
+def _invoice_sum_subquery(model, expression):
+    """Correlated per-invoice SUM, so several totals can be annotated without multiplying rows."""
+    totals = (
+        model.objects.filter(invoice=OuterRef('pk'))
+        .order_by()
+        .values('invoice')
+        .annotate(total=Sum(expression, output_field=MONEY_FIELD))
+        .values('total')
+    )
+    return Coalesce(Subquery(totals, output_field=MONEY_FIELD), Value(0), output_field=MONEY_FIELD)
+
+
+class InvoiceQuerySet(models.QuerySet):
+    def with_totals(self):
+        """
+        Annotates subtotal_sum, grand_total_sum, paid_sum and credited_sum in the same query,
+        mirroring the subtotal / grand_total / total_paid / total_credited properties.
+        """
+        from accounts.models import CreditNote, Payment
+        return self.annotate(
+            subtotal_sum=_invoice_sum_subquery(InvoiceItem, item_total_expression()),
+            paid_sum=_invoice_sum_subquery(Payment, F('amount')),
+            credited_sum=_invoice_sum_subquery(CreditNote, F('amount')),
+        ).annotate(
+            grand_total_sum=F('subtotal_sum') * (Value(100) + F('tax_percentage')) / Value(100),
+        )
+
 
 class Invoice(models.Model):
     class InvoiceStatus(models.TextChoices):
         DRAFT = 'DRAFT', 'Draft'
         SENT = 'SENT', 'Sent'
         PAID = 'PAID', 'Paid'
+        OVERDUE = 'OVERDUE', 'Overdue' # Sent, unpaid and past its due date (set by invoices/status.py)
         VOID = 'VOID', 'Void' # The "rewind" status
 
     project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name='invoices')
     invoice_number = models.CharField(max_length=50, unique=True, blank=True)
     date = models.DateField(default=timezone.now)
     due_date = models.DateField(blank=True, null=True)
-    status = models.CharField(max_length=10, choices=InvoiceStatus.choices, default=InvoiceStatus.DRAFT)
+    status = models.CharField(max_length=10, choices=InvoiceStatus.choices, default=InvoiceStatus.DRAFT, db_index=True)
     tax_percentage = models.DecimalField(max_digits=5, decimal_places=2)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    objects = InvoiceQuerySet.as_manager()
+
     def save(self, *args, **kwargs):
         # --- Automatic Invoice Number Generation ---
         if not self.invoice_number:
@@ -67,8 +111,8 @@ class Invoice(models.Model):
         """Calculates the final amount due after payments and credits."""
         return self.grand_total - self.total_paid - self.total_credited
 
-    # We can also update the status automatically in a post_save signal later
-    # For now, this property shows the real-time status
+    # The stored status is kept in sync by invoices/status.py (on every write and by the
+    # reconcile_invoice_statuses command); this property adds the 'Partially Paid' nuance.
     @property
     def real_time_status(self):
         if self.status == 'VOID':
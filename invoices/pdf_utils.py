@@ -2,7 +2,7 @@
 
 # --- ALL IMPORTS NEEDED FOR THESE HELPERS ---
 import io
-import requests
+import logging
 from PIL import Image as PILImage, ImageOps
 from reportlab.pdfgen import canvas
 from reportlab.platypus.flowables import Flowable
@@ -12,6 +12,11 @@ from reportlab.lib import colors
 from reportlab.lib.utils import ImageReader
 from reportlab.platypus import Image
 
+from core.cache import get_or_compute
+from core.remote import CACHE_TTL as REMOTE_CACHE_TTL, fetch_bytes
+
+logger = logging.getLogger(__name__)
+
 # ---------------------------------
 # CUSTOM LINE SEPARATOR
 # ---------------------------------
@@ -41,28 +46,9 @@ class NumberedCanvas(canvas.Canvas):
     def _get_watermark_image(self):
         """Downloads, inverts, and prepares the logo for watermarking."""
         logo_url = "https://curvacraft.com/wp-content/uploads/2024/10/Curvacraft-logo-1024x255.webp"
-        try:
-            response = requests.get(logo_url, stream=True, timeout=5)
-            if response.status_code == 200:
-                pil_img = PILImage.open(io.BytesIO(response.content))
-                
-                if pil_img.mode != 'RGBA':
-                    pil_img = pil_img.convert('RGBA')
-                
-                # Invert colors while preserving alpha
-                r, g, b, a = pil_img.split()
-                rgb_image = PILImage.merge('RGB', (r, g, b))
-                inverted_rgb = ImageOps.invert(rgb_image)
-                inverted_r, inverted_g, inverted_b = inverted_rgb.split()
-                inverted_image = PILImage.merge('RGBA', (inverted_r, inverted_g, inverted_b, a))
-                
-                img_buffer = io.BytesIO()
-                inverted_image.save(img_buffer, format='PNG')
-                img_buffer.seek(0)
-                
-                return ImageReader(img_buffer)
-        except Exception as e:
-            print(f"Watermark image processing error: {e}")
+        png_bytes = fetch_inverted_logo_png(logo_url)
+        if png_bytes:
+            return ImageReader(io.BytesIO(png_bytes))
         return None
 
     def showPage(self):
@@ -129,28 +115,45 @@ class NumberedCanvas(canvas.Canvas):
 # ---------------------------------
 # LOGO PROCESSING FUNCTION
 # ---------------------------------
+def _invert_logo(content):
+    pil_img = PILImage.open(io.BytesIO(content))
+
+    if pil_img.mode != 'RGBA':
+        pil_img = pil_img.convert('RGBA')
+
+    r, g, b, a = pil_img.split()
+    rgb_image = PILImage.merge('RGB', (r, g, b))
+    inverted_rgb = ImageOps.invert(rgb_image)
+    inverted_r, inverted_g, inverted_b = inverted_rgb.split()
+    inverted_image = PILImage.merge('RGBA', (inverted_r, inverted_g, inverted_b, a))
+
+    img_buffer = io.BytesIO()
+    inverted_image.save(img_buffer, format='PNG')
+    return img_buffer.getvalue()
+
+
+def fetch_inverted_logo_png(logo_url):
+    """
+    Downloads the logo and returns it colour-inverted as PNG bytes.
+    The result is kept in the default cache, shared by all workers, so batch
+    PDF runs don't redo it for every document; failures are retried next time.
+    """
+    def compute():
+        content = fetch_bytes(logo_url)
+        if not content:
+            return None
+        try:
+            return _invert_logo(content)
+        except Exception:
+            logger.exception("Logo processing error for %s", logo_url)
+            return None
+
+    return get_or_compute('logo-png', [logo_url], compute, timeout=REMOTE_CACHE_TTL)
+
+
 def process_logo(logo_url):
     """Download and invert logo colors for the header."""
-    try:
-        response = requests.get(logo_url, stream=True, timeout=5)
-        if response.status_code == 200:
-            pil_img = PILImage.open(io.BytesIO(response.content))
-            
-            if pil_img.mode != 'RGBA':
-                pil_img = pil_img.convert('RGBA')
-            
-            r, g, b, a = pil_img.split()
-            rgb_image = PILImage.merge('RGB', (r, g, b))
-            inverted_rgb = ImageOps.invert(rgb_image)
-            inverted_r, inverted_g, inverted_b = inverted_rgb.split()
-            inverted_image = PILImage.merge('RGBA', (inverted_r, inverted_g, inverted_b, a))
-            
-            img_buffer = io.BytesIO()
-            inverted_image.save(img_buffer, format='PNG')
-            img_buffer.seek(0)
-            
-            return Image(img_buffer, width=2.8*inch, height=0.7*inch)
-    except Exception as e:
-        print(f"Header logo processing error: {e}")
-    
-    return None
\ No newline at end of file
+    png_bytes = fetch_inverted_logo_png(logo_url)
+    if png_bytes:
+        return Image(io.BytesIO(png_bytes), width=2.8*inch, height=0.7*inch)
+    return None
@@ -0,0 +1,21 @@
+# invoices/signals.py
+"""
+Invalidates the cached rows of the invoice list (templates/invoices/invoice_list.html)
+when an invoice, its line items, or its project / customer change. Status
+changes made by invoices/status.py are set-based UPDATEs without signals, so
+the row key includes the status itself.
+"""
+from core.cache import invalidate_objects_on_change
+from enquiries.models import Customer
+from projects.models import Project
+from .models import Invoice, InvoiceItem
+
+INVOICE_ROW_NAMESPACE = 'invoice-row'
+
+invalidate_objects_on_change(INVOICE_ROW_NAMESPACE, Invoice, lambda invoice: [invoice.pk])
+invalidate_objects_on_change(INVOICE_ROW_NAMESPACE, InvoiceItem, lambda item: [item.invoice_id])
+invalidate_objects_on_change(INVOICE_ROW_NAMESPACE, Project, lambda project: project.invoices.values_list('pk', flat=True))
+invalidate_objects_on_change(
+    INVOICE_ROW_NAMESPACE, Customer,
+    lambda customer: Invoice.objects.filter(project__customer=customer).values_list('pk', flat=True),
+)
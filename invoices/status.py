@@ -0,0 +1,57 @@
+# invoices/status.py
+"""
+Keeps the stored Invoice.status in step with payments, credits and due dates.
+
+Every rule is a single set-based UPDATE over the invoices whose balance (from
+InvoiceQuerySet.with_totals) says they are in the wrong state, so reconciling
+one invoice or the whole table costs the same three statements and running it
+twice changes nothing. DRAFT invoices are only touched once fully settled and
+VOID invoices are never touched.
+"""
+from decimal import Decimal
+
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import Invoice
+
+# Balances below half a fil count as settled (payments are rounded to 2 decimals).
+SETTLED_TOLERANCE = Decimal('0.005')
+
+
+def reconcile_statuses(invoices=None, today=None):
+    """
+    Brings the status of `invoices` (a queryset, default: all) up to date.
+    Returns {status: number of invoices moved into it}.
+    """
+    if invoices is None:
+        invoices = Invoice.objects.all()
+    today = today or timezone.localdate()
+    S = Invoice.InvoiceStatus
+
+    candidates = (
+        invoices.exclude(status=S.VOID)
+        .with_totals()
+        .annotate(due=F('grand_total_sum') - F('paid_sum') - F('credited_sum'))
+    )
+    unpaid = Q(due__gte=SETTLED_TOLERANCE)
+    past_due = Q(due_date__lt=today)
+    issued = ~Q(status=S.DRAFT)
+
+    rules = {
+        # Something must actually have been paid or credited, so an empty draft isn't "settled".
+        S.PAID: Q(due__lt=SETTLED_TOLERANCE) & (Q(paid_sum__gt=0) | Q(credited_sum__gt=0)),
+        S.OVERDUE: issued & unpaid & past_due,
+        S.SENT: issued & unpaid & ~past_due,
+    }
+    moved = {}
+    for status, condition in rules.items():
+        stale = candidates.filter(condition).exclude(status=status).values('pk')
+        moved[status] = Invoice.objects.filter(pk__in=stale).update(status=status)
+    return moved
+
+
+def reconcile_invoice(invoice_id, today=None):
+    """On-write hook: reconcile a single invoice by primary key."""
+    if invoice_id:
+        reconcile_statuses(Invoice.objects.filter(pk=invoice_id), today=today)
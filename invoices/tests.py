@@ -1,3 +1,76 @@
-from django.test import TestCase
+import datetime
+from decimal import Decimal
 
-# Create your tests here.
+from accounts.models import CreditNote, Payment
+from accounts.signals import invoice_items_batch
+from core.testing import TestCase
+from enquiries.models import Customer
+from projects.models import Project
+from .models import Invoice, InvoiceItem
+from .status import reconcile_statuses
+
+S = Invoice.InvoiceStatus
+TODAY = datetime.date(2026, 3, 1)
+
+
+class ReconcileStatusTests(TestCase):
+    def setUp(self):
+        super().setUp()
+        customer = Customer.objects.create(name='ACME Ltd', email='acme@example.com')
+        self.project = Project.objects.create(customer=customer, title='Villa')
+
+    def invoice(self, amount='1000', status=S.SENT, due_date=datetime.date(2099, 1, 1)):
+        invoice = Invoice.objects.create(project=self.project, tax_percentage=Decimal('5'), date=datetime.date(2026, 1, 10),
+                                         due_date=due_date, status=status)
+        if amount:
+            InvoiceItem.objects.create(invoice=invoice, description='Works', quantity=1, unit_price=Decimal(amount))
+        return invoice
+
+    def status(self, invoice):
+        invoice.refresh_from_db()
+        return invoice.status
+
+    def test_rules(self):
+        overdue = self.invoice(due_date=datetime.date(2026, 2, 1))
+        settled = self.invoice()
+        Payment.objects.create(invoice=settled, amount=Decimal('1000'), date_paid=TODAY)
+        CreditNote.objects.create(invoice=settled, amount=Decimal('50'), reason='Snag', date_issued=TODAY)
+        empty_draft = self.invoice(amount=None, status=S.DRAFT)
+        void = self.invoice(status=S.VOID, due_date=datetime.date(2026, 2, 1))
+        Invoice.objects.exclude(pk=void.pk).update(status=S.SENT)
+        Invoice.objects.filter(pk=empty_draft.pk).update(status=S.DRAFT)
+
+        moved = reconcile_statuses(today=TODAY)
+
+        self.assertEqual(moved, {S.PAID: 1, S.OVERDUE: 1, S.SENT: 0})
+        self.assertEqual(
+            [self.status(i) for i in (overdue, settled, empty_draft, void)],
+            [S.OVERDUE, S.PAID, S.DRAFT, S.VOID],
+        )
+        self.assertEqual(reconcile_statuses(today=TODAY), {S.PAID: 0, S.OVERDUE: 0, S.SENT: 0})
+
+    def test_undone_payment_reopens_the_invoice(self):
+        invoice = self.invoice()
+        payment = Payment.objects.create(invoice=invoice, amount=Decimal('1050'), date_paid=TODAY)
+        self.assertEqual(self.status(invoice), S.PAID)
+
+        payment.delete()
+        self.assertEqual(self.status(invoice), S.SENT)
+
+    def test_overdue_invoice_becomes_current_when_due_date_moves(self):
+        invoice = self.invoice(due_date=datetime.date(2026, 2, 1))
+        reconcile_statuses(today=TODAY)
+        Invoice.objects.filter(pk=invoice.pk).update(due_date=datetime.date(2026, 5, 1))
+
+        reconcile_statuses(today=TODAY)
+        self.assertEqual(self.status(invoice), S.SENT)
+
+    def test_item_batch_reconciles_once_at_the_end(self):
+        invoice = self.invoice(amount='100')
+        Payment.objects.create(invoice=invoice, amount=Decimal('105'), date_paid=TODAY)
+        self.assertEqual(self.status(invoice), S.PAID)
+
+        with invoice_items_batch(invoice):
+            InvoiceItem.objects.create(invoice=invoice, description='Extra', quantity=1, unit_price=Decimal('100'))
+            self.assertEqual(self.status(invoice), S.PAID)  # the per-item receivers stand down
+        self.assertEqual(self.status(invoice), S.SENT)
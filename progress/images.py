@@ -0,0 +1,187 @@
+# progress/images.py
+"""
+Photo processing for progress uploads.
+
+After an SCO uploads a photo, a background job (core/jobs.py):
+  * strips the upload's metadata (GPS, camera, ...) but keeps the photo
+    itself: a JPEG loses only its metadata segments, other images are
+    re-saved losslessly by Pillow;
+  * writes WebP + JPEG renditions for on-page display and thumbnails,
+    upright according to the EXIF orientation.
+
+The rendition paths are stored in the model's `renditions` field; pages show
+the thumbnail (lazy-loaded) and link to the display size, and the original
+stays downloadable at full quality. Uploads that aren't images (PDFs,
+spreadsheets) are left untouched. Pillow is imported only by the functions
+that decode and encode, i.e. in the worker.
+"""
+import io
+import posixpath
+
+from django.apps import apps
+from django.core.files.base import ContentFile
+from django.db import transaction
+
+from core.jobs import enqueue
+
+RENDITION_SIZES = {'display': 1280, 'thumb': 320}
+JPEG_QUALITY = 82
+WEBP_QUALITY = 78
+
+ORIENTATION_TAG = 0x0112
+# JPEG segments that carry metadata: APP1 (EXIF, XMP), APP13 (IPTC) and comments.
+JPEG_METADATA_MARKERS = {0xE1, 0xED, 0xFE}
+
+
+def _encode(img, max_size, fmt):
+    """Downscaled copy of `img` encoded as JPEG or WEBP, with no metadata attached."""
+    from PIL import Image
+
+    copy = img.copy()
+    copy.thumbnail((max_size, max_size), Image.LANCZOS)
+    buf = io.BytesIO()
+    if fmt == 'WEBP':
+        copy.save(buf, 'WEBP', quality=WEBP_QUALITY, method=4)
+    else:
+        copy.save(buf, 'JPEG', quality=JPEG_QUALITY, optimize=True, progressive=True)
+    return buf.getvalue()
+
+
+def _flatten(img):
+    """`img` upright and in RGB, ready to encode as JPEG / WebP."""
+    from PIL import Image, ImageOps
+
+    img = ImageOps.exif_transpose(img)
+    if img.mode in ('RGBA', 'LA', 'P'):
+        img = img.convert('RGBA')
+        background = Image.new('RGB', img.size, (255, 255, 255))
+        background.paste(img, mask=img.getchannel('A'))
+        img = background
+    elif img.mode != 'RGB':
+        img = img.convert('RGB')
+    return img
+
+
+def _strip_jpeg(data, orientation):
+    """
+    The JPEG `data` without its metadata segments, the compressed image
+    untouched. Anything after the first image (the extra pictures of an MPO)
+    is dropped along with its index. A non-default orientation is put back as
+    a minimal EXIF block. Returns None if the file isn't laid out as expected.
+    """
+    from PIL import Image
+
+    segments = []
+    i = 2
+    while i + 4 <= len(data) and data[i] == 0xFF:
+        marker = data[i + 1]
+        if marker == 0xDA:  # start of scan: compressed data up to the end-of-image marker
+            end = data.find(b'\xff\xd9', i)
+            if end < 0:
+                return None
+            scan = data[i:end + 2]
+            break
+        length = int.from_bytes(data[i + 2:i + 4], 'big')
+        segment = data[i:i + 2 + length]
+        is_mpo_index = marker == 0xE2 and segment[4:8] == b'MPF\x00'
+        if marker not in JPEG_METADATA_MARKERS and not is_mpo_index:
+            segments.append(segment)
+        i += 2 + length
+    else:
+        return None
+
+    if orientation != 1:
+        exif = Image.Exif()
+        exif[ORIENTATION_TAG] = orientation
+        payload = exif.tobytes()
+        app1 = b'\xff\xe1' + (len(payload) + 2).to_bytes(2, 'big') + payload
+        # After the JFIF header if there is one, else first.
+        at = 1 if segments and segments[0][1] == 0xE0 else 0
+        segments.insert(at, app1)
+    return b'\xff\xd8' + b''.join(segments) + scan
+
+
+def _without_metadata(data, img):
+    """The upload's bytes with its metadata removed, or None if it can't be cleaned."""
+    if data[:2] == b'\xff\xd8':
+        return _strip_jpeg(data, img.getexif().get(ORIENTATION_TAG, 1))
+    # Other formats are re-saved from the pixels alone, upright since no EXIF is kept.
+    from PIL import ImageOps
+
+    clean = ImageOps.exif_transpose(img).copy()
+    clean.info = {}
+    buf = io.BytesIO()
+    try:
+        clean.save(buf, img.format, **({'lossless': True} if img.format == 'WEBP' else {}))
+    except (KeyError, OSError, ValueError):
+        return None
+    return buf.getvalue()
+
+
+def delete_renditions(storage, renditions):
+    for sizes in (renditions or {}).values():
+        for path in sizes.values():
+            storage.delete(path)
+
+
+def optimize_upload(model, pk):
+    """
+    Processes the photo on one DailyProgress / WeeklyProgress row.
+    Returns True if the upload was an image and has been processed.
+    """
+    from PIL import Image, UnidentifiedImageError
+
+    obj = model.objects.filter(pk=pk).first()
+    if obj is None or not obj.file_upload or obj.renditions:
+        return False
+    storage = obj.file_upload.storage
+    original_name = obj.file_upload.name
+    with storage.open(original_name, 'rb') as f:
+        data = f.read()
+    try:
+        img = Image.open(io.BytesIO(data))
+        img.load()
+    except (UnidentifiedImageError, OSError, Image.DecompressionBombError):
+        return False
+
+    directory, filename = posixpath.split(original_name)
+    stem = posixpath.splitext(filename)[0]
+    upright = _flatten(img)
+    renditions = {}
+    for size_name, max_size in RENDITION_SIZES.items():
+        renditions[size_name] = {
+            'webp': storage.save(posixpath.join(directory, 'renditions', f'{stem}_{size_name}.webp'), ContentFile(_encode(upright, max_size, 'WEBP'))),
+            'jpeg': storage.save(posixpath.join(directory, 'renditions', f'{stem}_{size_name}.jpg'), ContentFile(_encode(upright, max_size, 'JPEG'))),
+        }
+    cleaned = _without_metadata(data, img)
+    new_name = storage.save(original_name, ContentFile(cleaned)) if cleaned and cleaned != data else None
+
+    with transaction.atomic():
+        current = model.objects.select_for_update().filter(pk=pk, file_upload=original_name).first()
+        if current is not None:
+            # A model save, so the replaced upload is released (core/signals.py) and
+            # update_fields so a concurrent edit of the text fields isn't overwritten.
+            current.renditions = renditions
+            if new_name:
+                current.file_upload.name = new_name
+            current.save(update_fields=['file_upload', 'renditions'])
+    if current is None:
+        # A new file was uploaded while we were working; throw this work away.
+        if new_name:
+            storage.delete(new_name)
+        delete_renditions(storage, renditions)
+        return False
+    return True
+
+
+def optimize_photo(model, pk):
+    """Job task: processes the upload of a `model` ('app_label.Model') row."""
+    return {'processed': optimize_upload(apps.get_model(model), pk)}
+
+
+def queue_optimization(instance):
+    """
+    Queues the new upload for processing by the `run_jobs` worker. The replaced
+    upload and its renditions were already released on save (core/signals.py).
+    """
+    enqueue('progress.images.optimize_photo', model=instance._meta.label, pk=instance.pk)
@@ -0,0 +1,26 @@
+# progress/management/commands/optimize_progress_photos.py
+from django.core.management.base import BaseCommand
+
+from progress.images import optimize_upload
+from progress.models import DailyProgress, WeeklyProgress
+
+
+class Command(BaseCommand):
+    help = (
+        "Processes progress photos that have no renditions yet (existing uploads, or ones whose "
+        "background job didn't finish): strips metadata from the original and writes upright "
+        "WebP/JPEG display and thumbnail renditions."
+    )
+
+    def handle(self, *args, **options):
+        total = 0
+        for model in (DailyProgress, WeeklyProgress):
+            pks = (
+                model.objects.exclude(file_upload='').exclude(file_upload__isnull=True)
+                .filter(renditions={})
+                .values_list('pk', flat=True)
+            )
+            done = sum(1 for pk in pks.iterator() if optimize_upload(model, pk))
+            self.stdout.write(f"{model.__name__}: processed {done} photo(s)")
+            total += done
+        self.stdout.write(self.style.SUCCESS(f"Processed {total} photo(s)."))
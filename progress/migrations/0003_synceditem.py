@@ -0,0 +1,28 @@
+# Generated by Django 5.2.7 on 2026-10-19 13:41
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('progress', '0002_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SyncedItem',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('client_id', models.UUIDField(unique=True)),
+                ('kind', models.CharField(max_length=30)),
+                ('object_id', models.PositiveIntegerField()),
+                ('result', models.CharField(help_text='Outcome when first applied: created or updated.', max_length=20)),
+                ('synced_at', models.DateTimeField(auto_now_add=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='synced_items', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+    ]
@@ -0,0 +1,58 @@
+# Generated by Django 5.2.7 on 2026-10-19 14:12
+
+import django.db.models.deletion
+import progress.models
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('progress', '0004_photo_renditions'),
+        ('projects', '0003_project_closed_at_archived_at'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedDailyProgress',
+            fields=[
+                ('renditions', models.JSONField(blank=True, default=dict, editable=False)),
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('date', models.DateField()),
+                ('planned_task', models.TextField(help_text='Admin: Enter the tasks for the day here.')),
+                ('admin_remarks', models.TextField(blank=True, help_text='Admin: Enter your remarks after SCO submission.')),
+                ('actual_progress', models.TextField(blank=True, help_text='SCO: Describe the actual work done.')),
+                ('file_upload', models.FileField(blank=True, help_text='SCO: Upload any relevant files or photos.', null=True, upload_to=progress.models.progress_file_upload_path)),
+                ('status', models.CharField(choices=[('PENDING', 'Pending Submission'), ('SUBMITTED', 'Submitted for Review'), ('REVIEWED', 'Reviewed and Closed')], default='PENDING', max_length=20)),
+                ('assigned_to', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='projects.project')),
+                ('submitted_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'archived daily progress',
+                'ordering': ['-date'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedWeeklyProgress',
+            fields=[
+                ('renditions', models.JSONField(blank=True, default=dict, editable=False)),
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('week_start_date', models.DateField(help_text='Select the Monday of the week for this report.')),
+                ('planned_task', models.TextField(help_text='Admin: Enter the main goals for the week.')),
+                ('admin_remarks', models.TextField(blank=True, help_text='Admin: Enter your review for the week.')),
+                ('actual_progress', models.TextField(blank=True, help_text='SCO: Summarize the work done this week.')),
+                ('file_upload', models.FileField(blank=True, null=True, upload_to=progress.models.weekly_progress_file_upload_path)),
+                ('status', models.CharField(choices=[('PENDING', 'Pending Submission'), ('SUBMITTED', 'Submitted for Review'), ('REVIEWED', 'Reviewed and Closed')], default='PENDING', max_length=20)),
+                ('assigned_to', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='projects.project')),
+                ('submitted_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'archived weekly progress',
+                'ordering': ['-week_start_date'],
+            },
+        ),
+    ]
@@ -2,15 +2,37 @@
 
 from django.db import models
 from django.utils.translation import gettext_lazy as _
+from core.archive import HistoryManager, archive_model
 from projects.models import Project
 from users.models import User
 
+class PhotoRenditionsMixin(models.Model):
+    """
+    Optimised copies of an uploaded photo, written by progress/images.py:
+    {'display': {'webp': path, 'jpeg': path}, 'thumb': {...}}. Empty until
+    processing finishes, and for uploads that aren't images.
+    """
+    renditions = models.JSONField(default=dict, blank=True, editable=False)
+
+    class Meta:
+        abstract = True
+
+    @property
+    def rendition_urls(self):
+        """{'display_webp': url, 'display_jpeg': url, 'thumb_webp': url, 'thumb_jpeg': url}"""
+        storage = self.file_upload.storage
+        return {
+            f'{size}_{fmt}': storage.url(path)
+            for size, formats in (self.renditions or {}).items()
+            for fmt, path in formats.items()
+        }
+
 # We need a function to define the upload path for files
 def progress_file_upload_path(instance, filename):
     # file will be uploaded to MEDIA_ROOT/project_<id>/<date>_<filename>
     return f'project_{instance.project.id}/{instance.date}_{filename}'
 
-class DailyProgress(models.Model):
+class DailyProgress(PhotoRenditionsMixin):
     """
     A single entry that tracks the planned task, the actual progress,
     and admin remarks for a specific day of a project.
@@ -47,6 +69,8 @@ class DailyProgress(models.Model):
     status = models.CharField(max_length=20, choices=ProgressStatus.choices, default=ProgressStatus.PENDING_SUBMISSION)
     submitted_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='submitted_progress')
 
+    objects = HistoryManager()
+
     class Meta:
         # UPDATED: A task is now unique for a project, a date, AND an assigned SCO.
         ordering = ['-date']
@@ -62,7 +86,7 @@ def weekly_progress_file_upload_path(instance, filename):
     # file will be uploaded to MEDIA_ROOT/project_<id>/weekly_<date>_<filename>
     return f'project_{instance.project.id}/weekly_{instance.week_start_date}_{filename}'
 
-class WeeklyProgress(models.Model):
+class WeeklyProgress(PhotoRenditionsMixin):
     """
     Tracks the planned task, actual progress, and admin remarks for a
     specific week of a project.
@@ -93,6 +117,8 @@ class WeeklyProgress(models.Model):
     status = models.CharField(max_length=20, choices=ProgressStatus.choices, default=ProgressStatus.PENDING_SUBMISSION)
     submitted_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='submitted_weekly_progress')
 
+    objects = HistoryManager()
+
     class Meta:
         ordering = ['-week_start_date']
         unique_together = ('project', 'week_start_date', 'assigned_to')
@@ -100,4 +126,24 @@ class WeeklyProgress(models.Model):
         
 
     def __str__(self):
-        return f"Weekly Report for {self.project.title} starting {self.week_start_date}"
\ No newline at end of file
+        return f"Weekly Report for {self.project.title} starting {self.week_start_date}"
+
+# Archive tables for closed projects' progress (core/archive.py)
+ArchivedDailyProgress = archive_model(DailyProgress, 'ArchivedDailyProgress', bases=(PhotoRenditionsMixin,))
+ArchivedWeeklyProgress = archive_model(WeeklyProgress, 'ArchivedWeeklyProgress', bases=(PhotoRenditionsMixin,))
+
+class SyncedItem(models.Model):
+    """
+    Remembers every item applied through the offline sync endpoint by its
+    client-generated id, so a batch that is re-sent after a dropped
+    connection returns the original result instead of applying twice.
+    """
+    client_id = models.UUIDField(unique=True)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='synced_items')
+    kind = models.CharField(max_length=30)
+    object_id = models.PositiveIntegerField()
+    result = models.CharField(max_length=20, help_text="Outcome when first applied: created or updated.")
+    synced_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.kind} {self.object_id} from {self.client_id}"
@@ -0,0 +1,182 @@
+# progress/sync.py
+"""
+Batched, idempotent sync for updates queued on site while offline.
+
+A batch is a list of items, each carrying a client-generated UUID:
+
+    {"client_id": "...", "type": "daily_progress", "id": 12, "actual_progress": "..."}
+    {"client_id": "...", "type": "dpr", "project": 3, "date": "2026-01-02",
+     "contractor_name": "...", "subcontractor_name": "...", "chronological_account": "...",
+     "activities_for_next_day": "...", "issues_encountered": "...",
+     "manpower": [{"staff_type": "Mason", "day_count": 3, "night_count": 0}, ...],
+     "subcontractor": [...], "equipment": [{"equipment_name": "Crane", ...}, ...]}
+
+The whole batch runs in one transaction with a savepoint per item, so one
+bad item is reported without undoing the rest. Items whose client_id was
+already applied (by this or an earlier upload) return their original
+result; if a concurrent upload of the same items commits first, the batch
+is rolled back and replayed against its receipts. File uploads are not part of the sync; they still go through the
+normal forms.
+"""
+import uuid
+
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+
+from projects.models import Project
+from reports.forms import DailyReportForm
+from reports.models import DailyReport, EquipmentLog, ManpowerLog, SubcontractorLog
+from .forms import SCOProgressUpdateForm
+from .models import DailyProgress, SyncedItem
+
+MAX_BATCH_ITEMS = 200
+
+# payload key -> (log model, name field)
+DPR_LOG_TABLES = {
+    'manpower': (ManpowerLog, 'staff_type'),
+    'subcontractor': (SubcontractorLog, 'staff_type'),
+    'equipment': (EquipmentLog, 'equipment_name'),
+}
+DPR_FIELDS = ['date', 'contractor_name', 'subcontractor_name', 'chronological_account', 'activities_for_next_day', 'issues_encountered']
+
+
+class SyncItemError(Exception):
+    def __init__(self, errors):
+        super().__init__(errors)
+        self.errors = errors
+
+
+def _client_id(item):
+    try:
+        return uuid.UUID(str(item.get('client_id')))
+    except (ValueError, AttributeError):
+        return None
+
+
+def _is_id(value):
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def _form_data(item, fields):
+    data = {field: item.get(field) or '' for field in fields}
+    errors = {field: ["Expected a string."] for field, value in data.items() if not isinstance(value, str)}
+    if errors:
+        raise SyncItemError(errors)
+    return data
+
+
+def _apply_daily_progress(user, item, progress_by_pk):
+    if not _is_id(item.get('id')):
+        raise SyncItemError({'id': ["An integer id is required."]})
+    report = progress_by_pk.get(item['id'])
+    if report is None:
+        raise SyncItemError({'id': ["Daily progress entry not found."]})
+    # Same rule as daily_progress_detail: the assigned SCO, while the entry is still open.
+    if not (user.role == 'sco' and report.assigned_to_id == user.pk and report.status in ['PENDING', 'SUBMITTED']):
+        raise SyncItemError({'id': ["You can't update this progress entry."]})
+
+    form = SCOProgressUpdateForm(_form_data(item, ['actual_progress']), instance=report)
+    if not form.is_valid():
+        raise SyncItemError(form.errors.get_json_data())
+    progress = form.save(commit=False)
+    progress.status = 'SUBMITTED'
+    progress.submitted_by = user
+    progress.save(update_fields=['actual_progress', 'status', 'submitted_by'])
+    return progress.pk, 'updated'
+
+
+def _apply_dpr(user, item, allowed_projects, existing_dprs):
+    project_id = item.get('project')
+    if not _is_id(project_id):
+        raise SyncItemError({'project': ["An integer project id is required."]})
+    if project_id not in allowed_projects:
+        raise SyncItemError({'project': ["Project not found or not assigned to you."]})
+
+    form = DailyReportForm(_form_data(item, DPR_FIELDS))
+    if not form.is_valid():
+        raise SyncItemError(form.errors.get_json_data())
+    report_date = form.cleaned_data['date']
+    if (project_id, report_date) in existing_dprs:
+        raise SyncItemError({'date': [f"A Daily Progress Report for this project on {report_date:%d %B %Y} already exists."]})
+
+    report = form.save(commit=False)
+    report.project_id = project_id
+    report.created_by = user
+    report.save()
+
+    for key, (model, name_field) in DPR_LOG_TABLES.items():
+        rows = item.get(key) or []
+        if not isinstance(rows, list):
+            raise SyncItemError({key: ["Expected a list of objects."]})
+        logs = []
+        for i, row in enumerate(rows):
+            if not isinstance(row, dict):
+                raise SyncItemError({f'{key}[{i}]': ["Expected an object."]})
+            log = model(report=report, **{name_field: row.get(name_field, '')},
+                        day_count=row.get('day_count') or 0, night_count=row.get('night_count') or 0)
+            try:
+                log.full_clean(exclude=['report'])
+            except ValidationError as exc:
+                raise SyncItemError({f'{key}[{i}]': exc.message_dict})
+            logs.append(log)
+        model.objects.bulk_create(logs)
+    existing_dprs.add((project_id, report_date))
+    return report.pk, 'created'
+
+
+def apply_batch(user, items):
+    """Applies a list of queued items for `user`; returns one result dict per item, in order."""
+    try:
+        return _apply_batch(user, items)
+    except IntegrityError:
+        # A concurrent upload of some of these items committed first (a receipt's
+        # client_id, or a DPR's project and date, now exists). Everything was rolled
+        # back; a replay sees its rows and reports those items as such.
+        return _apply_batch(user, items)
+
+
+def _apply_batch(user, items):
+    client_ids = [cid for cid in (_client_id(item) for item in items) if cid]
+    seen = {s.client_id: s for s in SyncedItem.objects.filter(client_id__in=client_ids)}
+
+    # Everything the handlers need is loaded up front, a query per kind for the whole batch.
+    progress_ids = {item.get('id') for item in items if item.get('type') == 'daily_progress' and _is_id(item.get('id'))}
+    progress_by_pk = DailyProgress.objects.in_bulk(progress_ids)
+    project_ids = {item.get('project') for item in items if item.get('type') == 'dpr' and _is_id(item.get('project'))}
+    projects = Project.objects.all() if user.role == 'admin' else user.projects.all()
+    allowed_projects = set(projects.filter(archived_at__isnull=True, pk__in=project_ids).values_list('pk', flat=True))
+    existing_dprs = set(DailyReport.objects.filter(project_id__in=allowed_projects).values_list('project_id', 'date'))
+
+    results = []
+    receipts = []
+    with transaction.atomic():
+        for item in items:
+            client_id = _client_id(item)
+            kind = item.get('type')
+            if client_id is None:
+                results.append({'client_id': item.get('client_id'), 'status': 'error', 'errors': {'client_id': ["A UUID client_id is required."]}})
+                continue
+            if client_id in seen:
+                previous = seen[client_id]
+                results.append({'client_id': str(client_id), 'status': 'duplicate', 'type': previous.kind, 'id': previous.object_id, 'result': previous.result})
+                continue
+
+            try:
+                with transaction.atomic():  # savepoint: a failing item leaves no partial rows
+                    if kind == 'daily_progress':
+                        object_id, outcome = _apply_daily_progress(user, item, progress_by_pk)
+                    elif kind == 'dpr':
+                        object_id, outcome = _apply_dpr(user, item, allowed_projects, existing_dprs)
+                    else:
+                        raise SyncItemError({'type': ["Expected 'daily_progress' or 'dpr'."]})
+            except SyncItemError as exc:
+                results.append({'client_id': str(client_id), 'status': 'error', 'type': kind, 'errors': exc.errors})
+                continue
+
+            receipt = SyncedItem(client_id=client_id, user=user, kind=kind, object_id=object_id, result=outcome)
+            receipts.append(receipt)
+            seen[client_id] = receipt
+            results.append({'client_id': str(client_id), 'status': outcome, 'type': kind, 'id': object_id})
+
+        SyncedItem.objects.bulk_create(receipts)
+    return results
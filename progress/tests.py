@@ -1,3 +1,168 @@
-from django.test import TestCase
+import datetime
+import io
+import json
+import tempfile
+import uuid
+from unittest import mock
 
-# Create your tests here.
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import override_settings
+
+from core.jobs import claim_next, run_job
+from core.models import Job
+from core.testing import TestCase
+from enquiries.models import Customer
+from projects.models import Project
+from reports.models import DailyReport
+from users.models import User
+from .models import DailyProgress, SyncedItem
+from .images import ORIENTATION_TAG
+from .sync import apply_batch
+
+
+def dpr(project, date, **fields):
+    return {'client_id': str(uuid.uuid4()), 'type': 'dpr', 'project': project, 'date': date, **fields}
+
+
+class OfflineSyncTests(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.sco = User.objects.create_user('sco', password='pw', role='sco')
+        customer = Customer.objects.create(name='ACME Ltd', email='acme@example.com')
+        self.project = Project.objects.create(customer=customer, title='Villa')
+        self.project.assigned_scos.add(self.sco)
+        self.progress = DailyProgress.objects.create(project=self.project, date=datetime.date(2026, 1, 2),
+                                                     assigned_to=self.sco, planned_task='Tiling')
+
+    def statuses(self, results):
+        return [r['status'] for r in results]
+
+    def test_batch_applies_items_and_replays_as_duplicates(self):
+        items = [
+            {'client_id': str(uuid.uuid4()), 'type': 'daily_progress', 'id': self.progress.pk, 'actual_progress': 'Done'},
+            dpr(self.project.pk, '2026-01-02', manpower=[{'staff_type': 'Mason', 'day_count': 3}]),
+        ]
+        self.assertEqual(self.statuses(apply_batch(self.sco, items)), ['updated', 'created'])
+        self.assertEqual(self.statuses(apply_batch(self.sco, items)), ['duplicate', 'duplicate'])
+
+        self.progress.refresh_from_db()
+        self.assertEqual((self.progress.status, self.progress.actual_progress), ('SUBMITTED', 'Done'))
+        self.assertEqual(DailyReport.objects.get().manpower_logs.get().day_count, 3)
+
+    def test_bad_items_fail_alone(self):
+        items = [
+            dpr(self.project.pk, '2026-01-02', manpower=['oops']),
+            dpr([1], '2026-01-02'),
+            {'client_id': str(uuid.uuid4()), 'type': 'daily_progress', 'id': [1]},
+            dpr(self.project.pk, ['2026-01-02']),
+            dpr(self.project.pk, '2026-01-02', equipment={'a': 1}),
+            {'client_id': 'not-a-uuid', 'type': 'dpr'},
+            dpr(self.project.pk, '2026-01-03', manpower=[{'staff_type': 'Mason', 'day_count': 2}]),
+        ]
+        results = apply_batch(self.sco, items)
+
+        self.assertEqual(self.statuses(results), ['error'] * 6 + ['created'])
+        self.assertEqual(list(DailyReport.objects.values_list('date', flat=True)), [datetime.date(2026, 1, 3)])
+
+    def test_concurrent_upload_of_the_same_items(self):
+        raced = dpr(self.project.pk, '2026-01-09')
+        fresh = dpr(self.project.pk, '2026-01-10')
+        # Another upload of `raced` commits after this batch looked for receipts.
+        report = DailyReport.objects.create(project=self.project, date=datetime.date(2026, 1, 8), created_by=self.sco)
+        SyncedItem.objects.create(client_id=raced['client_id'], user=self.sco, kind='dpr', object_id=report.pk, result='created')
+        lookups = []
+        real_filter = SyncedItem.objects.filter
+
+        def filter_missing_first(*args, **kwargs):
+            lookups.append(kwargs)
+            return SyncedItem.objects.none() if len(lookups) == 1 else real_filter(*args, **kwargs)
+
+        with mock.patch.object(SyncedItem.objects, 'filter', filter_missing_first):
+            results = apply_batch(self.sco, [fresh, raced])
+
+        self.assertEqual(self.statuses(results), ['created', 'duplicate'])
+        self.assertEqual(DailyReport.objects.filter(date=datetime.date(2026, 1, 10)).count(), 1)
+
+    def test_endpoint(self):
+        self.client.force_login(self.sco)
+        response = self.client.post('/progress/sync/', json.dumps({'items': [dpr(self.project.pk, '2026-01-05')]}),
+                                    content_type='application/json')
+        self.assertEqual(response.json()['results'][0]['status'], 'created')
+        self.assertEqual(self.client.post('/progress/sync/', 'junk', content_type='application/json').status_code, 400)
+
+
+def jpeg_with_metadata(size=(1200, 800)):
+    from PIL import Image
+
+    img = Image.new('RGB', size, (200, 10, 10))
+    exif = img.getexif()
+    exif[ORIENTATION_TAG] = 6  # rotated 90 degrees
+    exif[0x010F] = 'CameraMaker'
+    exif[0x8825] = {1: 'N', 2: (25.0, 12.0, 0.0)}  # GPS
+    buf = io.BytesIO()
+    img.save(buf, 'JPEG', exif=exif, quality=95, comment=b'private note')
+    return buf.getvalue()
+
+
+class PhotoProcessingTests(TestCase):
+    def setUp(self):
+        super().setUp()
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        override = override_settings(MEDIA_ROOT=media.name)
+        override.enable()
+        self.addCleanup(override.disable)
+
+        self.sco = User.objects.create_user('sco', password='pw', role='sco')
+        customer = Customer.objects.create(name='ACME Ltd', email='acme@example.com')
+        project = Project.objects.create(customer=customer, title='Villa')
+        project.assigned_scos.add(self.sco)
+        self.progress = DailyProgress.objects.create(project=project, date=datetime.date(2026, 1, 2),
+                                                     assigned_to=self.sco, planned_task='Tiling')
+
+    def upload(self, data, name='site.jpg'):
+        self.client.force_login(self.sco)
+        self.client.post(f'/progress/detail/{self.progress.pk}/', {
+            'submit_sco_progress': '1', 'actual_progress': 'Tiled', 'file_upload': SimpleUploadedFile(name, data),
+        })
+        self.progress.refresh_from_db()
+
+    def run_jobs(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            while job := claim_next():
+                run_job(job)
+
+    def test_original_is_kept_without_metadata(self):
+        from PIL import Image
+
+        raw = jpeg_with_metadata()
+        self.upload(raw)
+        self.assertEqual(Job.objects.get().task, 'progress.images.optimize_photo')
+        self.run_jobs()
+        self.progress.refresh_from_db()
+
+        with self.progress.file_upload.open('rb') as f:
+            data = f.read()
+        photo = Image.open(io.BytesIO(data))
+        self.assertEqual(photo.size, (1200, 800))  # full size, not re-encoded
+        self.assertEqual(dict(photo.getexif()), {ORIENTATION_TAG: 6})
+        self.assertNotIn(b'private note', data)
+        self.assertEqual(data[data.index(b'\xff\xda'):], raw[raw.index(b'\xff\xda'):])
+
+        storage = self.progress.file_upload.storage
+        with storage.open(self.progress.renditions['thumb']['jpeg']) as f:
+            self.assertEqual(Image.open(f).size, (213, 320))  # upright
+
+    def test_new_upload_releases_old_renditions(self):
+        self.upload(jpeg_with_metadata())
+        self.run_jobs()
+        self.progress.refresh_from_db()
+        storage = self.progress.file_upload.storage
+        old = [path for sizes in self.progress.renditions.values() for path in sizes.values()]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.progress.file_upload.save('other.pdf', ContentFile(b'%PDF-1.4'))
+        self.progress.refresh_from_db()
+        self.assertEqual(self.progress.renditions, {})
+        self.assertFalse(any(storage.exists(path) for path in old))
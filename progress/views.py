@@ -1,11 +1,13 @@
 # progress/views.py
 
-from django.shortcuts import render, get_object_or_404, redirect
+from django.shortcuts import render, redirect
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from users.decorators import role_required
+from core.archive import get_history_or_404
 from .models import DailyProgress
 from .forms import SCOProgressUpdateForm, AdminReviewForm
+from .images import queue_optimization
 
 
 @login_required
@@ -21,7 +23,7 @@ def daily_progress_review_list(request):
 
 @login_required
 def daily_progress_detail(request, pk):
-    report = get_object_or_404(DailyProgress, pk=pk)
+    report = get_history_or_404(DailyProgress, pk=pk)
     project = report.project
     user = request.user
 
@@ -34,11 +36,11 @@ def daily_progress_detail(request, pk):
     if user.role == 'sco':
         # The logic is now much simpler: an SCO can edit if the report
         # is in the right status AND it is assigned to them.
-        if report.status in ['PENDING', 'SUBMITTED'] and report.assigned_to == user:
+        if report.status in ['PENDING', 'SUBMITTED'] and report.assigned_to == user and not project.archived_at:
             user_can_edit_sco_form = True
 
     user_can_edit_admin_form = False
-    if user.role == 'admin' and report.status == 'SUBMITTED':
+    if user.role == 'admin' and report.status == 'SUBMITTED' and not project.archived_at:
         user_can_edit_admin_form = True
 
     # --- Form Handling (remains the same) ---
@@ -50,6 +52,8 @@ def daily_progress_detail(request, pk):
                 progress.status = 'SUBMITTED'
                 progress.submitted_by = user
                 progress.save()
+                if 'file_upload' in request.FILES:
+                    queue_optimization(progress)
                 messages.success(request, 'Your progress has been saved.')
             else: messages.error(request, 'Error saving your progress.')
             return redirect('progress:daily_progress_detail', pk=report.pk)
@@ -85,7 +89,7 @@ from .models import WeeklyProgress
 
 @login_required
 def weekly_progress_detail(request, pk):
-    report = get_object_or_404(WeeklyProgress, pk=pk)
+    report = get_history_or_404(WeeklyProgress, pk=pk)
     project = report.project
     user = request.user
 
@@ -98,10 +102,10 @@ def weekly_progress_detail(request, pk):
     if user.role == 'sco':
         # The logic is now much simpler: an SCO can edit if the report
         # is in the right status AND it is assigned to them.
-        if report.status in ['PENDING', 'SUBMITTED'] and report.assigned_to == user:
+        if report.status in ['PENDING', 'SUBMITTED'] and report.assigned_to == user and not project.archived_at:
             user_can_edit_sco_form = True
 
-    user_can_edit_admin_form = (user.role == 'admin' and report.status == 'SUBMITTED')
+    user_can_edit_admin_form = (user.role == 'admin' and report.status == 'SUBMITTED' and not project.archived_at)
 
 
     # Form Handling
@@ -113,6 +117,8 @@ def weekly_progress_detail(request, pk):
                 progress.status = 'SUBMITTED'
                 progress.submitted_by = user
                 progress.save()
+                if 'file_upload' in request.FILES:
+                    queue_optimization(progress)
                 messages.success(request, 'Your weekly progress has been saved.')
             return redirect('progress:weekly_progress_detail', pk=report.pk)
         
@@ -134,4 +140,29 @@ def weekly_progress_detail(request, pk):
         'user_can_edit_sco_form': user_can_edit_sco_form,
         'user_can_edit_admin_form': user_can_edit_admin_form,
     }
-    return render(request, 'progress/weekly_progress_detail.html', context)
\ No newline at end of file
+    return render(request, 'progress/weekly_progress_detail.html', context)
+
+
+import json
+from django.http import JsonResponse
+from .sync import MAX_BATCH_ITEMS, apply_batch
+
+@login_required
+def offline_sync(request):
+    """
+    JSON endpoint for updates queued while offline: POST {"items": [...]} and get back
+    {"results": [...]}, one result per item in the same order. See progress/sync.py
+    for the item format. Re-sending a batch is safe.
+    """
+    if request.method != 'POST':
+        return JsonResponse({'error': 'POST a JSON body of the form {"items": [...]}.'}, status=405)
+    try:
+        items = json.loads(request.body)['items']
+    except (ValueError, KeyError, TypeError):
+        return JsonResponse({'error': 'Body must be JSON of the form {"items": [...]}.'}, status=400)
+    if not isinstance(items, list) or not all(isinstance(item, dict) for item in items):
+        return JsonResponse({'error': '"items" must be a list of objects.'}, status=400)
+    if len(items) > MAX_BATCH_ITEMS:
+        return JsonResponse({'error': f'At most {MAX_BATCH_ITEMS} items per batch.'}, status=400)
+
+    return JsonResponse({'results': apply_batch(request.user, items)})
@@ -5,10 +5,64 @@ from django.utils.translation import gettext_lazy as _
 from quotations.models import Quotation
 from users.models import User # Import our custom User model
 from decimal import Decimal
-from django.db.models import Sum
+from django.db.models import Case, Sum, F, OuterRef, Subquery, Value, When, DecimalField
+from django.db.models.functions import Abs, Coalesce, Round
+from django.db.models.lookups import LessThanOrEqual
 from enquiries.models import Customer # Add this import
 
 from django.utils import timezone # Make sure timezone is imported at the top
+
+MONEY_FIELD = DecimalField(max_digits=20, decimal_places=4)
+
+
+def _project_sum_subquery(queryset, project_lookup, expression):
+    """Correlated per-project SUM over `queryset`, so each total is computed without multiplying rows."""
+    totals = (
+        queryset.filter(**{project_lookup: OuterRef('pk')})
+        .order_by()
+        .values(project_lookup)
+        .annotate(total=Sum(expression, output_field=MONEY_FIELD))
+        .values('total')
+    )
+    return Coalesce(Subquery(totals, output_field=MONEY_FIELD), Value(0), output_field=MONEY_FIELD)
+
+
+def _rounded_receivable(amount):
+    """Project.accounts_receivable in SQL: rounded to 2 decimals, with dust (|value| <= 0.01) as zero."""
+    rounded = Round(amount, 2, output_field=MONEY_FIELD)
+    return Case(
+        When(LessThanOrEqual(Abs(rounded), Value(Decimal('0.01'))), then=Value(Decimal('0.00'))),
+        default=rounded,
+        output_field=MONEY_FIELD,
+    )
+
+
+class ProjectQuerySet(models.QuerySet):
+    def with_financials(self):
+        """
+        Annotates the financial figures the accounts pages need, all in one query:
+        budget_sum (subtotal), invoiced_subtotal_sum, invoiced_grand_sum, received_sum,
+        credited_sum and receivable_sum. Voided invoices are excluded, and receivable_sum is
+        rounded like accounts_receivable, as in the properties.
+        """
+        from invoices.models import InvoiceItem, item_total_expression
+        from accounts.models import CreditNote, Payment
+
+        valid_items = InvoiceItem.objects.exclude(invoice__status='VOID')
+        item_total = item_total_expression()
+        return self.annotate(
+            budget_sum=_project_sum_subquery(ProjectItem.objects.all(), 'project', F('quantity') * F('unit_price')),
+            invoiced_subtotal_sum=_project_sum_subquery(valid_items, 'invoice__project', item_total),
+            invoiced_grand_sum=_project_sum_subquery(
+                valid_items, 'invoice__project', item_total * (Value(100) + F('invoice__tax_percentage')) / Value(100)
+            ),
+            received_sum=_project_sum_subquery(Payment.objects.exclude(invoice__status='VOID'), 'invoice__project', F('amount')),
+            credited_sum=_project_sum_subquery(CreditNote.objects.exclude(invoice__status='VOID'), 'invoice__project', F('amount')),
+        ).annotate(
+            receivable_sum=_rounded_receivable(F('invoiced_grand_sum') - F('received_sum') - F('credited_sum')),
+        )
+
+
 class Project(models.Model):
     """
     Represents an active project, created from an accepted quotation.
@@ -54,6 +108,22 @@ class Project(models.Model):
     handover_date = models.DateField(null=True, blank=True)
     site_engineer = models.CharField(max_length=255, null=True, blank=True)
 
+    # When the project was completed / cancelled, and when its progress and DPR
+    # history was moved to the archive tables (core/archive.py).
+    closed_at = models.DateTimeField(null=True, blank=True, editable=False)
+    archived_at = models.DateTimeField(null=True, blank=True, editable=False)
+
+    CLOSED_STATUSES = (ProjectStatus.COMPLETED, ProjectStatus.CANCELLED)
+
+    objects = ProjectQuerySet.as_manager()
+
+    def save(self, *args, **kwargs):
+        if self.status in self.CLOSED_STATUSES:
+            self.closed_at = self.closed_at or timezone.now()
+        else:
+            self.closed_at = None
+        super().save(*args, **kwargs)
+
     # --- ADD THIS NEW PROPERTY ---
     @property
     def days_remaining(self):
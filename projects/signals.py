@@ -0,0 +1,37 @@
+# projects/signals.py
+"""
+Invalidates the cached rows of the project list (templates/projects/project_list.html)
+when a project, its customer or its assigned SCOs change, and brings a reopened
+project's history back from the archive tables.
+"""
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from core.archive import restore_project
+from core.cache import invalidate_objects_on_change
+from enquiries.models import Customer
+from users.models import User
+from .models import Project
+
+PROJECT_ROW_NAMESPACE = 'project-row'
+
+
+def _assigned_projects(instance, reverse, pk_set, **kwargs):
+    # project.assigned_scos.add(...) -> the project; user.projects.add(...) -> the projects added
+    if not reverse:
+        return [instance.pk]
+    if pk_set is None:  # user.projects.clear(), called before the links go
+        return instance.projects.values_list('pk', flat=True)
+    return pk_set
+
+
+invalidate_objects_on_change(PROJECT_ROW_NAMESPACE, Project, lambda project: [project.pk])
+invalidate_objects_on_change(PROJECT_ROW_NAMESPACE, Project, _assigned_projects, m2m_through=Project.assigned_scos.through)
+invalidate_objects_on_change(PROJECT_ROW_NAMESPACE, Customer, lambda customer: customer.projects.values_list('pk', flat=True))
+invalidate_objects_on_change(PROJECT_ROW_NAMESPACE, User, lambda user: user.projects.values_list('pk', flat=True))
+
+
+@receiver(post_save, sender=Project)
+def restore_reopened_project(sender, instance, **kwargs):
+    if instance.archived_at and instance.status not in Project.CLOSED_STATUSES:
+        restore_project(instance)
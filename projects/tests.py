@@ -1,3 +1,59 @@
-from django.test import TestCase
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
 
-# Create your tests here.
+from core.testing import TestCase
+from enquiries.models import Customer
+from users.models import User
+from .models import Project
+
+
+class ProjectListCacheTests(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.admin = User.objects.create_user('admin', password='pw', role='admin')
+        self.sco = User.objects.create_user('sco-one', password='pw', role='sco')
+        customer = Customer.objects.create(name='ACME Ltd', email='acme@example.com')
+        self.projects = [Project.objects.create(customer=customer, title=f'Villa {n}') for n in range(3)]
+        for project in self.projects[:2]:
+            project.assigned_scos.add(self.sco)
+        self.client.force_login(self.admin)
+
+    def get_list(self):
+        with self.captureOnCommitCallbacks(execute=True), CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('projects:dashboard'))
+        scos_loaded = any('assigned_scos' in query['sql'] for query in queries.captured_queries)
+        return response.content.decode(), scos_loaded
+
+    def test_cached_rows_skip_the_sco_lookup(self):
+        html, scos_loaded = self.get_list()
+        self.assertEqual(html.count('sco-one'), 2)
+        self.assertTrue(scos_loaded)
+
+        html, scos_loaded = self.get_list()
+        self.assertEqual(html.count('sco-one'), 2)
+        self.assertFalse(scos_loaded)
+
+    def test_clearing_a_users_projects_refreshes_their_rows(self):
+        self.get_list()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.sco.projects.clear()
+
+        html, _ = self.get_list()
+        self.assertNotIn('sco-one', html)
+
+
+class ScoCheckboxFragmentTests(TestCase):
+    async def test_lists_current_scos(self):
+        url = reverse('projects:ajax_get_scos')
+        self.assertEqual((await self.async_client.get(url)).status_code, 302)
+
+        admin = await User.objects.acreate_user('admin', password='pw', role='admin')
+        await User.objects.acreate_user('sco-new', password='pw', role='sco')
+        await self.async_client.aforce_login(admin)
+        response = await self.async_client.get(url)
+
+        html = response.content.decode()
+        self.assertIn('name="assigned_scos"', html)
+        self.assertIn('sco-new', html)
+        self.assertNotIn('>admin<', html)
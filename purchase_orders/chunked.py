@@ -0,0 +1,224 @@
+# purchase_orders/chunked.py
+"""
+Chunked, resumable uploads for PO documents.
+
+Large drawing sets and contracts are sent as a series of raw-body chunks
+instead of one multipart POST:
+
+    1. start_upload()  - records the filename, total size and (optionally) the
+                         SHA-256 of the whole file; returns a session token.
+    2. write_chunk()   - appends one chunk at a given offset. The chunk is
+                         streamed from the request to its own temp file in
+                         CHUNKED_UPLOAD_DIR and only appended once it has
+                         arrived whole and passed its own checksum, so the
+                         file on disk always ends at the last good byte and
+                         the client resumes from there.
+    3. finish_upload() - checks the size and SHA-256 of the assembled file and
+                         attaches it to the PO as a PurchaseOrderDocument.
+
+Chunks are read and written in READ_SIZE pieces, so memory use doesn't grow
+with the file size.
+"""
+import hashlib
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.core.files import File
+from django.db import transaction
+from django.utils import timezone
+from django.utils.text import get_valid_filename
+
+from .models import DocumentUploadSession, PurchaseOrderDocument
+
+CHUNK_SIZE = 5 * 1024 * 1024        # what the browser client sends
+MAX_CHUNK_SIZE = 16 * 1024 * 1024   # the largest chunk the server accepts
+MAX_FILE_SIZE = 2 * 1024 * 1024 * 1024
+READ_SIZE = 64 * 1024
+
+
+class UploadError(Exception):
+    def __init__(self, message, status=400, offset=None):
+        super().__init__(message)
+        self.message = message
+        self.status = status
+        self.offset = offset
+
+
+class _AssembledFile(File):
+    """Lets FileSystemStorage move the temp file into place instead of copying it."""
+    def temporary_file_path(self):
+        return self.file.name
+
+
+def upload_dir():
+    path = Path(settings.CHUNKED_UPLOAD_DIR)
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def temp_path(session):
+    return upload_dir() / f'{session.token}.part'
+
+
+def current_offset(session):
+    """Bytes safely received so far - the temp file is the source of truth."""
+    try:
+        return temp_path(session).stat().st_size
+    except FileNotFoundError:
+        return 0
+
+
+def _discard(session):
+    temp_path(session).unlink(missing_ok=True)
+    session.delete()
+
+
+def start_upload(purchase_order, user, filename, size, sha256='', description=''):
+    filename = get_valid_filename(os.path.basename(str(filename or '')))
+    if not filename:
+        raise UploadError("A filename is required.")
+    try:
+        size = int(size)
+    except (TypeError, ValueError):
+        raise UploadError("size must be the file size in bytes.")
+    if not 0 < size <= MAX_FILE_SIZE:
+        raise UploadError(f"Files must be between 1 byte and {MAX_FILE_SIZE // (1024 * 1024)} MB.")
+    sha256 = (sha256 or '').strip().lower()
+    if sha256 and (len(sha256) != 64 or any(c not in '0123456789abcdef' for c in sha256)):
+        raise UploadError("sha256 must be a hex SHA-256 digest.")
+
+    session = DocumentUploadSession.objects.create(
+        purchase_order=purchase_order, created_by=user, filename=filename,
+        description=(description or '')[:200], size=size, sha256=sha256,
+    )
+    temp_path(session).touch()
+    return session
+
+
+def _lock(session):
+    """Re-reads the session under a row lock; raises UploadError if it has gone."""
+    try:
+        return DocumentUploadSession.objects.select_for_update().get(pk=session.pk)
+    except DocumentUploadSession.DoesNotExist:
+        raise UploadError("This upload has already been finished or cancelled.", status=404)
+
+
+def _receive(stream, length, chunk_sha256, offset):
+    """
+    Streams the chunk into its own temp file and checks it; returns the path.
+    Runs before any lock is taken, since a slow client can take minutes over this.
+    """
+    fd, path = tempfile.mkstemp(suffix='.chunk', dir=upload_dir())
+    digest = hashlib.sha256()
+    written = 0
+    with os.fdopen(fd, 'wb') as f:
+        while written < length:
+            piece = stream.read(min(READ_SIZE, length - written))
+            if not piece:
+                break
+            f.write(piece)
+            digest.update(piece)
+            written += len(piece)
+    if written < length or (chunk_sha256 and digest.hexdigest() != chunk_sha256.lower()):
+        os.unlink(path)
+        reason = "was cut short" if written < length else "failed its checksum"
+        raise UploadError(f"Chunk {reason}; resend it.", offset=offset)
+    return path
+
+
+def write_chunk(session, offset, stream, length, chunk_sha256=''):
+    """
+    Streams `length` bytes from `stream` into the session's temp file at `offset`.
+    Returns the new offset. Raises UploadError (409 with the current offset) if
+    the client is out of step, e.g. after a chunk was lost.
+    """
+    if length is None or length <= 0:
+        raise UploadError("Send the chunk as the raw request body with a Content-Length.")
+    if length > MAX_CHUNK_SIZE:
+        raise UploadError(f"Chunks can be at most {MAX_CHUNK_SIZE // (1024 * 1024)} MB.", status=413)
+    on_disk = current_offset(session)
+    if offset != on_disk:
+        raise UploadError(f"Expected a chunk at offset {on_disk}.", status=409, offset=on_disk)
+    if offset + length > session.size:
+        raise UploadError("Chunk runs past the end of the file.", offset=on_disk)
+
+    chunk_path = _receive(stream, length, chunk_sha256, offset)
+    try:
+        with transaction.atomic():
+            # Serialises retries of the same chunk arriving on two workers at once;
+            # held only for the local copy, not while the client sends the body.
+            session = _lock(session)
+            on_disk = current_offset(session)
+            if offset != on_disk:
+                raise UploadError(f"Expected a chunk at offset {on_disk}.", status=409, offset=on_disk)
+            with open(temp_path(session), 'r+b') as f, open(chunk_path, 'rb') as chunk:
+                f.seek(offset)
+                f.truncate()
+                shutil.copyfileobj(chunk, f, READ_SIZE)
+            DocumentUploadSession.objects.filter(pk=session.pk).update(received=offset + length, updated_at=timezone.now())
+    finally:
+        os.unlink(chunk_path)
+    return offset + length
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for piece in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(piece)
+    return digest.hexdigest()
+
+
+def finish_upload(session):
+    """
+    Verifies the assembled file and attaches it to the PO.
+    Returns (document, sha256). A checksum mismatch discards the upload.
+    """
+    with transaction.atomic():
+        # Waits for a chunk that is still being appended, and turns away any that arrive after.
+        session = _lock(session)
+        received = current_offset(session)
+        if received != session.size:
+            raise UploadError(f"Upload incomplete: {received} of {session.size} bytes received.", status=409, offset=received)
+
+        path = temp_path(session)
+        digest = file_sha256(path)
+        document = None
+        if not session.sha256 or digest == session.sha256:
+            document = PurchaseOrderDocument(purchase_order_id=session.purchase_order_id, description=session.description)
+            with open(path, 'rb') as f:
+                document.file.save(session.filename, _AssembledFile(f), save=True)
+        _discard(session)
+    if document is None:
+        raise UploadError("The uploaded file doesn't match its SHA-256 checksum; upload it again.")
+    return document, digest
+
+
+def cancel_upload(session):
+    _discard(session)
+
+
+def purge_stale_uploads(older_than=timedelta(days=1)):
+    """
+    Removes sessions untouched for `older_than`, plus any temp files left
+    without a session. Returns the number of sessions removed.
+    """
+    stale = DocumentUploadSession.objects.filter(updated_at__lt=timezone.now() - older_than)
+    removed = 0
+    for session in stale.iterator():
+        _discard(session)
+        removed += 1
+
+    live = {str(token) for token in DocumentUploadSession.objects.values_list('token', flat=True)}
+    cutoff = (timezone.now() - older_than).timestamp()
+    for path in upload_dir().glob('*.part'):
+        if path.stem not in live and path.stat().st_mtime < cutoff:
+            path.unlink(missing_ok=True)
+    for path in upload_dir().glob('*.chunk'):  # left by a worker killed mid-chunk
+        if path.stat().st_mtime < cutoff:
+            path.unlink(missing_ok=True)
+    return removed
@@ -0,0 +1,17 @@
+# purchase_orders/management/commands/purge_stale_uploads.py
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from purchase_orders.chunked import purge_stale_uploads
+
+
+class Command(BaseCommand):
+    help = "Deletes chunked PO document uploads that were abandoned part-way, and their temp files."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hours', type=int, default=24, help="Remove uploads untouched for this many hours (default 24).")
+
+    def handle(self, *args, **options):
+        removed = purge_stale_uploads(timedelta(hours=options['hours']))
+        self.stdout.write(self.style.SUCCESS(f"Removed {removed} stale upload(s)."))
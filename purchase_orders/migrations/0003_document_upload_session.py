@@ -0,0 +1,32 @@
+# Generated by Django 5.2.7 on 2026-10-19 13:45
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('purchase_orders', '0002_rename_subcontractor_to_contractor'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DocumentUploadSession',
+            fields=[
+                ('token', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('filename', models.CharField(max_length=255)),
+                ('description', models.CharField(blank=True, max_length=200)),
+                ('size', models.PositiveBigIntegerField(help_text='Total size of the file in bytes')),
+                ('sha256', models.CharField(blank=True, help_text='Expected SHA-256 of the whole file, if the client sent one', max_length=64)),
+                ('received', models.PositiveBigIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('created_by', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='po_upload_sessions', to=settings.AUTH_USER_MODEL)),
+                ('purchase_order', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='upload_sessions', to='purchase_orders.purchaseorder')),
+            ],
+        ),
+    ]
@@ -4,6 +4,8 @@ from django.db import models
 from django.utils.translation import gettext_lazy as _
 from decimal import Decimal
 from django.utils import timezone
+from django.conf import settings
+import uuid
 
 # Helper function for PO document uploads
 def po_document_upload_path(instance, filename):
@@ -130,3 +132,24 @@ class PurchaseOrderDocument(models.Model):
 
     def __str__(self):
         return f"Document for {self.purchase_order.po_number} - {self.description or self.file.name}"
+
+
+class DocumentUploadSession(models.Model):
+    """
+    A chunked upload of a PO document in progress. The bytes received so far
+    live in a temp file under CHUNKED_UPLOAD_DIR (see purchase_orders/chunked.py);
+    the session is deleted once the file is attached or abandoned.
+    """
+    token = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    purchase_order = models.ForeignKey(PurchaseOrder, on_delete=models.CASCADE, related_name='upload_sessions')
+    created_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='po_upload_sessions')
+    filename = models.CharField(max_length=255)
+    description = models.CharField(max_length=200, blank=True)
+    size = models.PositiveBigIntegerField(help_text="Total size of the file in bytes")
+    sha256 = models.CharField(max_length=64, blank=True, help_text="Expected SHA-256 of the whole file, if the client sent one")
+    received = models.PositiveBigIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Upload of {self.filename} to {self.purchase_order.po_number} ({self.received}/{self.size} bytes)"
@@ -1,3 +1,80 @@
-from django.test import TestCase
+import hashlib
+import io
+import json
+import tempfile
 
-# Create your tests here.
+from django.test import override_settings
+from django.urls import reverse
+
+from core.testing import TestCase
+from users.models import User
+from . import chunked
+from .models import Contractor, DocumentUploadSession, PurchaseOrder
+
+
+class ChunkedUploadTests(TestCase):
+    def setUp(self):
+        super().setUp()
+        for name in ('MEDIA_ROOT', 'CHUNKED_UPLOAD_DIR'):
+            directory = tempfile.TemporaryDirectory()
+            self.addCleanup(directory.cleanup)
+            override = override_settings(**{name: directory.name})
+            override.enable()
+            self.addCleanup(override.disable)
+
+        self.staff = User.objects.create_user('staff', password='pw', role='staff')
+        self.po = PurchaseOrder.objects.create(contractor=Contractor.objects.create(name='Tilers'))
+        self.data = b'drawing-set ' * 1000
+
+    def start(self, **fields):
+        response = self.client.post(
+            reverse('purchase_orders:document_upload_start', args=[self.po.pk]),
+            json.dumps({'filename': 'drawings.pdf', 'size': len(self.data), **fields}), content_type='application/json',
+        )
+        self.assertEqual(response.status_code, 201)
+        return response.json()['url']
+
+    def send(self, url, offset, data, **headers):
+        return self.client.post(f'{url}?offset={offset}', data, content_type='application/octet-stream', headers=headers)
+
+    def test_upload_in_chunks(self):
+        self.client.force_login(self.staff)
+        url = self.start(sha256=hashlib.sha256(self.data).hexdigest())
+
+        self.assertEqual(self.send(url, 0, self.data[:5000]).json()['offset'], 5000)
+        self.assertEqual(self.send(url, 0, self.data[:5000]).status_code, 409)  # a retry of a chunk already stored
+        bad = self.send(url, 5000, self.data[5000:], **{'X-Chunk-SHA256': '0' * 64})
+        self.assertEqual((bad.status_code, bad.json()['offset']), (400, 5000))
+        self.assertEqual(self.send(url, 5000, self.data[5000:]).json()['offset'], len(self.data))
+
+        response = self.client.post(url + 'complete/')
+        self.assertEqual(response.status_code, 200)
+        document = self.po.documents.get()
+        with document.file.open('rb') as f:
+            self.assertEqual(f.read(), self.data)
+        self.assertEqual(list(chunked.upload_dir().iterdir()), [])
+
+    def test_cut_short_chunk_is_not_appended(self):
+        session = chunked.start_upload(self.po, self.staff, 'drawings.pdf', len(self.data))
+        with self.assertRaises(chunked.UploadError):
+            chunked.write_chunk(session, 0, io.BytesIO(self.data[:100]), 5000)
+        self.assertEqual(chunked.current_offset(session), 0)
+        self.assertEqual([p.suffix for p in chunked.upload_dir().iterdir()], ['.part'])
+
+    def test_late_chunk_after_finish_is_refused(self):
+        session = chunked.start_upload(self.po, self.staff, 'drawings.pdf', len(self.data))
+        chunked.write_chunk(session, 0, io.BytesIO(self.data), len(self.data))
+        chunked.finish_upload(session)
+
+        with self.assertRaises(chunked.UploadError) as raised:
+            chunked.write_chunk(session, len(self.data), io.BytesIO(b'x'), 1)
+        self.assertEqual(raised.exception.status, 409)
+        with self.assertRaises(chunked.UploadError) as raised:
+            chunked.finish_upload(session)
+        self.assertEqual(raised.exception.status, 404)
+        self.assertFalse(DocumentUploadSession.objects.exists())
+
+    def test_anonymous_user_is_sent_to_login(self):
+        response = self.client.get(reverse('purchase_orders:document_upload_chunk', args=[
+            '00000000-0000-0000-0000-000000000000']))
+        self.assertEqual(response.status_code, 302)
@@ -16,6 +16,9 @@ urlpatterns = [
     
     # Document URLs
     path('<int:pk>/documents/upload/', views.document_upload, name='document_upload'),
+    path('<int:pk>/documents/uploads/', views.document_upload_start, name='document_upload_start'),
+    path('documents/uploads/<uuid:token>/', views.document_upload_chunk, name='document_upload_chunk'),
+    path('documents/uploads/<uuid:token>/complete/', views.document_upload_complete, name='document_upload_complete'),
     path('documents/<int:pk>/delete/', views.document_delete, name='document_delete'),
     
     # Contractor URLs
@@ -0,0 +1,73 @@
+# reports/analytics.py
+"""
+Site-resource analytics over the DPR logs: day/night headcounts per trade
+and equipment-days per machine, by trade or by week.
+
+Everything is a GROUP BY in the database (one query per log table), driven
+by the DailyReport (project, date) index and the (report, name) indexes on
+the log tables, so years of DPRs don't get loaded into Python.
+"""
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncWeek
+
+from .models import EquipmentLog, ManpowerLog, SubcontractorLog
+
+# resource -> (log model, name field, label)
+RESOURCES = {
+    'manpower': (ManpowerLog, 'staff_type', 'Manpower'),
+    'subcontractor': (SubcontractorLog, 'staff_type', 'Subcontractor'),
+    'equipment': (EquipmentLog, 'equipment_name', 'Equipment'),
+}
+GROUPS = ('trade', 'week')
+
+
+def _logs(model, project, start=None, end=None):
+    logs = model.objects.for_project(project)
+    if start:
+        logs = logs.filter(report__date__gte=start)
+    if end:
+        logs = logs.filter(report__date__lte=end)
+    return logs
+
+
+def resource_totals(resource, project, group='trade', start=None, end=None):
+    """
+    Returns a list of {'key', 'day', 'night', 'total', 'reports'} rows for one
+    resource, grouped by trade / equipment name or by ISO week (Monday).
+    'reports' is the number of DPRs the key appears on.
+    """
+    model, name_field, _ = RESOURCES[resource]
+    logs = _logs(model, project, start, end)
+    if group == 'week':
+        logs = logs.annotate(key=TruncWeek('report__date'))
+    else:
+        logs = logs.annotate(key=F(name_field))
+    return list(
+        logs.values('key')
+        .annotate(
+            day=Sum('day_count'),
+            night=Sum('night_count'),
+            total=Sum(F('day_count') + F('night_count')),
+            reports=Count('report', distinct=True),
+        )
+        .order_by('key' if group == 'week' else '-total')
+    )
+
+
+def site_resources(project, group='trade', start=None, end=None):
+    """All three resources for a project: {resource: rows} (three queries)."""
+    return {resource: resource_totals(resource, project, group, start, end) for resource in RESOURCES}
+
+
+def weekly_series(tables):
+    """
+    Merges week-grouped tables into chart series:
+    {'weeks': [...], 'manpower': [...], 'subcontractor': [...], 'equipment': [...]}
+    with 0 for weeks a resource has no logs.
+    """
+    weeks = sorted({row['key'] for rows in tables.values() for row in rows})
+    series = {'weeks': [week.isoformat() for week in weeks]}
+    for resource, rows in tables.items():
+        by_week = {row['key']: row['total'] for row in rows}
+        series[resource] = [by_week.get(week, 0) for week in weeks]
+    return series
@@ -0,0 +1,60 @@
+# reports/books.py
+"""
+DPR books (every report for a project and date range in one PDF): which
+reports go in, file names, and the background jobs that compile long ones.
+The rendering itself is in reports/pdf.py, imported only when a job runs.
+
+Long books are compiled by the `run_jobs` worker process (core/jobs.py), which
+keeps the PDF in job storage until the job expires.
+"""
+import datetime
+import uuid
+
+from django.core.files.base import ContentFile
+
+from core.jobs import enqueue, job_storage
+from core.replica import using_replica
+from projects.models import Project
+from .models import DailyReport
+
+# Books with more reports than this are compiled in the background.
+BOOK_SYNC_LIMIT = 31
+BOOK_JOB_DIR = 'dpr_books'
+
+
+def dpr_filename(report):
+    return f"DPR_{report.project.title.replace(' ', '_')}_{report.date}.pdf"
+
+
+def book_reports(project, start, end):
+    """The project's reports in the range, oldest first, with all logs prefetched (4 queries)."""
+    return list(
+        DailyReport.objects.for_project(project).filter(date__range=(start, end))
+        .order_by('date')
+        .prefetch_related('manpower_logs', 'equipment_logs', 'subcontractor_logs')
+    )
+
+
+def book_filename(project, start, end):
+    return f"DPR_Book_{project.title.replace(' ', '_')}_{start}_{end}.pdf"
+
+
+# ---------------------------------
+# BACKGROUND BOOK JOBS
+# ---------------------------------
+def compile_book(project_pk, start, end):
+    """Job task (core/jobs.py): renders the book into job storage."""
+    from .pdf import render_dpr_book
+
+    start, end = datetime.date.fromisoformat(start), datetime.date.fromisoformat(end)
+    with using_replica():
+        project = Project.objects.get(pk=project_pk)
+        pdf = render_dpr_book(project, start, end)
+    filename = book_filename(project, start, end)
+    name = job_storage.save(f"{BOOK_JOB_DIR}/{uuid.uuid4().hex}.pdf", ContentFile(pdf))
+    return {'file': name, 'filename': filename}
+
+
+def start_book_job(project, start, end):
+    """Queues the book for the `run_jobs` worker; returns the Job to poll."""
+    return enqueue('reports.books.compile_book', project_pk=project.pk, start=start.isoformat(), end=end.isoformat())
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.7 on 2026-10-19 13:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='equipmentlog',
+            index=models.Index(fields=['report', 'equipment_name'], name='reports_equ_report__82818c_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='manpowerlog',
+            index=models.Index(fields=['report', 'staff_type'], name='reports_man_report__8c9189_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='subcontractorlog',
+            index=models.Index(fields=['report', 'staff_type'], name='reports_sub_report__8e7392_idx'),
+        ),
+    ]
@@ -0,0 +1,79 @@
+# Generated by Django 5.2.7 on 2026-10-19 14:12
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0003_project_closed_at_archived_at'),
+        ('reports', '0003_resource_log_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedDailyReport',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('report_number', models.PositiveIntegerField(blank=True)),
+                ('date', models.DateField(default=django.utils.timezone.now)),
+                ('contractor_name', models.CharField(blank=True, max_length=255)),
+                ('subcontractor_name', models.CharField(blank=True, max_length=255, verbose_name='Subcontractor Name')),
+                ('chronological_account', models.TextField(blank=True, help_text='8:00 AM to 6:00 PM - Describe the work done.')),
+                ('activities_for_next_day', models.TextField(blank=True)),
+                ('issues_encountered', models.TextField(blank=True, verbose_name='Force Work / Changes Encountered / Safety Issues')),
+                ('created_by', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='projects.project')),
+            ],
+            options={
+                'verbose_name': 'archived daily report',
+                'ordering': ['-date'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedEquipmentLog',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('equipment_name', models.CharField(max_length=100, verbose_name='Equipment')),
+                ('day_count', models.PositiveIntegerField(default=0, verbose_name='Day')),
+                ('night_count', models.PositiveIntegerField(default=0, verbose_name='Night')),
+                ('report', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='equipment_logs', to='reports.archiveddailyreport')),
+            ],
+            options={
+                'verbose_name': 'archived equipment log',
+                'ordering': [],
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedManpowerLog',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('staff_type', models.CharField(max_length=100, verbose_name='Staffs & Labor')),
+                ('day_count', models.PositiveIntegerField(default=0, verbose_name='Day')),
+                ('night_count', models.PositiveIntegerField(default=0, verbose_name='Night')),
+                ('report', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='manpower_logs', to='reports.archiveddailyreport')),
+            ],
+            options={
+                'verbose_name': 'archived manpower log',
+                'ordering': [],
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedSubcontractorLog',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('staff_type', models.CharField(max_length=100, verbose_name='Staffs & Labor')),
+                ('day_count', models.PositiveIntegerField(default=0, verbose_name='Day')),
+                ('night_count', models.PositiveIntegerField(default=0, verbose_name='Night')),
+                ('report', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='subcontractor_logs', to='reports.archiveddailyreport')),
+            ],
+            options={
+                'verbose_name': 'archived subcontractor log',
+                'ordering': [],
+            },
+        ),
+    ]
@@ -1,6 +1,7 @@
 # reports/models.py
 from django.db import models
 from django.utils import timezone
+from core.archive import HistoryManager, archive_model
 from projects.models import Project
 
 class DailyReport(models.Model):
@@ -14,6 +15,8 @@ class DailyReport(models.Model):
     issues_encountered = models.TextField(blank=True, verbose_name="Force Work / Changes Encountered / Safety Issues")
     
     created_by = models.ForeignKey('users.User', on_delete=models.SET_NULL, null=True)
+
+    objects = HistoryManager()
     
     class Meta:
         unique_together = ('project', 'date')
@@ -22,10 +25,38 @@ class DailyReport(models.Model):
     def save(self, *args, **kwargs):
         # Auto-increment report_number scoped to the project
         if not self.pk: # Only on creation
-            last_report = DailyReport.objects.filter(project=self.project).order_by('report_number').last()
+            last_report = DailyReport.objects.filter(project_id=self.project_id).order_by('report_number').last()
             self.report_number = (last_report.report_number + 1) if last_report else 1
         super().save(*args, **kwargs)
         
+    def copy_forward(self, date, created_by):
+        """
+        Starts the report for `date` from this one: same contractor names and
+        manpower / subcontractor / equipment rows, cloned with one bulk_create
+        per log table. Call inside a transaction.
+        """
+        new_report = DailyReport(
+            project_id=self.project_id,
+            date=date,
+            contractor_name=self.contractor_name,
+            subcontractor_name=self.subcontractor_name,
+            created_by=created_by,
+        )
+        new_report.save()
+        ManpowerLog.objects.bulk_create([
+            ManpowerLog(report=new_report, staff_type=log.staff_type, day_count=log.day_count, night_count=log.night_count)
+            for log in self.manpower_logs.all()
+        ])
+        SubcontractorLog.objects.bulk_create([
+            SubcontractorLog(report=new_report, staff_type=log.staff_type, day_count=log.day_count, night_count=log.night_count)
+            for log in self.subcontractor_logs.all()
+        ])
+        EquipmentLog.objects.bulk_create([
+            EquipmentLog(report=new_report, equipment_name=log.equipment_name, day_count=log.day_count, night_count=log.night_count)
+            for log in self.equipment_logs.all()
+        ])
+        return new_report
+
     def __str__(self):
         return f"DPR #{self.report_number} for {self.project.title}"
 
@@ -35,14 +66,37 @@ class ManpowerLog(models.Model):
     day_count = models.PositiveIntegerField(default=0, verbose_name="Day")
     night_count = models.PositiveIntegerField(default=0, verbose_name="Night")
 
+    objects = HistoryManager('report__project')
+
+    class Meta:
+        # Lets the site-resource GROUP BY (reports/analytics.py) read trade names from the index
+        indexes = [models.Index(fields=['report', 'staff_type'])]
+
 class SubcontractorLog(models.Model):
     report = models.ForeignKey(DailyReport, on_delete=models.CASCADE, related_name='subcontractor_logs')
     staff_type = models.CharField(max_length=100, verbose_name="Staffs & Labor")
     day_count = models.PositiveIntegerField(default=0, verbose_name="Day")
     night_count = models.PositiveIntegerField(default=0, verbose_name="Night")
 
+    objects = HistoryManager('report__project')
+
+    class Meta:
+        indexes = [models.Index(fields=['report', 'staff_type'])]
+
 class EquipmentLog(models.Model):
     report = models.ForeignKey(DailyReport, on_delete=models.CASCADE, related_name='equipment_logs')
     equipment_name = models.CharField(max_length=100, verbose_name="Equipment")
     day_count = models.PositiveIntegerField(default=0, verbose_name="Day")
-    night_count = models.PositiveIntegerField(default=0, verbose_name="Night")
\ No newline at end of file
+    night_count = models.PositiveIntegerField(default=0, verbose_name="Night")
+
+    objects = HistoryManager('report__project')
+
+    class Meta:
+        indexes = [models.Index(fields=['report', 'equipment_name'])]
+
+
+# Archive tables for closed projects' DPRs (core/archive.py)
+ArchivedDailyReport = archive_model(DailyReport, 'ArchivedDailyReport')
+ArchivedManpowerLog = archive_model(ManpowerLog, 'ArchivedManpowerLog', parents={'report': ArchivedDailyReport})
+ArchivedSubcontractorLog = archive_model(SubcontractorLog, 'ArchivedSubcontractorLog', parents={'report': ArchivedDailyReport})
+ArchivedEquipmentLog = archive_model(EquipmentLog, 'ArchivedEquipmentLog', parents={'report': ArchivedDailyReport})
@@ -0,0 +1,278 @@
+# reports/pdf.py
+"""
+DPR PDF rendering: a single report, or a compiled "DPR book" covering a
+project and date range.
+
+A book loads its reports plus all manpower / equipment / subcontractor logs
+in four queries (the reports and three prefetches), fetches the logo once,
+and opens with an index page listing every report and the page it starts on.
+Books for long ranges are compiled in a background thread and written to
+media storage (see reports/books.py).
+
+Everything that needs ReportLab lives here, and reports.views only imports
+this module inside the views that render, so ReportLab is loaded on the
+first PDF rather than whenever the URLconf is.
+"""
+import io
+
+from reportlab.lib import colors
+from reportlab.lib.enums import TA_CENTER, TA_LEFT
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+from reportlab.lib.units import inch
+from reportlab.platypus import Image as RLImage, PageBreak, Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+from reportlab.platypus.flowables import Flowable
+
+from invoices.pdf_utils import NumberedCanvas, fetch_inverted_logo_png
+from .books import book_reports
+
+LOGO_URL = "https://curvacraft.com/wp-content/uploads/2024/10/Curvacraft-logo-1024x255.webp"
+
+PAGE_SIZE = A4
+LEFT_MARGIN = 0.5 * inch
+RIGHT_MARGIN = 0.5 * inch
+TOP_MARGIN = 0.5 * inch
+BOTTOM_MARGIN = 0.8 * inch
+DOC_WIDTH = PAGE_SIZE[0] - (LEFT_MARGIN + RIGHT_MARGIN)
+
+
+
+def _styles():
+    """Paragraph styles, plus the logo so a whole book fetches it at most once."""
+    styles = getSampleStyleSheet()
+    return {
+        'logo_png': fetch_inverted_logo_png(LOGO_URL),
+        'title': ParagraphStyle(name='ReportTitle', parent=styles['Heading1'], alignment=TA_CENTER, fontSize=16, spaceAfter=0),
+        'th': ParagraphStyle(name='TableHeader', fontName='Helvetica-Bold', fontSize=8, alignment=TA_CENTER),
+        'td_left': ParagraphStyle(name='TableCellLeft', fontName='Helvetica', fontSize=8, alignment=TA_LEFT, leading=10),
+        'td_center': ParagraphStyle(name='TableCellCenter', fontName='Helvetica', fontSize=8, alignment=TA_CENTER),
+        'section': ParagraphStyle(name='SectionTitle', parent=styles['Heading3'], fontSize=10, spaceBefore=6, textColor=colors.black),
+    }
+
+
+def _logo(styles):
+    """Inverted logo at ~2in wide (original is 1024x255)."""
+    png_bytes = styles['logo_png']
+    if not png_bytes:
+        return Paragraph("<b>[LOGO ERROR]</b>", styles['td_left'])
+    display_width = 2.0 * inch
+    logo_img = RLImage(io.BytesIO(png_bytes), width=display_width, height=display_width * 255.0 / 1024.0)
+    logo_img.hAlign = 'LEFT'
+    return logo_img
+
+
+def _header(title, styles):
+    top_table = Table([[_logo(styles), Paragraph(title, styles['title'])]], colWidths=[DOC_WIDTH*0.35, DOC_WIDTH*0.65])
+    top_table.setStyle(TableStyle([
+        ('VALIGN', (0,0), (-1,-1), 'MIDDLE'),
+        ('ALIGN', (0,0), (0,0), 'LEFT'),
+        ('ALIGN', (1,0), (1,0), 'CENTER'),
+        ('LEFTPADDING', (0,0), (-1,-1), 0),
+        ('RIGHTPADDING', (0,0), (-1,-1), 0),
+    ]))
+    return top_table
+
+
+def _counts_table(rows, label, styles, col_widths):
+    """S.No / label / Day / Night table with a totals row, for manpower, equipment and subcontractor logs."""
+    data = [[Paragraph('S.No', styles['th']), Paragraph(label, styles['th']), Paragraph('DAY', styles['th']), Paragraph('NGT', styles['th'])]]
+    total_day = total_night = 0
+    for i, (name, day, night) in enumerate(rows, 1):
+        data.append([str(i), Paragraph(name, styles['td_left']), day, night])
+        total_day += day; total_night += night
+    data.append(['', Paragraph('<b>TOTAL</b>', styles['td_center']), total_day, total_night])
+    table = Table(data, colWidths=col_widths)
+    table.setStyle(TableStyle([
+        ('GRID', (0,0), (-1,-1), 0.5, colors.black),
+        ('BACKGROUND', (0,0), (-1,0), colors.whitesmoke),
+        ('FONTNAME', (0,0), (-1,0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0,0), (-1,-1), 8),
+        ('ALIGN', (2,1), (-1,-1), 'CENTER'),
+        ('ALIGN', (0,0), (0,-1), 'CENTER'),
+        ('VALIGN', (0,0), (-1,-1), 'MIDDLE'),
+        ('BACKGROUND', (0,-1), (-1,-1), colors.whitesmoke), # Footer BG
+    ]))
+    return table
+
+
+def report_story(report, project, styles):
+    """Flowables for one DPR. Logs are read through .all() so prefetched logs cost no queries."""
+    story = [_header("DAILY PROGRESS REPORT", styles), Spacer(1, 0.2*inch)]
+
+    def clean_str(val): return str(val) if val is not None else "N/A"
+    def clean_date(val): return val.strftime('%d-%b-%y') if val else "N/A"
+
+    # --- Project info & timeline ---
+    td_left = styles['td_left']
+    left_data = [
+        [Paragraph('<b>PROJECT:</b>', td_left), Paragraph(project.title, td_left)],
+        [Paragraph('<b>CONTRACTOR</b>', td_left), Paragraph(report.contractor_name, td_left)],
+        [Paragraph('<b>SITE ENGG:</b>', td_left), Paragraph(project.site_engineer if project.site_engineer else 'N/A', td_left)],
+        [Paragraph('<b>REPORT NO:</b>', td_left), Paragraph(clean_str(report.report_number), td_left)],
+        [Paragraph('<b>DATE:</b>', td_left), Paragraph(report.date.strftime('%d-%b-%Y'), td_left)],
+    ]
+    right_data = [
+        [Paragraph('<b>PROJECT TIMELINE</b>', styles['th'])],
+        [Paragraph(f'Start: {clean_date(project.mobilization_date)}', td_left)],
+        [Paragraph(f'End: {clean_date(project.handover_date)}', td_left)],
+        [Paragraph(f'Days Remaining: {clean_str(project.days_remaining)}', td_left)],
+    ]
+    col_w_left = DOC_WIDTH * 0.65
+    col_w_right = DOC_WIDTH * 0.35
+
+    t_left = Table(left_data, colWidths=[col_w_left * 0.3, col_w_left * 0.7])
+    t_left.setStyle(TableStyle([
+        ('GRID', (0,0), (-1,-1), 0.5, colors.grey),
+        ('BACKGROUND', (0,0), (0,-1), colors.whitesmoke),
+        ('VALIGN', (0,0), (-1,-1), 'MIDDLE'),
+        ('LEFTPADDING', (0,0), (-1,-1), 6),
+    ]))
+    t_right = Table(right_data, colWidths=[col_w_right])
+    t_right.setStyle(TableStyle([
+        ('GRID', (0,0), (-1,-1), 0.5, colors.grey),
+        ('BACKGROUND', (0,0), (0,0), colors.whitesmoke),
+        ('ALIGN', (0,0), (0,-1), 'CENTER'),
+        ('VALIGN', (0,0), (-1,-1), 'MIDDLE'),
+        ('LEFTPADDING', (0,0), (-1,-1), 6),
+    ]))
+    main_header_wrapper = Table([[t_left, t_right]], colWidths=[col_w_left, col_w_right])
+    main_header_wrapper.setStyle(TableStyle([('VALIGN', (0,0), (-1,-1), 'TOP')]))
+    story.append(main_header_wrapper)
+    story.append(Spacer(1, 0.15*inch))
+
+    # --- Manpower & equipment, side by side ---
+    story.append(Paragraph("CONTRACTOR DETAILS", styles['section']))
+    gap = 0.2 * inch
+    half_w = (DOC_WIDTH - gap) / 2
+    half_widths = [half_w * r for r in (0.1, 0.6, 0.15, 0.15)]
+    t_mp = _counts_table([(m.staff_type, m.day_count, m.night_count) for m in report.manpower_logs.all()], 'MANPOWER', styles, half_widths)
+    t_eq = _counts_table([(e.equipment_name, e.day_count, e.night_count) for e in report.equipment_logs.all()], 'EQUIPMENT', styles, half_widths)
+    story.append(Table([[t_mp, '', t_eq]], colWidths=[half_w, gap, half_w]))
+    story.append(Spacer(1, 0.15*inch))
+
+    # --- Subcontractors ---
+    if report.subcontractor_name:
+        section_title = f"SUBCONTRACTOR DETAILS: {report.subcontractor_name}"
+    else:
+        section_title = "SUBCONTRACTOR DETAILS"
+    story.append(Paragraph(section_title, styles['section']))
+    t_sub = _counts_table(
+        [(s.staff_type, s.day_count, s.night_count) for s in report.subcontractor_logs.all()],
+        'WORK TYPE', styles, [0.5*inch, DOC_WIDTH - 2.5*inch, 1*inch, 1*inch],
+    )
+    story.append(t_sub)
+    story.append(Spacer(1, 0.15*inch))
+
+    # --- Chronological account & issues ---
+    story.append(Paragraph("CHRONOLOGICAL ACCOUNT OF DAY'S WORK", styles['section']))
+    chrono_txt = report.chronological_account.replace('\n', '<br/>') if report.chronological_account else "No entry."
+    t_chrono = Table([[Paragraph(chrono_txt, td_left)]], colWidths=[DOC_WIDTH])
+    t_chrono.setStyle(TableStyle([('GRID', (0,0), (-1,-1), 0.5, colors.black), ('VALIGN', (0,0), (-1,-1), 'TOP'), ('LEFTPADDING', (0,0), (-1,-1), 6), ('TOPPADDING', (0,0), (-1,-1), 6), ('BOTTOMPADDING', (0,0), (-1,-1), 6)]))
+    story.append(t_chrono)
+    story.append(Spacer(1, 0.15*inch))
+
+    act_txt = report.activities_for_next_day.replace('\n', '<br/>') if report.activities_for_next_day else "N/A"
+    iss_txt = report.issues_encountered.replace('\n', '<br/>') if report.issues_encountered else "N/A"
+    bot_data = [
+        [Paragraph("PLANNED ACTIVITIES FOR NEXT DAY", styles['th']), Paragraph("ISSUES / SAFETY", styles['th'])],
+        [Paragraph(act_txt, td_left), Paragraph(iss_txt, td_left)]
+    ]
+    t_bot = Table(bot_data, colWidths=[DOC_WIDTH/2, DOC_WIDTH/2])
+    t_bot.setStyle(TableStyle([
+        ('GRID', (0,0), (-1,-1), 0.5, colors.black),
+        ('BACKGROUND', (0,0), (-1,0), colors.whitesmoke),
+        ('VALIGN', (0,0), (-1,-1), 'TOP'),
+        ('LEFTPADDING', (0,0), (-1,-1), 6), ('TOPPADDING', (0,0), (-1,-1), 6), ('BOTTOMPADDING', (0,0), (-1,-1), 6)
+    ]))
+    story.append(t_bot)
+    story.append(Spacer(1, 0.4*inch))
+
+    # --- Signatures ---
+    sig_data = [[Paragraph("_______________________<br/><b>Site Engineer</b>", styles['td_center']),
+                 Paragraph("_______________________<br/><b>Project Manager</b>", styles['td_center'])]]
+    story.append(Table(sig_data, colWidths=[DOC_WIDTH/2, DOC_WIDTH/2]))
+    return story
+
+
+def _document(buf, title):
+    return SimpleDocTemplate(buf, pagesize=PAGE_SIZE,
+                             rightMargin=RIGHT_MARGIN, leftMargin=LEFT_MARGIN,
+                             topMargin=TOP_MARGIN, bottomMargin=BOTTOM_MARGIN,
+                             title=title, author="CURVACRAFT DESIGN & BUILD STUDIO")
+
+
+def render_dpr_pdf(report):
+    """One DPR as PDF bytes."""
+    styles = _styles()
+    buf = io.BytesIO()
+    doc = _document(buf, f"DPR #{report.report_number} - {report.project.title}")
+    doc.build(report_story(report, report.project, styles), canvasmaker=NumberedCanvas)
+    return buf.getvalue()
+
+
+# ---------------------------------
+# DPR BOOK
+# ---------------------------------
+class _ReportAnchor(Flowable):
+    """Zero-size marker that records the page a report starts on and adds a PDF outline entry."""
+
+    def __init__(self, key, label, pages):
+        super().__init__()
+        self.key, self.label, self.pages = key, label, pages
+        self.width = self.height = 0
+
+    def draw(self):
+        self.pages[self.key] = self.canv.getPageNumber()
+        self.canv.bookmarkPage(self.key)
+        self.canv.addOutlineEntry(self.label, self.key, level=0)
+
+
+def _index_story(project, start, end, reports, pages, styles):
+    td_left, td_center = styles['td_left'], styles['td_center']
+    story = [_header("DAILY PROGRESS REPORTS", styles), Spacer(1, 0.2*inch)]
+    story.append(Paragraph(f"<b>{project.title}</b> &mdash; {start:%d %b %Y} to {end:%d %b %Y} &mdash; {len(reports)} report(s)", td_left))
+    story.append(Spacer(1, 0.15*inch))
+    data = [[Paragraph(h, styles['th']) for h in ['REPORT NO', 'DATE', 'CONTRACTOR', 'MANPOWER (D/N)', 'EQUIPMENT (D/N)', 'PAGE']]]
+    for report in reports:
+        manpower = report.manpower_logs.all()
+        equipment = report.equipment_logs.all()
+        data.append([
+            Paragraph(str(report.report_number), td_center),
+            Paragraph(report.date.strftime('%d-%b-%Y'), td_center),
+            Paragraph(report.contractor_name or '—', td_left),
+            Paragraph(f"{sum(m.day_count for m in manpower)} / {sum(m.night_count for m in manpower)}", td_center),
+            Paragraph(f"{sum(e.day_count for e in equipment)} / {sum(e.night_count for e in equipment)}", td_center),
+            Paragraph(str(pages.get(f"dpr-{report.pk}", '')), td_center),
+        ])
+    table = Table(data, colWidths=[DOC_WIDTH*w for w in (0.12, 0.16, 0.32, 0.15, 0.15, 0.10)], repeatRows=1)
+    table.setStyle(TableStyle([
+        ('GRID', (0,0), (-1,-1), 0.5, colors.grey),
+        ('BACKGROUND', (0,0), (-1,0), colors.whitesmoke),
+        ('VALIGN', (0,0), (-1,-1), 'MIDDLE'),
+        ('ROWBACKGROUNDS', (0,1), (-1,-1), [colors.white, colors.HexColor("#F7F7F7")]),
+    ]))
+    story.append(table)
+    return story
+
+
+def render_dpr_book(project, start, end, reports=None):
+    """
+    Every DPR for the project between start and end (inclusive) in one PDF,
+    preceded by an index page. The document is laid out twice: the first pass
+    only records which page each report starts on for the index.
+    """
+    if reports is None:
+        reports = book_reports(project, start, end)
+    styles = _styles()
+    pages = {}
+    pdf = b''
+    for _ in range(2):
+        story = _index_story(project, start, end, reports, pages, styles)
+        for report in reports:
+            story.append(PageBreak())
+            story.append(_ReportAnchor(f"dpr-{report.pk}", f"#{report.report_number} - {report.date:%d %b %Y}", pages))
+            story.extend(report_story(report, project, styles))
+        buf = io.BytesIO()
+        _document(buf, f"DPR Book - {project.title}").build(story, canvasmaker=NumberedCanvas)
+        pdf = buf.getvalue()
+    return pdf
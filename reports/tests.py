@@ -1,3 +1,61 @@
-from django.test import TestCase
+import datetime
 
-# Create your tests here.
+from django.urls import reverse
+
+from core.archive import archive_project
+from core.testing import TestCase
+from enquiries.models import Customer
+from projects.models import Project
+from users.models import User
+from .models import ArchivedDailyReport, DailyReport
+
+
+class CheckDprDateTests(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.sco = User.objects.create_user('sco', password='pw', role='sco')
+        customer = Customer.objects.create(name='ACME Ltd', email='acme@example.com')
+        self.project = Project.objects.create(customer=customer, title='Villa')
+        self.report = DailyReport.objects.create(project=self.project, date=datetime.date(2026, 3, 2), created_by=self.sco)
+
+    async def check(self, date):
+        response = await self.async_client.get(reverse('reports:ajax_check_dpr_date'), {'project_pk': self.project.pk, 'date': date})
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    async def test_anonymous_user_is_sent_to_login(self):
+        response = await self.async_client.get(reverse('reports:ajax_check_dpr_date'), {'project_pk': self.project.pk})
+        self.assertEqual(response.status_code, 302)
+
+    async def test_payloads(self):
+        await self.async_client.aforce_login(self.sco)
+        self.assertEqual(await self.check('2026-03-02'), {'exists': True, 'previous': None})
+        self.assertEqual(await self.check('2026-03-05'), {'exists': False, 'previous': {'report_number': 1, 'date': '2026-03-02'}})
+        self.assertEqual(await self.check('2026-03-01'), {'exists': False, 'previous': None})
+        self.assertEqual(await self.check('not-a-date'), {'exists': False, 'previous': None})
+
+
+class ArchivedProjectDprTests(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.sco = User.objects.create_user('sco', password='pw', role='sco')
+        customer = Customer.objects.create(name='ACME Ltd', email='acme@example.com')
+        self.project = Project.objects.create(customer=customer, title='Villa', status=Project.ProjectStatus.COMPLETED)
+        self.report = DailyReport.objects.create(project=self.project, date=datetime.date(2025, 3, 2), created_by=self.sco)
+        archive_project(self.project)
+        self.client.force_login(self.sco)
+
+    def test_edit_and_copy_forward_are_refused_as_read_only(self):
+        dpr_list = reverse('reports:dpr_list', args=[self.project.pk])
+        for response in (
+            self.client.get(reverse('reports:dpr_edit', args=[self.report.pk]), follow=True),
+            self.client.post(reverse('reports:dpr_copy_forward', args=[self.project.pk]), {'date': '2025-03-05'}, follow=True),
+        ):
+            self.assertRedirects(response, dpr_list)
+            self.assertContains(response, "archived and read-only")
+        self.assertEqual(ArchivedDailyReport.objects.count(), 1)
+        self.assertFalse(DailyReport.objects.exists())
+
+    def test_date_check_reads_the_archive(self):
+        response = self.client.get(reverse('reports:ajax_check_dpr_date'), {'project_pk': self.project.pk, 'date': '2025-03-05'})
+        self.assertEqual(response.json(), {'exists': False, 'previous': {'report_number': 1, 'date': '2025-03-02'}})
@@ -6,8 +6,12 @@ app_name = 'reports'
 urlpatterns = [
     path('project/<int:project_pk>/', views.dpr_list, name='dpr_list'),
     path('project/<int:project_pk>/new/', views.dpr_create_edit, name='dpr_create'),
+    path('project/<int:project_pk>/copy-forward/', views.dpr_copy_forward, name='dpr_copy_forward'),
     path('<int:pk>/edit/', views.dpr_create_edit, name='dpr_edit'),
     path('<int:pk>/pdf/', views.dpr_pdf_view, name='dpr_pdf'),
+    path('project/<int:project_pk>/book/', views.dpr_book, name='dpr_book'),
+    path('project/<int:project_pk>/resources/', views.dpr_resources, name='dpr_resources'),
+    path('project/<int:project_pk>/book/<uuid:token>/', views.dpr_book_status, name='dpr_book_status'),
 
     path('ajax/check-dpr-date/', views.ajax_check_dpr_date, name='ajax_check_dpr_date'),
 ]
\ No newline at end of file
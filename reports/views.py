@@ -2,16 +2,27 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
+from django.utils import timezone
+import datetime
 from projects.models import Project
 from .models import DailyReport
 from .forms import DailyReportForm, ManpowerLogFormSet, SubcontractorLogFormSet, EquipmentLogFormSet
+from core.archive import ARCHIVED_READ_ONLY, get_history_or_404
+from core.replica import using_replica
 
 @login_required
 def dpr_list(request, project_pk):
     """Lists all DPRs for a specific project."""
     project = get_object_or_404(Project, pk=project_pk)
-    reports = DailyReport.objects.filter(project=project)
-    context = {'project': project, 'reports': reports}
+    reports = DailyReport.objects.for_project(project).select_related('created_by')
+    today = timezone.localdate()
+    context = {
+        'project': project,
+        'reports': reports,
+        # Default DPR book range: this month so far
+        'book_start': today.replace(day=1),
+        'book_end': today,
+    }
     return render(request, 'reports/dpr_list.html', context)
 
 @login_required
@@ -21,13 +32,16 @@ def dpr_create_edit(request, pk=None, project_pk=None):
     along with its three related formsets.
     """
     if pk:
-        report = get_object_or_404(DailyReport, pk=pk)
+        report = get_history_or_404(DailyReport, pk=pk)
         project = report.project
         action = "Edit"
     else:
         report = None
         project = get_object_or_404(Project, pk=project_pk)
         action = "Create"
+    if project.archived_at:
+        messages.error(request, ARCHIVED_READ_ONLY)
+        return redirect('reports:dpr_list', project_pk=project.pk)
 
     if request.method == 'POST':
         form = DailyReportForm(request.POST, instance=report)
@@ -89,316 +103,184 @@ def dpr_create_edit(request, pk=None, project_pk=None):
     }
     return render(request, 'reports/dpr_form.html', context)
 
-# Placeholder for the PDF view
-# --- ADD/VERIFY THESE PDF IMPORTS AT THE TOP OF THE FILE ---
-import io
-import requests
-from django.shortcuts import get_object_or_404
-from django.contrib.auth.decorators import login_required
-from django.http import FileResponse
+# ---------------------------------
+# SITE RESOURCE ANALYTICS
+# ---------------------------------
+import csv
+from django.http import HttpResponse
+from .analytics import GROUPS, RESOURCES, site_resources, weekly_series
 
-# Models
-from .models import DailyReport 
-from invoices.pdf_utils import NumberedCanvas 
+def _date_param(request, name):
+    try:
+        return datetime.date.fromisoformat(request.GET.get(name, ''))
+    except ValueError:
+        return None
 
-# ReportLab Imports
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, Image as RLImage
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.enums import TA_RIGHT, TA_CENTER, TA_LEFT
-from reportlab.lib import colors
-from reportlab.lib.pagesizes import A4
-from reportlab.lib.units import inch
+@login_required
+@using_replica
+def dpr_resources(request, project_pk):
+    """
+    Manpower, subcontractor and equipment totals from the project's DPR logs,
+    grouped by trade or by week. ?export=csv downloads the same tables.
+    """
+    project = get_object_or_404(Project, pk=project_pk)
+    group = request.GET.get('group', 'trade')
+    if group not in GROUPS:
+        group = 'trade'
+    start, end = _date_param(request, 'from'), _date_param(request, 'to')
+    tables = site_resources(project, group, start, end)
+
+    if request.GET.get('export') == 'csv':
+        response = HttpResponse(content_type='text/csv')
+        response['Content-Disposition'] = f'attachment; filename="site_resources_{project.title.replace(" ", "_")}_by_{group}.csv"'
+        writer = csv.writer(response)
+        writer.writerow(['Resource', 'Week of' if group == 'week' else 'Trade / Equipment', 'Day', 'Night', 'Total', 'DPRs'])
+        for resource, rows in tables.items():
+            for row in rows:
+                writer.writerow([RESOURCES[resource][2], row['key'], row['day'], row['night'], row['total'], row['reports']])
+        return response
 
-# Image Processing Imports
-from PIL import Image as PILImage, ImageOps
+    context = {
+        'project': project,
+        'group': group,
+        'start': start,
+        'end': end,
+        'tables': [(RESOURCES[resource][2], rows) for resource, rows in tables.items()],
+        'chart': weekly_series(tables) if group == 'week' else None,
+    }
+    return render(request, 'reports/dpr_resources.html', context)
+
+
+# ---------------------------------
+# PDF VIEWS
+# ---------------------------------
+import io
+from django.http import FileResponse, Http404
+from django.urls import reverse
+from core.jobs import job_storage
+from core.models import Job
+from .books import BOOK_SYNC_LIMIT, book_filename, book_reports, dpr_filename, start_book_job
 
 @login_required
 def dpr_pdf_view(request, pk):
     """Generates a professional PDF with an inverted logo at top-left."""
-    report = get_object_or_404(DailyReport, pk=pk)
-    project = report.project
-    
-    buf = io.BytesIO()
-
-    # --- 1. PAGE SETUP ---
-    PAGE_SIZE = A4
-    LEFT_MARGIN = 0.5 * inch
-    RIGHT_MARGIN = 0.5 * inch
-    TOP_MARGIN = 0.5 * inch
-    BOTTOM_MARGIN = 0.8 * inch
-    doc_width = PAGE_SIZE[0] - (LEFT_MARGIN + RIGHT_MARGIN)
-
-    doc = SimpleDocTemplate(buf, pagesize=PAGE_SIZE,
-                            rightMargin=RIGHT_MARGIN, leftMargin=LEFT_MARGIN,
-                            topMargin=TOP_MARGIN, bottomMargin=BOTTOM_MARGIN)
-    
-    # --- 2. STYLES ---
-    styles = getSampleStyleSheet()
-    
-    # Title Style (Aligned Left/Center depending on preference, here Center of its cell)
-    style_title = ParagraphStyle(name='ReportTitle', parent=styles['Heading1'], alignment=TA_CENTER, fontSize=16, spaceAfter=0)
-    
-    # Table Styles
-    style_th = ParagraphStyle(name='TableHeader', fontName='Helvetica-Bold', fontSize=8, alignment=TA_CENTER)
-    style_td_left = ParagraphStyle(name='TableCellLeft', fontName='Helvetica', fontSize=8, alignment=TA_LEFT, leading=10)
-    style_td_center = ParagraphStyle(name='TableCellCenter', fontName='Helvetica', fontSize=8, alignment=TA_CENTER)
-    style_section = ParagraphStyle(name='SectionTitle', parent=styles['Heading3'], fontSize=10, spaceBefore=6, textColor=colors.black)
-
-    story = []
-
-    # --- 3. LOGO & TITLE HEADER ---
-    logo_url = "https://curvacraft.com/wp-content/uploads/2024/10/Curvacraft-logo-1024x255.webp"
-    logo_img = None
-    
+    from .pdf import render_dpr_pdf  # loads ReportLab on first use
+    report = get_history_or_404(
+        DailyReport.objects.select_related('project').prefetch_related('manpower_logs', 'equipment_logs', 'subcontractor_logs'),
+        pk=pk,
+    )
+    buf = io.BytesIO(render_dpr_pdf(report))
+    return FileResponse(buf, as_attachment=True, filename=dpr_filename(report))
+
+
+@login_required
+@using_replica
+def dpr_book(request, project_pk):
+    """
+    Compiles every DPR for a project between ?from and ?to into one PDF with an index page.
+    Up to BOOK_SYNC_LIMIT reports are rendered straight away; longer books are compiled in
+    the background by the `run_jobs` worker and the user is sent to a page that waits for them.
+    """
+    project = get_object_or_404(Project, pk=project_pk)
+    if request.method != 'POST':
+        return redirect('reports:dpr_list', project_pk=project.pk)
     try:
-        # Fetch Image
-        response = requests.get(logo_url, stream=True)
-        response.raise_for_status()
-        
-        # Open with PIL
-        pil_img = PILImage.open(io.BytesIO(response.content))
-        
-        # Handle Inversion (Preserving Transparency)
-        if pil_img.mode == 'RGBA':
-            r, g, b, a = pil_img.split()
-            rgb_image = PILImage.merge('RGB', (r, g, b))
-            inverted_image = ImageOps.invert(rgb_image) # Invert Colors
-            r2, g2, b2 = inverted_image.split()
-            pil_img = PILImage.merge('RGBA', (r2, g2, b2, a)) # Merge back Alpha
-        else:
-            pil_img = ImageOps.invert(pil_img.convert('RGB'))
-            
-        # Convert to PNG for ReportLab buffer
-        img_buffer = io.BytesIO()
-        pil_img.save(img_buffer, format='PNG')
-        img_buffer.seek(0)
-        
-        # Calculate Aspect Ratio for ReportLab
-        # Original: 1024x255. Desired Width: ~2 inches
-        aspect = 255.0 / 1024.0
-        display_width = 2.0 * inch
-        display_height = display_width * aspect
-        
-        logo_img = RLImage(img_buffer, width=display_width, height=display_height)
-        logo_img.hAlign = 'LEFT'
-
-    except Exception as e:
-        print(f"Logo fetch error: {e}")
-        logo_img = Paragraph("<b>[LOGO ERROR]</b>", style_td_left)
-
-    # Create Top Header Table: [Logo] | [Title]
-    # We give the logo column enough space, and the title takes the rest.
-    title_para = Paragraph("DAILY PROGRESS REPORT", style_title)
-    
-    # Table Layout: Logo (30%), Title (70%)
-    top_table = Table([[logo_img, title_para]], colWidths=[doc_width*0.35, doc_width*0.65])
-    top_table.setStyle(TableStyle([
-        ('VALIGN', (0,0), (-1,-1), 'MIDDLE'), # Vertically align logo and text
-        ('ALIGN', (0,0), (0,0), 'LEFT'),      # Align Logo Left
-        ('ALIGN', (1,0), (1,0), 'CENTER'),    # Align Title Center
-        ('LEFTPADDING', (0,0), (-1,-1), 0),
-        ('RIGHTPADDING', (0,0), (-1,-1), 0),
-    ]))
-    
-    story.append(top_table)
-    story.append(Spacer(1, 0.2*inch))
-
-    # ------------------------------------------------------------------
-    # 4. PROJECT INFO & TIMELINE (Standard Content)
-    # ------------------------------------------------------------------
-    
-    def clean_str(val): return str(val) if val is not None else "N/A"
-    def clean_date(val): return val.strftime('%d-%b-%y') if val else "N/A"
-
-    # Left: Info
-    left_data = [
-        [Paragraph('<b>PROJECT:</b>', style_td_left), Paragraph(project.title, style_td_left)],
-        [Paragraph('<b>CONTRACTOR</b>',  style_td_left), Paragraph(report.contractor_name, style_td_left)],
-        [Paragraph('<b>SITE ENGG:</b>', style_td_left), Paragraph(project.site_engineer if project.site_engineer else 'N/A', style_td_left)],
-        [Paragraph('<b>REPORT NO:</b>', style_td_left), Paragraph(clean_str(report.report_number), style_td_left)],
-        [Paragraph('<b>DATE:</b>', style_td_left), Paragraph(report.date.strftime('%d-%b-%Y'), style_td_left)],
-    ]
-    
-    # Right: Timeline
-    right_data = [
-        [Paragraph('<b>PROJECT TIMELINE</b>', style_th)],
-        [Paragraph(f'Start: {clean_date(project.mobilization_date)}', style_td_left)],
-        [Paragraph(f'End: {clean_date(project.handover_date)}', style_td_left)],
-        [Paragraph(f'Days Remaining: {clean_str(project.days_remaining)}', style_td_left)],
-    ]
-
-    col_w_left = doc_width * 0.65
-    col_w_right = doc_width * 0.35
-
-    t_left = Table(left_data, colWidths=[col_w_left * 0.3, col_w_left * 0.7])
-    t_left.setStyle(TableStyle([
-        ('GRID', (0,0), (-1,-1), 0.5, colors.grey),
-        ('BACKGROUND', (0,0), (0,-1), colors.whitesmoke),
-        ('VALIGN', (0,0), (-1,-1), 'MIDDLE'),
-        ('LEFTPADDING', (0,0), (-1,-1), 6),
-    ]))
-
-    t_right = Table(right_data, colWidths=[col_w_right])
-    t_right.setStyle(TableStyle([
-        ('GRID', (0,0), (-1,-1), 0.5, colors.grey),
-        ('BACKGROUND', (0,0), (0,0), colors.whitesmoke),
-        ('ALIGN', (0,0), (0,-1), 'CENTER'),
-        ('VALIGN', (0,0), (-1,-1), 'MIDDLE'),
-        ('LEFTPADDING', (0,0), (-1,-1), 6),
-    ]))
-
-    main_header_wrapper = Table([[t_left, t_right]], colWidths=[col_w_left, col_w_right])
-    main_header_wrapper.setStyle(TableStyle([('VALIGN', (0,0), (-1,-1), 'TOP')]))
-    
-    story.append(main_header_wrapper)
-    story.append(Spacer(1, 0.15*inch))
-
-    # ------------------------------------------------------------------
-    # 5. MANPOWER & EQUIPMENT
-    # ------------------------------------------------------------------
-    story.append(Paragraph("CONTRACTOR DETAILS", style_section))
-    # Manpower
-    mp_data = [[Paragraph('S.No', style_th), Paragraph('MANPOWER', style_th), Paragraph('DAY', style_th), Paragraph('NGT', style_th)]]
-    total_mp_day = total_mp_night = 0
-    for i, item in enumerate(report.manpower_logs.all(), 1):
-        mp_data.append([str(i), Paragraph(item.staff_type, style_td_left), item.day_count, item.night_count])
-        total_mp_day += item.day_count; total_mp_night += item.night_count
-    mp_data.append(['', Paragraph('<b>TOTAL</b>', style_td_center), total_mp_day, total_mp_night])
-
-    # Equipment
-    eq_data = [[Paragraph('S.No', style_th), Paragraph('EQUIPMENT', style_th), Paragraph('DAY', style_th), Paragraph('NGT', style_th)]]
-    total_eq_day = total_eq_night = 0
-    for i, item in enumerate(report.equipment_logs.all(), 1):
-        eq_data.append([str(i), Paragraph(item.equipment_name, style_td_left), item.day_count, item.night_count])
-        total_eq_day += item.day_count; total_eq_night += item.night_count
-    eq_data.append(['',Paragraph('<b>TOTAL</b>', style_td_center), total_eq_day, total_eq_night])
-
-    # Side by side calculation
-    gap = 0.2 * inch
-    half_w = (doc_width - gap) / 2
-    ratios = [0.1, 0.6, 0.15, 0.15]
-    
-    t_mp = Table(mp_data, colWidths=[half_w * r for r in ratios])
-    t_eq = Table(eq_data, colWidths=[half_w * r for r in ratios])
-
-    common_style = TableStyle([
-        ('GRID', (0,0), (-1,-1), 0.5, colors.black),
-        ('BACKGROUND', (0,0), (-1,0), colors.whitesmoke),
-        ('FONTNAME', (0,0), (-1,0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0,0), (-1,-1), 8),
-        ('ALIGN', (2,1), (-1,-1), 'CENTER'),
-        ('ALIGN', (0,0), (0,-1), 'CENTER'),
-        ('VALIGN', (0,0), (-1,-1), 'MIDDLE'),
-        ('BACKGROUND', (0,-1), (-1,-1), colors.whitesmoke), # Footer BG
-    ])
-    t_mp.setStyle(common_style)
-    t_eq.setStyle(common_style)
-
-    story.append(Table([[t_mp, '', t_eq]], colWidths=[half_w, gap, half_w]))
-    story.append(Spacer(1, 0.15*inch))
-
-    # ------------------------------------------------------------------
-    # 6. SUBCONTRACTORS
-    # ------------------------------------------------------------------
-
-    # --- CHANGE 1: Create a dynamic section header ---
-    # If a subcontractor name exists, include it in the main header.
-    if report.subcontractor_name:
-        section_title = f"SUBCONTRACTOR DETAILS: {report.subcontractor_name}"
-    else:
-        section_title = "SUBCONTRACTOR DETAILS"
-    story.append(Paragraph(section_title, style_section))
-
-
-    # --- CHANGE 2: Remove the 'SUBCONTRACTOR NAME' column from the header list ---
-    sub_data = [
-        [Paragraph('S.No', style_th), 
-        Paragraph('WORK TYPE', style_th), 
-        Paragraph('DAY', style_th), 
-        Paragraph('NGT', style_th)]
-    ]
-    t_sub_d = t_sub_n = 0
-
-    for i, item in enumerate(report.subcontractor_logs.all(), 1):
-        # --- CHANGE 3: Remove the 'subcontractor_name' data from the row ---
-        sub_data.append([
-            str(i), 
-            Paragraph(item.staff_type, style_td_left), 
-            item.day_count, 
-            item.night_count
-        ])
-        t_sub_d += item.day_count
-        t_sub_n += item.night_count
-
-    # --- CHANGE 4: Adjust the TOTAL row ---
-    # It now only needs one empty string at the beginning to align correctly.
-    sub_data.append([ '', Paragraph('<b>TOTAL</b>', style_td_center), t_sub_d, t_sub_n])
-
-    # --- CHANGE 5: Revert to your original column widths ---
-    # Since we removed a column, the original widths are correct again.
-    t_sub = Table(sub_data, colWidths=[0.5*inch, doc_width - 2.5*inch, 1*inch, 1*inch])
-
-    t_sub.setStyle(common_style)
-    story.append(t_sub)
-    story.append(Spacer(1, 0.15*inch))
-
-    # ------------------------------------------------------------------
-    # 7. CHRONOLOGICAL & ISSUES
-    # ------------------------------------------------------------------
-    story.append(Paragraph("CHRONOLOGICAL ACCOUNT OF DAY'S WORK", style_section))
-    chrono_txt = report.chronological_account.replace('\n', '<br/>') if report.chronological_account else "No entry."
-    t_chrono = Table([[Paragraph(chrono_txt, style_td_left)]], colWidths=[doc_width])
-    t_chrono.setStyle(TableStyle([('GRID', (0,0), (-1,-1), 0.5, colors.black), ('VALIGN', (0,0), (-1,-1), 'TOP'), ('LEFTPADDING', (0,0), (-1,-1), 6), ('TOPPADDING', (0,0), (-1,-1), 6), ('BOTTOMPADDING', (0,0), (-1,-1), 6)]))
-    story.append(t_chrono)
-    story.append(Spacer(1, 0.15*inch))
-
-    # Bottom Section
-    act_txt = report.activities_for_next_day.replace('\n', '<br/>') if report.activities_for_next_day else "N/A"
-    iss_txt = report.issues_encountered.replace('\n', '<br/>') if report.issues_encountered else "N/A"
-    
-    bot_data = [
-        [Paragraph("PLANNED ACTIVITIES FOR NEXT DAY", style_th), Paragraph("ISSUES / SAFETY", style_th)],
-        [Paragraph(act_txt, style_td_left), Paragraph(iss_txt, style_td_left)]
-    ]
-    t_bot = Table(bot_data, colWidths=[doc_width/2, doc_width/2])
-    t_bot.setStyle(TableStyle([
-        ('GRID', (0,0), (-1,-1), 0.5, colors.black),
-        ('BACKGROUND', (0,0), (-1,0), colors.whitesmoke),
-        ('VALIGN', (0,0), (-1,-1), 'TOP'),
-        ('LEFTPADDING', (0,0), (-1,-1), 6), ('TOPPADDING', (0,0), (-1,-1), 6), ('BOTTOMPADDING', (0,0), (-1,-1), 6)
-    ]))
-    story.append(t_bot)
-    story.append(Spacer(1, 0.4*inch))
-
-    # ------------------------------------------------------------------
-    # 8. SIGNATURES
-    # ------------------------------------------------------------------
-    sig_data = [[Paragraph("_______________________<br/><b>Site Engineer</b>", style_td_center), 
-                 Paragraph("_______________________<br/><b>Project Manager</b>", style_td_center)]]
-    story.append(Table(sig_data, colWidths=[doc_width/2, doc_width/2]))
-
-    # Build
-    doc.build(story, canvasmaker=NumberedCanvas)
-    
-    buf.seek(0)
-    filename = f"DPR_{project.title.replace(' ', '_')}_{report.date}.pdf"
-    return FileResponse(buf, as_attachment=True, filename=filename)
+        start = datetime.date.fromisoformat(request.POST.get('from', ''))
+        end = datetime.date.fromisoformat(request.POST.get('to', ''))
+    except ValueError:
+        start = end = None
+    if not start or start > end:
+        messages.error(request, "Please choose a valid date range for the DPR book.")
+        return redirect('reports:dpr_list', project_pk=project.pk)
 
+    report_count = DailyReport.objects.for_project(project).filter(date__range=(start, end)).count()
+    if not report_count:
+        messages.warning(request, f"No DPRs between {start:%d %b %Y} and {end:%d %b %Y}.")
+        return redirect('reports:dpr_list', project_pk=project.pk)
 
+    if report_count <= BOOK_SYNC_LIMIT:
+        from .pdf import render_dpr_book
 
-# reports/views.py
-from django.http import JsonResponse # Add this import
+        pdf = render_dpr_book(project, start, end, reports=book_reports(project, start, end))
+        return FileResponse(io.BytesIO(pdf), as_attachment=True, filename=book_filename(project, start, end))
+
+    job = start_book_job(project, start, end)
+    return redirect('reports:dpr_book_status', project_pk=project.pk, token=job.pk)
 
 
-# --- ADD THIS NEW VIEW ---
 @login_required
-def ajax_check_dpr_date(request):
-    # We get the data sent by the JavaScript
-    project_pk = request.GET.get('project_pk')
-    date_str = request.GET.get('date')
+def dpr_book_status(request, project_pk, token):
+    """Waits for a background DPR book; serves the PDF once it is ready."""
+    project = get_object_or_404(Project, pk=project_pk)
+    job = Job.objects.filter(pk=token, task='reports.books.compile_book', kwargs__project_pk=project.pk).first()
+    if job is None:
+        raise Http404("Unknown DPR book.")
+    if job.status == Job.Status.DONE and request.GET.get('download'):
+        return FileResponse(job_storage.open(job.result['file']), as_attachment=True, filename=job.result['filename'])
+    context = {
+        'project': project,
+        'job': job,
+        'download_url': f"{reverse('reports:dpr_book_status', args=[project.pk, token])}?download=1",
+    }
+    return render(request, 'reports/dpr_book_status.html', context)
 
-    # Check if a report exists for this project and date
-    exists = DailyReport.objects.filter(project_id=project_pk, date=date_str).exists()
 
-    # Return a JSON response
-    return JsonResponse({'exists': exists})
\ No newline at end of file
+
+# ---------------------------------
+# COPY-FORWARD & AJAX
+# ---------------------------------
+from django.db import transaction
+from django.http import JsonResponse
+
+def _reports_on_or_before(project, date):
+    """
+    Newest first, so one query for the first row answers both "is there already
+    a DPR on this date?" and "which report should a new one start from?".
+    """
+    return DailyReport.objects.for_project(project).filter(date__lte=date).order_by('-date')
+
+@login_required
+def dpr_copy_forward(request, project_pk):
+    """Creates the DPR for ?date (default today) as a copy of the latest earlier report, then opens it for editing."""
+    project = get_object_or_404(Project, pk=project_pk)
+    if request.method != 'POST':
+        return redirect('reports:dpr_list', project_pk=project.pk)
+    if project.archived_at:
+        messages.error(request, ARCHIVED_READ_ONLY)
+        return redirect('reports:dpr_list', project_pk=project.pk)
+    try:
+        report_date = datetime.date.fromisoformat(request.POST.get('date', ''))
+    except ValueError:
+        report_date = timezone.localdate()
+
+    previous = _reports_on_or_before(project, report_date).first()
+    if previous is None:
+        messages.error(request, "There is no earlier DPR to start from.")
+        return redirect('reports:dpr_create', project_pk=project.pk)
+    if previous.date == report_date:
+        messages.error(request, f"A Daily Progress Report for this project on {report_date.strftime('%d %B %Y')} already exists.")
+        return redirect('reports:dpr_edit', pk=previous.pk)
+
+    with transaction.atomic():
+        new_report = previous.copy_forward(report_date, request.user)
+    messages.success(request, f"DPR #{new_report.report_number} started from DPR #{previous.report_number} ({previous.date:%d %b %Y}). Review the counts and add today's work.")
+    return redirect('reports:dpr_edit', pk=new_report.pk)
+
+@login_required
+async def ajax_check_dpr_date(request):
+    """Whether a DPR exists for the project on ?date, plus the report a copy-forward would start from."""
+    try:
+        project_pk = int(request.GET.get('project_pk', ''))
+        report_date = datetime.date.fromisoformat(request.GET.get('date', ''))
+    except ValueError:
+        return JsonResponse({'exists': False, 'previous': None})
+    project = await Project.objects.filter(pk=project_pk).afirst()
+    if project is None:
+        return JsonResponse({'exists': False, 'previous': None})
+
+    latest = await _reports_on_or_before(project, report_date).afirst()
+    exists = latest is not None and latest.date == report_date
+    previous = None
+    if latest is not None and not exists:
+        previous = {'report_number': latest.report_number, 'date': latest.date.isoformat()}
+    return JsonResponse({'exists': exists, 'previous': previous})
@@ -0,0 +1,30 @@
+# users/backends.py
+from asgiref.sync import sync_to_async
+from django.contrib.auth.backends import ModelBackend
+
+from core.cache import SESSIONS, get_or_compute, object_namespace
+
+USER_CACHE_NAMESPACE = 'auth-user'
+USER_CACHE_TTL = 60 * 15  # seconds; saves and deletes invalidate sooner (users/signals.py)
+
+
+class CachedModelBackend(ModelBackend):
+    """
+    ModelBackend that keeps the logged-in User row in the sessions cache, so
+    AuthenticationMiddleware doesn't query it on every request. The entry is
+    versioned per user and bumped whenever the user is saved or deleted, so a
+    role change, deactivation or new password takes effect on the next request.
+    """
+
+    def get_user(self, user_id):
+        # False marks a missing user, since the cache can't tell None from a miss.
+        user = get_or_compute(
+            object_namespace(USER_CACHE_NAMESPACE, user_id), [],
+            lambda: super(CachedModelBackend, self).get_user(user_id) or False,
+            USER_CACHE_TTL, cache_name=SESSIONS,
+        )
+        return user or None
+
+    async def aget_user(self, user_id):
+        # ModelBackend's async version queries the database directly; go through the cache instead.
+        return await sync_to_async(self.get_user)(user_id)
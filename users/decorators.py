@@ -1,12 +1,22 @@
 # users/decorators.py
+from asgiref.sync import iscoroutinefunction
 from django.core.exceptions import PermissionDenied
 
 def role_required(*roles):
     """
     A decorator that checks if a user has one of the specified roles.
     Usage: @role_required('admin', 'staff')
+    Works on async views too (the user is then loaded with request.auser()).
     """
     def decorator(function):
+        if iscoroutinefunction(function):
+            async def wrapper(request, *args, **kwargs):
+                user = await request.auser()
+                if user.is_authenticated and user.role in roles:
+                    return await function(request, *args, **kwargs)
+                raise PermissionDenied
+            return wrapper
+
         def wrapper(request, *args, **kwargs):
             if request.user.is_authenticated and request.user.role in roles:
                 return function(request, *args, **kwargs)
@@ -17,4 +27,4 @@ def role_required(*roles):
     return decorator
 
 # We can keep a simple one for just admins if we want
-admin_required = role_required('admin')
\ No newline at end of file
+admin_required = role_required('admin')
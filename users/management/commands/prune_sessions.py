@@ -0,0 +1,24 @@
+# users/management/commands/prune_sessions.py
+from django.contrib.sessions.models import Session
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+
+class Command(BaseCommand):
+    help = (
+        "Deletes expired sessions from the database in small batches, so the session table "
+        "isn't locked for long on a busy site. Run it daily from cron."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=5000, help="Rows deleted per statement (default 5000).")
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        removed = 0
+        while True:
+            batch = list(Session.objects.filter(expire_date__lt=now).values_list('pk', flat=True)[:options['batch_size']])
+            if not batch:
+                break
+            removed += Session.objects.filter(pk__in=batch).delete()[0]
+        self.stdout.write(self.style.SUCCESS(f"Removed {removed} expired session(s)."))
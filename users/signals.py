@@ -0,0 +1,7 @@
+# users/signals.py
+"""Drops a user's cached row (users/backends.py) whenever it changes."""
+from core.cache import invalidate_objects_on_change
+from .backends import USER_CACHE_NAMESPACE
+from .models import User
+
+invalidate_objects_on_change(USER_CACHE_NAMESPACE, User, lambda user: [user.pk])
@@ -1,3 +1,30 @@
-from django.test import TestCase
+from asgiref.sync import iscoroutinefunction
+from django.contrib.auth.models import AnonymousUser
+from django.core.exceptions import PermissionDenied
+from django.http import HttpResponse
+from django.test import AsyncRequestFactory, SimpleTestCase
 
-# Create your tests here.
+from .decorators import role_required
+from .models import User
+
+
+class AsyncRoleRequiredTests(SimpleTestCase):
+    def request_as(self, user):
+        request = AsyncRequestFactory().get('/')
+
+        async def auser():
+            return user
+        request.auser = auser
+        return request
+
+    async def test_async_view_stays_async_and_checks_the_role(self):
+        @role_required('admin', 'staff')
+        async def view(request):
+            return HttpResponse('ok')
+
+        self.assertTrue(iscoroutinefunction(view))
+        response = await view(self.request_as(User(username='boss', role='staff')))
+        self.assertEqual(response.content, b'ok')
+        for user in (User(username='sco', role='sco'), AnonymousUser()):
+            with self.assertRaises(PermissionDenied):
+                await view(self.request_as(user))